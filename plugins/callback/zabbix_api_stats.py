@@ -0,0 +1,144 @@
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: zabbix_api_stats
+author:
+    - Zabbix Ltd (@zabbix)
+type: aggregate
+short_description: Report on Zabbix API requests of a playbook run
+description:
+    - This callback plugin collects statistics of Zabbix API requests sent by the modules
+      and the inventory plugin of this collection.
+    - At the end of the playbook run, it displays the tasks, hosts, methods and methods of tasks
+      with the longest total time of waiting for responses from Zabbix API.
+    - Statistics of modules are available only if the C(zabbix_api_stats) option
+      of the HTTP API plugin is enabled (e.g. with the C(ZABBIX_API_STATS=true) environment variable).
+requirements:
+    - enable in configuration (C(callbacks_enabled = zabbix.zabbix.zabbix_api_stats) in the C([defaults]) section)
+options:
+    top:
+        type: int
+        default: 10
+        description: Number of rows displayed in each part of the report.
+        env:
+            - name: ZABBIX_API_STATS_TOP
+        ini:
+            - section: callback_zabbix_api_stats
+              key: top
+    output_path:
+        type: path
+        description: Path to a file to write the whole report to in JSON format.
+        env:
+            - name: ZABBIX_API_STATS_OUTPUT
+        ini:
+            - section: callback_zabbix_api_stats
+              key: output_path
+'''
+
+import json
+
+from ansible.plugins.callback import CallbackBase
+from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import (
+    RequestStats, inventory_request_stats)
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'zabbix.zabbix.zabbix_api_stats'
+    CALLBACK_NEEDS_ENABLED = True
+
+    # Parts of the report with their titles
+    REPORT_PARTS = [
+        ('tasks', 'TASKS'),
+        ('hosts', 'HOSTS'),
+        ('methods', 'METHODS'),
+        ('task_methods', 'METHODS OF TASKS')]
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self.report = dict((part, {}) for part, title in self.REPORT_PARTS)
+
+    def add_records(self, task, host, records):
+        """
+        Function for adding records of requests to the report
+
+        :param task: name of the task or the inventory source
+        :type task: str
+        :param host: name of the host
+        :type host: str
+        :param records: records of requests or totals for each method
+        :type records: list
+
+        :return: None
+        """
+        for record in records:
+            keys = {
+                'tasks': task,
+                'hosts': host,
+                'methods': record['method'],
+                'task_methods': '{0}: {1}'.format(task, record['method'])}
+            for part, key in keys.items():
+                if key is not None:
+                    RequestStats.add_to_summary(self.report[part], key, record)
+
+    def add_result(self, result):
+        """
+        Function for adding statistics from the result of a task.
+        For loops, the statistics of each item are added.
+
+        :param result: result of the task
+        :type result: TaskResult
+
+        :return: None
+        """
+        results = [result._result] + [r for r in result._result.get('results', []) if isinstance(r, dict)]
+        records = []
+        for each in results:
+            records.extend(each.get('zabbix_api_stats') or [])
+
+        if records:
+            self.add_records(result._task.get_name(), result._host.get_name(), records)
+
+    def v2_runner_on_ok(self, result):
+        self.add_result(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.add_result(result)
+
+    def v2_playbook_on_stats(self, stats):
+        for path, totals in inventory_request_stats.items():
+            self.add_records(
+                'inventory {0}'.format(path), None,
+                [dict(each, method=method) for method, each in totals.items()])
+
+        if not self.report['methods']:
+            self._display.display(
+                'No statistics of Zabbix API requests. Enable the zabbix_api_stats option '
+                'of the HTTP API plugin to collect statistics of modules.')
+            return
+
+        top = self.get_option('top')
+        for part, title in self.REPORT_PARTS:
+            summary = self.report[part]
+            if not summary:
+                continue
+            self._display.banner('ZABBIX API: {0}'.format(title))
+            for key in sorted(summary, key=lambda k: -summary[k]['server_time'])[:top]:
+                each = summary[key]
+                self._display.display(
+                    '{0}: {1} request(s), waiting {2:.3f} s, decoding {3:.3f} s, '
+                    'sent {4} bytes, received {5} bytes'.format(
+                        key, each['requests'], each['server_time'], each['decode_time'],
+                        each['request_bytes'], each['response_bytes']))
+
+        output_path = self.get_option('output_path')
+        if output_path:
+            with open(output_path, 'w') as output_file:
+                json.dump(self.report, output_file, indent=4, sort_keys=True)
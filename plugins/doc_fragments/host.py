@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import textwrap
+
+
+class ModuleDocFragment(object):
+
+    # Parameters of a host for the zabbix_host module
+    DOCUMENTATION = r'''
+options:
+    state:
+        description: Create or delete host.
+        required: false
+        type: str
+        default: present
+        choices: [ present, absent ]
+    host:
+        description:
+            - Host name to create.
+            - The name of an existing host in case of an update.
+        type: str
+        required: true
+        aliases: [ host_name ]
+    name:
+        description: Visible host name
+        type: str
+        aliases: [ visible_name ]
+    hostgroups:
+        description:
+            - Host groups to replace the current host groups the host belongs to.
+            - All host groups that are not listed in the task will be unlinked.
+        type: list
+        elements: str
+        aliases: [ host_group, host_groups ]
+    templates:
+        description:
+            - Templates to replace the currently linked templates.
+            - All templates that are not listed in the task will be unlinked.
+        type: list
+        elements: str
+        aliases: [ link_templates, host_templates, template ]
+    status:
+        description: Host status (enabled or disabled).
+        type: str
+        choices: [ enabled, disabled ]
+    description:
+        description: Host description.
+        type: str
+    tags:
+        description:
+            - Host tags to replace the current host tags.
+            - All tags that are not listed in the task will be removed.
+        type: list
+        elements: dict
+        suboptions:
+            tag:
+                description: Host tag name.
+                type: str
+                required: true
+            value:
+                description: Host tag value.
+                type: str
+                default: ''
+        aliases: [ host_tags ]
+    macros:
+        description:
+            - User macros to replace the current user macros.
+            - All macros that are not listed in the task will be removed.
+            - If a secret macro is specified, the host will be updated every time the task is run.
+        type: list
+        elements: dict
+        suboptions:
+            macro:
+                description: Macro string.
+                type: str
+                required: true
+            value:
+                description:
+                    - Value of the macro.
+                    - Write-only if I(type=secret).
+                type: str
+                default: ''
+            description:
+                description: Description of the macro.
+                type: str
+                default: ''
+            type:
+                description: Type of macro.
+                type: str
+                default: text
+                choices: [ text, secret, vault_secret ]
+        aliases: [ user_macros, user_macro ]
+    ipmi_authtype:
+        description: IPMI authentication algorithm.
+        type: str
+        choices: [ default, none, md2, md5, straight, oem, rmcp+ ]
+    ipmi_privilege:
+        description: IPMI privilege level.
+        type: str
+        choices: [ callback, user, operator, admin, oem ]
+    ipmi_username:
+        description: IPMI username.
+        type: str
+    ipmi_password:
+        description: IPMI password.
+        type: str
+    tls_accept:
+        description: Connections from host.
+        type: list
+        elements: str
+        choices: [ unencrypted, psk, cert ]
+    tls_connect:
+        description: Connections to host.
+        type: str
+        choices: [ '', unencrypted, psk, cert ]
+    tls_psk_identity:
+        description:
+            - PSK identity.
+            - Required if I(tls_connect=psk) , or I(tls_accept) contains the 'psk'.
+            - In case of updating an existing host, if the host already has PSK enabled, the parameter is not required.
+            - If the parameter is defined, then every launch of the task will update the host
+              because Zabbix API does not have access to an existing PSK key and it is not possible to compare the specified key with the existing one.
+        type: str
+    tls_psk:
+        description:
+            - The pre-shared key, at least 32 hex digits.
+            - Required if I(tls_connect=psk), or I(tls_accept) contains the 'psk'.
+            - In case of updating an existing host, if the host already has PSK enabled, the parameter is not required.
+            - If the parameter is defined, then every launch of the task will update the host
+              because Zabbix API does not have access to an existing PSK key and it is not possible to compare the specified key with the existing one.
+        type: str
+    tls_issuer:
+        description: Certificate issuer.
+        type: str
+    tls_subject:
+        description: Certificate subject.
+        type: str
+    proxy:
+        description: Name of the proxy that is used to monitor the host.
+        type: str
+    proxy_group:
+        description:
+            - Name of the proxy group that is used to monitor the host.
+            - Used only for Zabbix versions above 7.0.
+        type: str
+    inventory_mode:
+        description: Host inventory population mode.
+        choices: [ automatic, manual, disabled ]
+        type: str
+    inventory:
+        description:
+            - The host inventory object.
+            - "All possible fields:"
+            - type, type_full, name, alias, os, os_full, os_short, serialno_a, serialno_b, tag, asset_tag, macaddress_a,
+              macaddress_b, hardware, hardware_full, software, software_full, software_app_a, software_app_b, software_app_c, software_app_d,
+              software_app_e, contact, location, location_lat, location_lon, notes, chassis, model, hw_arch, vendor, contract_number,
+              installer_name, deployment_status, url_a, url_b, url_c, host_networks, host_netmask, host_router, oob_ip, oob_netmask,
+              oob_router, date_hw_purchase, date_hw_install, date_hw_expiry, date_hw_decomm, site_address_a, site_address_b, site_address_c,
+              site_city, site_state, site_country, site_zip, site_rack, site_notes, poc_1_name, poc_1_email, poc_1_phone_a,
+              poc_1_phone_b, poc_1_cell, poc_1_screen, poc_1_notes, poc_2_name, poc_2_email, poc_2_phone_a, poc_2_phone_b, poc_2_cell,
+              poc_2_screen, poc_2_notes.
+            - See U(https://www.zabbix.com/documentation/current/en/manual/api/reference/host/object#host-inventory) for an overview.
+        type: dict
+        aliases: [ inventory_zabbix, host_inventory ]
+    interfaces:
+        type: list
+        elements: dict
+        description:
+            - Host interfaces to replace the current host interfaces.
+            - Only one interface of each type is supported.
+            - All interfaces that are not listed in the request will be removed.
+        suboptions:
+            type:
+                type: str
+                description: Interface type.
+                choices: [ agent, snmp, ipmi, jmx ]
+                required: True
+            useip:
+                type: bool
+                description: Whether the connection should be made through IP.
+                default: True
+            ip:
+                type: str
+                description:
+                    - IP address used by the interface.
+                    - Can be empty if the connection is made through DNS.
+                default: ''
+            dns:
+                type: str
+                description:
+                    - DNS name used by the interface.
+                    - Can be empty if the connection is made through IP.
+                    - Require if I(useip=False).
+                default: ''
+            port:
+                type: str
+                description:
+                    - Port number used by the interface.
+                    - Can contain user macros.
+            details:
+                description:
+                    - Additional detail object for interface.
+                    - Required if I(type=snmp).
+                type: dict
+                suboptions:
+                    version:
+                        description: SNMP interface version.
+                        type: str
+                        choices: [ '1', '2', '3' ]
+                    bulk:
+                        description: Whether to use bulk SNMP requests.
+                        type: bool
+                    community:
+                        description:
+                            - SNMP community.
+                            - Used only if I(version=1) or I(version=2).
+                        type: str
+                    max_repetitions:
+                        description:
+                            - Max repetition count is applicable to discovery and walk only.
+                            - Used only if I(version=2) or I(version=3).
+                            - Used only for Zabbix versions above 6.4.
+                        type: str
+                    contextname:
+                        description:
+                            - SNMPv3 context name.
+                            - Used only if I(version=3).
+                        type: str
+                    securityname:
+                        description:
+                            - SNMPv3 security name.
+                            - Used only if I(version=3).
+                        type: str
+                    securitylevel:
+                        description:
+                            - SNMPv3 security level.
+                            - Used only if I(version=3).
+                        type: str
+                        choices: [ noAuthNoPriv, authNoPriv, authPriv ]
+                    authprotocol:
+                        description:
+                            - SNMPv3 authentication protocol.
+                            - Used only if I(version=3).
+                        type: str
+                        choices: [ md5, sha1, sha224, sha256, sha384, sha512 ]
+                    authpassphrase:
+                        description:
+                            - SNMPv3 authentication passphrase.
+                            - Used only if I(version=3).
+                        type: str
+                    privprotocol:
+                        description:
+                            - SNMPv3 privacy protocol.
+                            - Used only if I(version=3).
+                        type: str
+                        choices: [ des, aes128, aes192, aes256, aes192c, aes256c ]
+                    privpassphrase:
+                        description:
+                            - SNMPv3 privacy passphrase.
+                            - Used only if I(version=3).
+                        type: str
+'''
+
+    # The same parameters for each element of the 'hosts' list of the zabbix_hosts module
+    HOSTS = r'''
+options:
+    hosts:
+        description:
+            - List of hosts to process.
+            - Each element supports the same parameters as the M(zabbix.zabbix.zabbix_host) module.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+''' + textwrap.indent(DOCUMENTATION.split('options:\n', 1)[1], ' ' * 8)
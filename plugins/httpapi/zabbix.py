@@ -38,6 +38,129 @@ options:
             - name: ZABBIX_API_URL
         vars:
             - name: zabbix_api_url
+    zabbix_api_stats:
+        type: bool
+        default: false
+        description:
+            - Add statistics of Zabbix API requests sent by a module to its results as C(zabbix_api_stats).
+            - Each record contains the method, the ID of the request, the sizes of the request and response bodies
+              in bytes, the HTTP status, the time of waiting for the response and the time of decoding it in seconds.
+        env:
+            - name: ZABBIX_API_STATS
+        vars:
+            - name: zabbix_api_stats
+    zabbix_api_stats_path:
+        type: path
+        description:
+            - Path to a file to append statistics of all Zabbix API requests to, one JSON object per line.
+            - The records are the same as in C(zabbix_api_stats).
+        env:
+            - name: ZABBIX_API_STATS_PATH
+        vars:
+            - name: zabbix_api_stats_path
+    zabbix_cache_ttl:
+        type: int
+        default: 300
+        description:
+            - Time in seconds to keep the IDs of host groups, templates, proxies and proxy groups
+              found by names in the persistent connection. The cache is shared by all tasks that use
+              the same connection. Objects created, updated or deleted by the modules of this collection
+              are removed from the cache.
+            - Set to 0 to disable the cache.
+        env:
+            - name: ZABBIX_CACHE_TTL
+        vars:
+            - name: zabbix_cache_ttl
+    zabbix_cache_size:
+        type: int
+        default: 10000
+        description: Maximum number of objects in the cache. The least recently used objects are evicted first.
+        env:
+            - name: ZABBIX_CACHE_SIZE
+        vars:
+            - name: zabbix_cache_size
+    zabbix_compression:
+        type: str
+        default: disabled
+        choices: [disabled, responses, all]
+        description:
+            - Compression of data sent to and received from Zabbix API.
+            - C(responses) - request gzip or deflate compressed responses from the web server.
+            - C(all) - also compress request bodies larger than 1 KiB with gzip.
+              The web server must be configured to decompress request bodies (e.g. the DEFLATE input filter of Apache).
+        env:
+            - name: ZABBIX_COMPRESSION
+        vars:
+            - name: zabbix_compression
+    zabbix_retries:
+        type: int
+        default: 3
+        description:
+            - Number of times a read-only request (e.g. C(host.get)) is repeated after a connection error
+              or a transient HTTP error (429, 502, 503, 504). Other HTTP errors are not repeated.
+            - After the HTTP error 429, the delay requested by the server with the C(Retry-After) header is used if any.
+            - Requests that change data are never repeated.
+        env:
+            - name: ZABBIX_RETRIES
+        vars:
+            - name: zabbix_retries
+    zabbix_retry_delay:
+        type: float
+        default: 1
+        description:
+            - Delay in seconds before repeating a request. The delay is doubled after each failed attempt
+              and randomized, so the forks failed at the same time do not repeat their requests at the same time.
+        env:
+            - name: ZABBIX_RETRY_DELAY
+        vars:
+            - name: zabbix_retry_delay
+    zabbix_rate_limit:
+        type: float
+        default: 0
+        description:
+            - Maximum number of requests per second sent to Zabbix API by all forks of the controller.
+            - The limit is shared by all connections of the current user to the same URL.
+              Its state is kept in the C(ansible-zabbix-<uid>) directory of the temporary directory,
+              which must be accessible by the current user only.
+            - Set to 0 to disable the limit.
+        env:
+            - name: ZABBIX_RATE_LIMIT
+        vars:
+            - name: zabbix_rate_limit
+    zabbix_session_ttl:
+        type: int
+        default: 3600
+        description:
+            - Time in seconds to reuse the detected version of Zabbix API and the session token.
+            - The version is kept in the persistent connection, so it is requested once for all tasks
+              that use the connection instead of once for each task.
+            - With C(zabbix_session_cache_path), the version and the session token are also reused by the following runs.
+            - Set to 0 to request the version for each task.
+        env:
+            - name: ZABBIX_SESSION_TTL
+        vars:
+            - name: zabbix_session_ttl
+    zabbix_session_cache_path:
+        type: path
+        description:
+            - Path to a file to keep the versions of Zabbix API and session tokens between runs for each URL and user.
+              The file is encrypted with C(zabbix_session_cache_key) using Ansible Vault.
+              It is updated under the lock of the file with the C(.lock) suffix next to it.
+            - A stored session token is checked with C(user.checkAuthentication) instead of logging in again.
+              Only if the check fails, a new session is started.
+            - Stored sessions are not closed at the end of the run, they expire according to the auto-logout settings of Zabbix users.
+            - Used only together with C(zabbix_session_cache_key).
+        env:
+            - name: ZABBIX_SESSION_CACHE_PATH
+        vars:
+            - name: zabbix_session_cache_path
+    zabbix_session_cache_key:
+        type: str
+        description: Password for encrypting the file from C(zabbix_session_cache_path).
+        env:
+            - name: ZABBIX_SESSION_CACHE_KEY
+        vars:
+            - name: zabbix_session_cache_key
 '''
 
 EXAMPLES = r'''
@@ -84,12 +207,103 @@ EXAMPLES = r'''
 
 import json
 import base64
+import fcntl
+import hashlib
+import os
+import socket
+import tempfile
+import time
 from uuid import uuid4
 
+from ansible.errors import AnsibleConnectionFailure
+from ansible.parsing.vault import VaultLib, VaultSecret
 from ansible.plugins.httpapi import HttpApiBase
-from ansible.module_utils.basic import to_text
+from ansible.module_utils.basic import to_bytes, to_text
 from ansible.module_utils.connection import ConnectionError
-from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import Zabbix_version
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import (
+    Zabbix_version, ObjectCache, RequestStats, RateLimiter, is_read_only,
+    rate_limit_path, retry_after, retry_delay, retry_http_codes)
+from ansible_collections.zabbix.zabbix.plugins.module_utils.http_session import (
+    compress_request, decompress_response)
+
+
+class SessionStore(object):
+    """
+    Class for keeping versions of Zabbix API and session tokens on disk between runs.
+    The file is encrypted with Ansible Vault and replaced atomically.
+    It is updated under the lock of the '.lock' file next to it,
+    so the sessions saved by several connections at the same time are not lost.
+
+    :param path: path to the file
+    :type path: str
+    :param key: password for encrypting the file
+    :type key: str
+    """
+    def __init__(self, path, key):
+        self.path = path
+        self.vault = VaultLib([('default', VaultSecret(to_bytes(key)))])
+
+    def load(self):
+        """
+        Function for loading all sessions from the file.
+        A missing file or a file that cannot be decrypted (e.g. after changing the key)
+        is considered empty.
+
+        :return: sessions by keys
+        :rtype: dict
+        """
+        try:
+            with open(self.path, 'rb') as store_file:
+                return json.loads(to_text(self.vault.decrypt(store_file.read())))
+        except Exception:
+            return {}
+
+    def get(self, key):
+        """
+        Function for getting a session that has not expired
+
+        :param key: key of the session
+        :type key: str
+
+        :return: session or an empty dict
+        :rtype: dict
+        """
+        session = self.load().get(key, {})
+        if session.get('expires', 0) <= time.time():
+            return {}
+
+        return session
+
+    def set(self, key, session):
+        """
+        Function for saving a session. Expired sessions are removed from the file.
+
+        :param key: key of the session
+        :type key: str
+        :param session: session with the 'expires' field
+        :type session: dict
+
+        :return: None
+        """
+        lock_fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            now = time.time()
+            sessions = dict((k, v) for k, v in self.load().items() if v.get('expires', 0) > now)
+            sessions[key] = session
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.zabbix_sessions')
+            try:
+                with os.fdopen(fd, 'wb') as tmp_file:
+                    tmp_file.write(self.vault.encrypt(json.dumps(sessions)))
+                os.rename(tmp_path, self.path)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+        finally:
+            os.close(lock_fd)
 
 
 class HttpApi(HttpApiBase):
@@ -124,12 +338,16 @@ class HttpApi(HttpApiBase):
         """
         Function for setup options for connection
 
-        :return: None
+        :return: information for modules:
+            * zabbix_api_version - version of Zabbix API if it is already known, otherwise None
+            * zabbix_api_stats - whether statistics of requests should be added to the results of modules
+        :rtype: dict
         """
         self.auth_token = self.get_option('zabbix_api_token')
         self.http_login = self.get_option('http_login')
         self.http_password = self.get_option('http_password')
-        self.methods_wo_auth = ['apiinfo.version', 'user.login']
+        self.compression = self.get_option('zabbix_compression')
+        self.methods_wo_auth = ['apiinfo.version', 'user.login', 'user.checkAuthentication']
 
         self.url_path = ''
         if self.get_option("zabbix_api_url"):
@@ -137,15 +355,177 @@ class HttpApi(HttpApiBase):
             url_parts = [u for u in url.split('/') if len(u) > 0]
             self.url_path = '/' + '/'.join(url_parts)
 
-        return
+        # The cache lives as long as the persistent connection
+        if getattr(self, 'object_cache', None) is None:
+            self.object_cache = ObjectCache(
+                ttl=self.get_option('zabbix_cache_ttl'),
+                max_size=self.get_option('zabbix_cache_size'))
+
+        # Statistics of requests are collected only if they are requested
+        self.collect_stats = self.get_option('zabbix_api_stats')
+        stats_path = self.get_option('zabbix_api_stats_path')
+        if self.collect_stats or stats_path:
+            if getattr(self, 'request_stats', None) is None or self.request_stats.path != stats_path:
+                self.request_stats = RequestStats(path=stats_path)
+        else:
+            self.request_stats = None
+
+        # Repeating of failed requests and the rate limit shared by all forks
+        self.retries = self.get_option('zabbix_retries')
+        self.retry_delay = self.get_option('zabbix_retry_delay')
+        self.rate_limiter = None
+        if self.get_option('zabbix_rate_limit'):
+            self.rate_limiter = RateLimiter(
+                rate_limit_path('{0}{1}'.format(self.connection._url, self.url_path)),
+                self.get_option('zabbix_rate_limit'))
+
+        # The version and the session are kept in the persistent connection and optionally on disk
+        self.session_ttl = self.get_option('zabbix_session_ttl')
+        if getattr(self, 'sessions', None) is None:
+            self.sessions = {}
+        self.session_store = None
+        if self.get_option('zabbix_session_cache_path') and self.get_option('zabbix_session_cache_key'):
+            self.session_store = SessionStore(
+                self.get_option('zabbix_session_cache_path'),
+                self.get_option('zabbix_session_cache_key'))
+
+        version = self.get_session().get('version')
+        if version:
+            self.zbx_api_version = version
+
+        return {'zabbix_api_version': version, 'zabbix_api_stats': self.collect_stats}
+
+    def api_user(self):
+        """
+        Function for getting the user of Zabbix API.
+        With basic HTTP authentication, the 'remote_user' option is replaced
+        with 'http_login' at the login, so the user is remembered before it.
+
+        :return: username used for 'user.login'
+        :rtype: str
+        """
+        if getattr(self, 'zabbix_user', None) is None:
+            self.zabbix_user = self.connection.get_option('remote_user')
+
+        return self.zabbix_user
+
+    def session_key(self):
+        """
+        Function for generating a key of the session.
+        Sessions are kept separately for each API URL and user.
+
+        :return: key of the session
+        :rtype: str
+        """
+        return hashlib.sha256(to_bytes(json.dumps(self.cache_key('session')))).hexdigest()
+
+    def get_session(self):
+        """
+        Function for getting the version of Zabbix API and the session token
+        kept by the connection or stored on disk.
+
+        :return: session with the 'version' and 'auth' fields or an empty dict
+        :rtype: dict
+        """
+        if not self.session_ttl or self.session_ttl <= 0:
+            return {}
+
+        key = self.session_key()
+        session = self.sessions.get(key, {})
+        if session.get('expires', 0) <= time.time():
+            session = {}
+            if self.session_store is not None:
+                session = self.session_store.get(key)
+            self.sessions[key] = session
+
+        return session
+
+    def save_session(self, **fields):
+        """
+        Function for saving the version of Zabbix API or the session token.
+        The session expires 'zabbix_session_ttl' seconds after the last saving.
+
+        :param fields: fields of the session to update (version, auth)
+        :type fields: dict
+
+        :return: None
+        """
+        if not self.session_ttl or self.session_ttl <= 0:
+            return
+
+        key = self.session_key()
+        session = dict(self.get_session(), expires=time.time() + self.session_ttl, **fields)
+        self.sessions[key] = session
+        if self.session_store is not None:
+            self.session_store.set(key, session)
+
+    def cache_key(self, object_type):
+        """
+        Function for generating a key of cached objects.
+        Objects are cached separately for each API URL, user and object type.
+
+        :param object_type: type of object (hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+
+        :return: key of cached objects
+        :rtype: tuple
+        """
+        user = self.api_user()
+        if self.auth_token:
+            user = 'token:{0}'.format(
+                hashlib.sha256(self.auth_token.encode('utf-8')).hexdigest())
+
+        return (getattr(self.connection, '_url', None), self.url_path, user, object_type)
+
+    def get_cached_objects(self, object_type, names):
+        """
+        Function for getting objects from the cache by names
+
+        :param object_type: type of object (hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+        :param names: names of objects
+        :type names: list
+
+        :return: found objects by names
+        :rtype: dict
+        """
+        return self.object_cache.get(self.cache_key(object_type), names)
+
+    def cache_objects(self, object_type, name_field, objects):
+        """
+        Function for adding objects to the cache
+
+        :param object_type: type of object (hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+        :param name_field: field containing the object name
+        :type name_field: str
+        :param objects: objects for caching
+        :type objects: list
+
+        :return: None
+        """
+        self.object_cache.set(self.cache_key(object_type), name_field, objects)
+
+    def invalidate_cached_objects(self, object_type):
+        """
+        Function for removing all cached objects of the given type
+
+        :param object_type: type of object (hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+
+        :return: None
+        """
+        self.object_cache.invalidate(self.cache_key(object_type))
 
     def set_api_version(self, zbx_api_version):
         """
-        Function for setup version of Zabbix API
+        Function for setup version of Zabbix API.
+        The version is saved for the following tasks.
 
         :return: None
         """
         self.zbx_api_version = zbx_api_version
+        self.save_session(version=zbx_api_version)
 
         return
 
@@ -155,6 +535,8 @@ class HttpApi(HttpApiBase):
         If set option 'zabbix_api_token' use auth by token.
         If set options 'http_login' and 'http_password'
         add basic auth for request.
+        If there is a saved session token, it is checked
+        and reused instead of logging in again.
 
         :param username: username for login
         :type username: str
@@ -169,10 +551,21 @@ class HttpApi(HttpApiBase):
             return
 
         if self.http_login and self.http_password:
-            username = self.connection._options['remote_user']
-            password = self.connection._options['password']
+            # The credentials of Zabbix are replaced with the credentials of basic HTTP authentication,
+            # so they are remembered for logging in again
+            if getattr(self, 'zabbix_credentials', None) is None:
+                self.zabbix_credentials = (self.api_user(), self.connection.get_option('password'))
+            username, password = self.zabbix_credentials
             self.connection.set_option('remote_user', self.http_login)
             self.connection.set_option('password', self.http_password)
+        elif getattr(self, 'zabbix_user', None) is None:
+            self.zabbix_user = username
+
+        session_auth = self.get_session().get('auth')
+        if session_auth and self.check_session(session_auth):
+            self.connection._auth = {'auth': session_auth}
+
+            return
 
         payload = self.build_payload(
             'user.login',
@@ -182,23 +575,64 @@ class HttpApi(HttpApiBase):
 
         if code == 200 and len(response) > 0:
             self.connection._auth = {'auth': response}
+            self.save_session(auth=response)
 
         return
 
+    def check_session(self, session_auth):
+        """
+        Function for checking whether a saved session is still active.
+        The check also prolongs the session.
+
+        :param session_auth: session token
+        :type session_auth: str
+
+        :return: result of checking
+        :rtype: bool
+        """
+        payload = self.build_payload('user.checkAuthentication', sessionid=session_auth)
+        try:
+            code, response = self.send_request(data=payload)
+        except ConnectionError:
+            return False
+
+        return code == 200 and isinstance(response, dict) and response.get('sessionid') == session_auth
+
     def logout(self):
         """
         Function for logout from zabbix
 
         :return: None
         """
-        if self.connection._auth and not self.auth_token:
+        # Sessions stored on disk are reused by the following runs
+        if self.connection._auth and not self.auth_token and getattr(self, 'session_store', None) is None:
             payload = self.build_payload("user.logout")
             self.send_request(data=payload)
+            self.sessions.get(self.session_key(), {}).pop('auth', None)
             self.connection._auth = None
             self.connection._connected = False
 
         return
 
+    def add_auth(self, data, headers):
+        """
+        Function for adding authorization to the request.
+        Depending on the version of Zabbix API, the auth token is added
+        to the payload or to the headers.
+
+        :param data: data for sending
+        :type data: dict
+        :param headers: headers for sending
+        :type headers: dict
+
+        :return: None
+        """
+        if self.connection._auth and data['method'] not in self.methods_wo_auth:
+            if Zabbix_version(self.zbx_api_version) < Zabbix_version('7.2.0'):
+                data['auth'] = self.connection._auth['auth']
+            else:
+                headers['Authorization'] = 'Bearer {0}'.format(self.connection._auth['auth'])
+
     def send_request(self, data, request_method="POST", path="/api_jsonrpc.php"):
         """
         Function for sending request
@@ -216,23 +650,18 @@ class HttpApi(HttpApiBase):
         headers = self.build_headers(data['method'])
 
         # add auth
-        if self.connection._auth and data['method'] not in self.methods_wo_auth:
-            if Zabbix_version(self.zbx_api_version) < Zabbix_version('7.2.0'):
-                data['auth'] = self.connection._auth['auth']
-            else:
-                headers['Authorization'] = 'Bearer {0}'.format(self.connection._auth['auth'])
+        self.add_auth(data, headers)
 
         path = self.url_path + path
         self._display_request(request_method, path)
 
-        response, response_data = self.connection.send(
-            path,
-            json.dumps(data),
-            method=request_method,
-            headers=headers)
+        body = compress_request(json.dumps(data), headers, self.compression)
+        response, response_data, server_time = self._send(data, path, body, request_method, headers)
+        start = time.time()
 
-        value = to_text(response_data.getvalue())
+        value = self._response_to_text(response, response_data)
         result_json = self._response_to_json(value)
+        self._record_request(data, body, response, response_data, server_time, time.time() - start)
 
         if not isinstance(result_json, bool) and 'error' in result_json:
             raise ConnectionError(
@@ -242,6 +671,163 @@ class HttpApi(HttpApiBase):
 
         return response.getcode(), result_json
 
+    def send_batch(self, data, request_method="POST", path="/api_jsonrpc.php"):
+        """
+        Function for sending several requests with one HTTP request (JSON-RPC batch).
+        Errors of separate requests are not raised but returned
+        in the corresponding responses.
+
+        :param data: list of data for sending
+        :type data: list
+        :param request_method: method for sending.
+        :type request_method: str
+        :param path: path for sending.
+        :type path: str
+
+        :return: response code and list of responses
+        :rtype: tuple
+
+        :raise: ConnectionError if the whole batch was rejected or invalid json was received
+        """
+        headers = self.build_headers(data[0]['method'])
+
+        # add auth
+        for each in data:
+            self.add_auth(each, headers)
+
+        path = self.url_path + path
+        self._display_request(request_method, path)
+
+        body = compress_request(json.dumps(data), headers, self.compression)
+        response, response_data, server_time = self._send(data, path, body, request_method, headers)
+        start = time.time()
+
+        value = self._response_to_text(response, response_data)
+        try:
+            result_json = json.loads(value) if value else []
+        except ValueError:
+            raise ConnectionError("Invalid JSON response: {0}".format(value))
+        self._record_request(data, body, response, response_data, server_time, time.time() - start)
+
+        if isinstance(result_json, dict):
+            raise ConnectionError(
+                "REST API returned '{0}' when sending batch of requests: {1}".format(
+                    to_text(result_json.get('error', result_json)),
+                    ', '.join([d['method'] for d in data])))
+
+        return response.getcode(), result_json
+
+    def _send(self, data, path, body, request_method, headers):
+        """
+        Function for sending a request over the connection within the rate limit.
+        Read-only requests failed with a connection error or a transient HTTP error
+        are repeated after a growing delay or the delay requested with Retry-After.
+
+        :param data: data for sending
+        :type data: dict | list
+        :param path: path for sending
+        :type path: str
+        :param body: body for sending
+        :type body: str | bytes
+        :param request_method: method for sending
+        :type request_method: str
+        :param headers: headers for sending
+        :type headers: dict
+
+        :return: response of the connection, body of the response
+            and time of waiting for the response in seconds
+        :rtype: tuple
+
+        :raise:
+            * AnsibleConnectionFailure if the connection failed after all attempts
+            * ConnectionError if the file of the rate limit cannot be used
+        """
+        requests = data if isinstance(data, list) else [data]
+        retries = 0
+        if is_read_only([r['method'] for r in requests]):
+            retries = max(getattr(self, 'retries', 0) or 0, 0)
+
+        for attempt in range(retries + 1):
+            if getattr(self, 'rate_limiter', None) is not None:
+                try:
+                    self.rate_limiter.acquire()
+                except (IOError, OSError) as e:
+                    raise ConnectionError('Failed to use the rate limit file: {0}'.format(to_text(e)))
+
+            start = time.time()
+            code = response_headers = None
+            try:
+                response, response_data = self.connection.send(
+                    path, body, method=request_method, headers=headers)
+            except HTTPError as e:
+                # HTTPError is a subclass of socket.error, but only transient HTTP errors are repeated
+                if attempt >= retries or e.code not in retry_http_codes:
+                    raise
+                code, response_headers = e.code, e.headers
+                error = 'HTTP error {0}'.format(code)
+            except (AnsibleConnectionFailure, socket.error) as e:
+                if attempt >= retries:
+                    raise
+                error = to_text(e)
+            else:
+                if attempt >= retries or response.getcode() not in retry_http_codes:
+                    return response, response_data, time.time() - start
+                code, response_headers = response.getcode(), getattr(response, 'headers', None)
+                error = 'HTTP error {0}'.format(code)
+
+            delay = retry_delay(attempt, self.retry_delay)
+            if code == 429 and retry_after(response_headers) is not None:
+                # The server asks to wait for a given time
+                delay = retry_after(response_headers)
+            self.connection.queue_message(
+                "vvv",
+                "API request {0} failed: {1}. Repeating in {2:.1f} s".format(
+                    ','.join([r['method'] for r in requests]), error, delay))
+            time.sleep(delay)
+
+    def get_request_stats(self, ids):
+        """
+        Function for getting statistics of requests
+
+        :param ids: IDs of requests
+        :type ids: list
+
+        :return: records of the requests, see RequestStats.add
+        :rtype: list
+        """
+        if getattr(self, 'request_stats', None) is None:
+            return []
+
+        return self.request_stats.get(ids)
+
+    def _record_request(self, data, body, response, response_data, server_time, decode_time):
+        """
+        Function for adding a record about a request to the statistics.
+        Requests of a batch are recorded as one request with the ID of the first one.
+
+        :param data: sent data
+        :type data: dict | list
+        :param body: sent body
+        :type body: str | bytes
+        :param response: response of the connection
+        :type response: object
+        :param response_data: body of the response
+        :type response_data: BytesIO
+        :param server_time: time of waiting for the response in seconds
+        :type server_time: float
+        :param decode_time: time of decoding the response in seconds
+        :type decode_time: float
+
+        :return: None
+        """
+        if getattr(self, 'request_stats', None) is None:
+            return
+
+        requests = data if isinstance(data, list) else [data]
+        self.request_stats.add(
+            ','.join([r['method'] for r in requests]), len(body), len(response_data.getvalue()),
+            response.getcode(), server_time, decode_time, reqid=requests[0].get('id'))
+
     def _display_request(self, request_method, path):
         """
         Function for adding message to queue
@@ -258,6 +844,29 @@ class HttpApi(HttpApiBase):
             "API request: {0} {1}/{2}".format(
                 request_method, self.connection._url, path))
 
+    def _response_to_text(self, response, response_data):
+        """
+        Function for getting the text of a response.
+        Compressed responses are decompressed.
+
+        :param response: response of the connection
+        :type response: object
+        :param response_data: body of the response
+        :type response_data: BytesIO
+
+        :return: text of the response
+        :rtype: str
+
+        :raise: ConnectionError if the response cannot be decompressed
+        """
+        encoding = ''
+        if self.compression != 'disabled' and hasattr(response, 'headers'):
+            encoding = response.headers.get('Content-Encoding', '')
+        try:
+            return to_text(decompress_response(response_data.getvalue(), encoding))
+        except Exception as e:
+            raise ConnectionError("Invalid compressed response: {0}".format(to_text(e)))
+
     def _response_to_json(self, response_text):
         """
         Function for transformation response to json
@@ -33,10 +33,47 @@ options:
             - name: ZABBIX_API_TOKEN
     zabbix_api_url:
         type: str
-        required: true
-        description: Path to access Zabbix API.
+        description:
+            - Path to access Zabbix API.
+            - Required if 'zabbix_servers' is not specified.
         env:
             - name: ZABBIX_API_URL
+    zabbix_servers:
+        type: list
+        elements: dict
+        description:
+            - List of Zabbix servers to get hosts from. If specified, 'zabbix_api_url' is ignored.
+            - The servers are requested concurrently with the same filter, output, query and other parameters.
+            - Each host gets the 'server' field with the name of its server, e.g. C(zabbix_server).
+            - Cached hosts of each server are saved separately.
+        suboptions:
+            name:
+                type: str
+                description:
+                    - Name of the server for the 'server' field of its hosts.
+                    - If not specified, the URL is used.
+            zabbix_api_url:
+                type: str
+                required: true
+                description: Path to access Zabbix API of the server.
+            zabbix_user:
+                type: str
+                description: User name for logging in to Zabbix API of the server. If not specified, 'zabbix_user' is used.
+            zabbix_password:
+                type: str
+                description: Password for logging in to Zabbix API of the server. If not specified, 'zabbix_password' is used.
+            zabbix_api_token:
+                type: str
+                description: API token for Zabbix API of the server. If not specified, 'zabbix_api_token' is used.
+    duplicate_hosts:
+        type: str
+        default: first
+        choices: [ first, rename ]
+        description:
+            - How hosts with the same technical name on several servers from 'zabbix_servers' are processed.
+            - C(first) - only the host from the server listed first is added, other hosts are skipped with a warning.
+            - C(rename) - hosts from the servers listed later are added with the name of the server after
+              an underscore, e.g. C(web01_Europe).
     connection_timeout:
         type: int
         default: 10
@@ -45,6 +82,53 @@ options:
         type: bool
         default: true
         description: Whether the connection should be made with validation certificates.
+    keep_alive:
+        type: bool
+        default: false
+        description:
+            - Whether all requests to Zabbix API should be sent over one persistent (keep-alive) connection.
+            - The connection is not reused if requests are sent through an HTTP proxy.
+            - Redirects are not followed over the persistent connection, the request fails instead.
+              HTTPS certificates are validated with the CA certificates of the system only.
+    compression:
+        type: str
+        default: disabled
+        choices: [disabled, responses, all]
+        description:
+            - Compression of data sent to and received from Zabbix API.
+            - C(responses) - request gzip or deflate compressed responses from the web server.
+            - C(all) - also compress request bodies larger than 1 KiB with gzip.
+              The web server must be configured to decompress request bodies (e.g. the DEFLATE input filter of Apache).
+    api_stats_path:
+        type: path
+        description:
+            - Path to a file to append statistics of Zabbix API requests to, one JSON object per line.
+            - Each record contains the method, the sizes of the request and response bodies in bytes, the HTTP status,
+              the time of waiting for the response and the time of decoding it in seconds.
+            - The totals for each method are displayed with verbosity 3 (-vvv) regardless of this option.
+    retries:
+        type: int
+        default: 3
+        description:
+            - Number of times a read-only request (e.g. C(host.get)) is repeated after a connection error
+              or a transient HTTP error (429, 502, 503, 504).
+            - Logging in and logging out are not repeated.
+    retry_delay:
+        type: float
+        default: 1
+        description:
+            - Delay in seconds before repeating a request. The delay is doubled after each failed attempt
+              and randomized, so the requests failed at the same time are not repeated at the same time.
+    rate_limit:
+        type: float
+        default: 0
+        description:
+            - Maximum number of requests per second sent to Zabbix API.
+            - The limit is shared by all processes of the current user sending requests to the same URL,
+              including the connections of the HTTP API plugin of this collection with the same URL.
+            - The state of the limit is kept in the C(ansible-zabbix-<uid>) directory of the temporary directory,
+              which must be accessible by the current user only.
+            - Set to 0 to disable the limit.
     http_proxy:
         type: str
         description: Address of HTTP proxy for connection to Zabbix API.
@@ -54,10 +138,71 @@ options:
     http_password:
         type: str
         description: Password for basic HTTP authorization to Zabbix API.
+    cache_refresh_interval:
+        type: int
+        default: 0
+        description:
+            - Time in seconds after which cached hosts are refreshed incrementally.
+            - During the incremental refresh, only IDs of the matching hosts and the audit log records
+              about changed hosts are requested. Then only new and changed hosts are requested in full,
+              and hosts that no longer match are removed from the cache.
+            - Set 'cache_timeout' to a greater value (or 0) so that the cached hosts are kept for the refresh.
+              All hosts are requested again when the cache expires or when the input parameters change.
+            - Only changes recorded in the audit log as changes of hosts are noticed.
+              If host groups, proxies or templates are changed, all hosts are requested.
+              Changes of proxy groups are not noticed.
+            - Fields changed by Zabbix server without audit log records (C(maintenance_status) and other maintenance fields,
+              C(active_available), C(assigned_proxyid) of hosts and C(available), C(error), C(errors_from), C(disable_until)
+              of interfaces) are not noticed in the audit log, so they are requested for all cached hosts
+              with a separate light request if C(output) or C(selectInterfaces) includes them.
+              Other fields set by Zabbix server are not refreshed, so the refresh is unsafe for them.
+            - If C(query) selects objects other than host groups, templates, interfaces, tags and macros
+              (e.g. C(selectInventory), whose values can be set by items automatically, C(selectItems) or C(selectTriggers)),
+              all hosts are requested instead of the incremental refresh.
+            - Requires permissions to read the audit log. Otherwise, all hosts are requested.
+            - If set to 0, incremental refresh is disabled.
+    batch_size:
+        type: int
+        default: 10
+        description:
+            - Maximum number of requests to Zabbix API combined into one HTTP request (JSON-RPC batch).
+            - Independent requests, such as getting the API version and logging in, or searching
+              for host groups, templates, proxies and hosts by the filter, are sent together.
+            - If set to 1, all requests are sent one by one.
+    page_size:
+        type: int
+        default: 0
+        description:
+            - Number of hosts to request from Zabbix API with one request.
+            - If set, IDs of the matching hosts are requested first, sorted by host ID.
+              Then the full host data is requested in chunks of the specified size,
+              and each chunk is added to the inventory as it arrives.
+            - Use it for large installations to limit the size of responses from Zabbix API.
+            - If set to 0, all hosts are requested with one request.
+    page_workers:
+        type: int
+        default: 1
+        description:
+            - Number of pages of hosts requested from Zabbix API concurrently. Used only with 'page_size'.
+            - Each page is requested with its own connection, so the size of each response
+              is still limited by 'page_size', while the total time is reduced.
+            - At most 'page_workers' pages are requested or wait to be added to the inventory at the same time.
+            - If set to 1, pages are requested one by one.
     prefix:
         type: str
         default: 'zabbix_'
         description: Prefix to use for parameters given from Zabbix API.
+    host_vars_format:
+        type: str
+        default: separate
+        choices: [ separate, compact ]
+        description:
+            - How the data of a host from Zabbix API is stored in the host variables.
+            - C(separate) - each field of the host is stored as a separate variable with the prefix, e.g. C(zabbix_status).
+            - C(compact) - all fields of the host are stored as one dictionary variable named with the prefix
+              and C(data), e.g. C(zabbix_data.status). Only the fields referenced with the prefix in 'compose',
+              'groups' and 'keyed_groups' are also stored as separate variables.
+              Use it for large installations to reduce the memory usage and the time of building the inventory.
     output:
         type: list
         default: ['extend']
@@ -366,6 +511,20 @@ cache_plugin: jsonfile
 cache_timeout: 7200
 cache_connection: /tmp/zabbix_inventory
 
+# PAGING EXAMPLES
+
+# For large installations, hosts can be requested by pages to limit the size of responses.
+# In this example, hosts are requested with their interfaces and tags by 1000 hosts per request.
+---
+plugin: "zabbix.zabbix.zabbix_inventory"
+zabbix_api_url: http://your-zabbix.com
+zabbix_user: Admin
+zabbix_password: zabbix
+query:
+  selectInterfaces: ['ip']
+  selectTags: 'extend'
+page_size: 1000
+
 # COMPLEX EXAMPLES
 
 # In this example, you can use filtering by host group, template, proxy, tag, name, status.
@@ -465,27 +624,109 @@ filter:
 output:
   - status
   - name
+
+# SEVERAL SERVERS EXAMPLE
+
+# To get hosts from several Zabbix servers with one inventory file, you can use the following example.
+# The servers are requested concurrently. Each host gets the 'zabbix_server' variable with the name of its server.
+# If hosts on different servers have the same technical name, the hosts from the servers listed later are renamed.
+---
+plugin: "zabbix.zabbix.zabbix_inventory"
+zabbix_user: Admin
+zabbix_password: zabbix
+zabbix_servers:
+  - name: Europe
+    zabbix_api_url: http://zabbix-eu.example.com
+  - name: America
+    zabbix_api_url: http://zabbix-us.example.com
+    zabbix_api_token: 8ec0d52432c15c91fcafe9888500cf9a607f44091ab554dbee860f6b44fac895
+duplicate_hosts: rename
+keyed_groups:
+  - key: zabbix_server
+    prefix: zabbix
 '''
 
 import base64
+import copy
+import hashlib
 import json
+import zlib
 import os
+import re
+import threading
+import time
+from io import BytesIO
 from uuid import uuid4
 
-from ansible.errors import (AnsibleAuthenticationFailure,
-                            AnsibleConnectionFailure, AnsibleParserError)
-from ansible.module_utils.basic import to_text
+from ansible import constants as C
+from ansible.errors import (AnsibleAuthenticationFailure, AnsibleError,
+                            AnsibleConnectionFailure, AnsibleParserError,
+                            AnsibleUndefinedVariable)
+from ansible.module_utils.basic import to_bytes, to_text
+from ansible.module_utils.compat.version import LooseVersion
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.six import string_types
+from ansible.module_utils.six.moves.urllib.error import HTTPError
 from ansible.module_utils.urls import Request
 from ansible.parsing.yaml.objects import AnsibleUnicode
 from ansible.plugins.inventory import (BaseInventoryPlugin, Cacheable,
                                        Constructable)
+from ansible.release import __version__ as ansible_core_version
+from jinja2.exceptions import TemplateSyntaxError, UndefinedError
+from ansible_collections.zabbix.zabbix.plugins.module_utils.http_session import (
+    HttpSession, compress_request, decompress_response)
 from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import (
-    host_subquery, tags_compare_operators, Zabbix_version, filter_params_depends_on_version)
-from ansible.utils.vars import load_extra_vars
+    host_subquery, tags_compare_operators, tags_match_operators, Zabbix_version,
+    filter_params_depends_on_version, RequestStats, inventory_request_stats, RateLimiter,
+    is_read_only, rate_limit_path, retry_delay, retry_http_codes)
+from ansible.utils.display import Display
+from ansible.utils.unsafe_proxy import wrap_var
+from ansible.utils.vars import combine_vars, load_extra_vars
+
+try:
+    from ansible.template import NON_TEMPLATED_TYPES, _escape_backslashes
+    from ansible.template.vars import AnsibleJ2Vars
+except ImportError:
+    # Expressions are templated by Ansible
+    NON_TEMPLATED_TYPES = _escape_backslashes = AnsibleJ2Vars = None
+
+display = Display()
+
+# Versions of ansible-core whose templating of strings is repeated by
+# InventoryModule.render_template with compiled templates
+COMPILED_TEMPLATES_VERSIONS = (LooseVersion('2.16'), LooseVersion('2.19'))
+
+
+def fail_lookup(name, *args, **kwargs):
+    """
+    Function replacing lookups in the expressions of compose, groups and keyed_groups.
+
+    :param name: name of the lookup
+    :type name: str
+
+    :raises:
+        * AnsibleError: always, lookups are disabled
+    """
+    raise AnsibleError(
+        "The lookup `{0}` was found, however lookups were disabled from templating".format(name))
 
 
 class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     NAME = 'zabbix.zabbix.zabbix_inventory'
+    # Version of the layout of hosts in the cache
+    CACHE_FORMAT = 3
+    # Objects requested with hosts whose changes are recorded in the audit log
+    # as changes of hosts, so they can be refreshed incrementally
+    AUDITED_SELECTS = [
+        'selectHostGroups', 'selectGroups', 'selectParentTemplates',
+        'selectInterfaces', 'selectTags', 'selectMacros']
+    # Types of audit log records: hosts and the objects whose names are included in hosts
+    # (host groups, proxies, templates)
+    AUDIT_HOST = '4'
+    AUDIT_RELATED = ['14', '26', '30']
+    # Fields of hosts and interfaces changed by Zabbix server without audit log records
+    RUNTIME_HOST_FIELDS = ['maintenanceid', 'maintenance_status', 'maintenance_type', 'maintenance_from']
+    RUNTIME_INTERFACE_FIELDS = ['available', 'error', 'errors_from', 'disable_until']
 
     def get_absolute_url(self):
         """
@@ -530,6 +771,8 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         """
         Function for logging into Zabbix.
         If 'zabbix_api_token'option is set, use auth by token.
+        If the API version is unknown and batches are enabled,
+        it is requested with the same HTTP request.
 
         :rtype: str
         :return: string with Authorization information (token)
@@ -553,7 +796,14 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         params = {
             'username': self.args.get('zabbix_user'),
             'password': self.args.get('zabbix_password')}
-        response = self.api_request(method='user.login', params=params)
+
+        # If the API version is unknown, request it together with logging in
+        if hasattr(self, "zabbix_version") is False and (self.args.get('batch_size') or 1) > 1:
+            self.zabbix_version, response = self.api_batch_request([
+                ('apiinfo.version', {}),
+                ('user.login', params)])
+        else:
+            response = self.api_request(method='user.login', params=params)
 
         if len(response) > 0:
             return response
@@ -580,37 +830,30 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         # If token was used
         return True
 
-    def api_request(self, method, params, reqid=str(uuid4())):
+    def build_request(self, method, params, reqid, headers):
         """
-        Function to send a request to Zabbix API.
+        Function to build a request to Zabbix API.
         If the input parameters contain data for basic HTTP authorization,
         then this data will be added to the request header.
 
         :param method: Request method
         :type method: str
-        :param reqid: Unique request ID
-        :type reqid: str
         :param params: Additional request parameters
         :type params: dict
+        :param reqid: Unique request ID
+        :type reqid: str
+        :param headers: Request headers. Authorization headers are added to them.
+        :type headers: dict
 
-        :rtype: str | dict
-        :returns:
-            * Data from the 'result' field from the response from the server
-            * If the 'result' field is not found, then the response will be returned
-              in its original form
+        :rtype: dict
+        :return: payload of the request
 
         :raises:
-            * AnsibleConnectionFailure: If there was an error connecting to the server.
-            * AnsibleParserError:
-                - Error during parse response from Zabbix API. (Invalid JSON)
-                - Any error while parsing the response from the server.
-                - An 'error' field was found in the response from the server.
             * AnsibleAuthenticationFailure: if Basic HTTP auth was used with Zabbix API version >= 7.2.0
         """
         methods_wo_auth = ['apiinfo.version', 'user.login']
 
-        # Build headers and default payload
-        headers = {'Content-Type': 'application/json-rpc', 'Accept': 'application/json'}
+        # Build default payload
         payload = {'jsonrpc': '2.0', 'method': method, 'id': reqid, 'params': params}
 
         # Add Zabbix auth
@@ -632,6 +875,31 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 self.args['http_login'], self.args['http_password']).encode('ascii'))
             headers['Authorization'] = 'Basic {0}'.format(auth.decode('ascii'))
 
+        return payload
+
+    def post_request(self, headers, body):
+        """
+        Function to send one HTTP request to Zabbix API.
+
+        :param headers: Request headers
+        :type headers: dict
+        :param body: Request body
+        :type body: str | bytes
+
+        :rtype: tuple
+        :return: HTTP status, reason, body and content encoding of the response
+
+        :raises:
+            * AnsibleConnectionFailure: If there was an error connecting to the server.
+        """
+        # Use the persistent connection
+        if getattr(self, 'http_session', None) is not None:
+            headers['User-Agent'] = 'Zabbix Inventory Plugin'
+            try:
+                return self.http_session.post(body, headers)
+            except Exception as e:
+                raise AnsibleConnectionFailure(to_text(e))
+
         # Prepare and run query
         zabbix_request = Request(
             http_agent='Zabbix Inventory Plugin',
@@ -639,10 +907,74 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             timeout=self.args['connection_timeout'],
             validate_certs=self.args['validate_certs'])
         try:
-            response = zabbix_request.post(self.zabbix_api_url, data=json.dumps(payload))
+            response = zabbix_request.post(self.zabbix_api_url, data=body)
+            return response.getcode(), '', response.read(), response.headers.get('Content-Encoding', '')
+        except HTTPError as e:
+            return e.code, e.reason, b'', ''
         except Exception as e:
             raise AnsibleConnectionFailure(to_text(e))
 
+    def send_request(self, headers, data):
+        """
+        Function to send data to Zabbix API and parse the response.
+        Read-only requests failed with a connection error or a transient HTTP error
+        are repeated after a growing delay. If the rate limit is set,
+        the request waits for its turn.
+
+        :param headers: Request headers
+        :type headers: dict
+        :param data: Data for sending (one request or list of requests)
+        :type data: dict | list
+
+        :rtype: dict | list
+        :return: parsed response
+
+        :raises:
+            * AnsibleConnectionFailure: If there was an error connecting to the server.
+            * AnsibleParserError:
+                - Error during parse response from Zabbix API. (Invalid JSON)
+                - Any error while parsing the response from the server.
+        """
+        headers = dict(headers)
+        body = compress_request(json.dumps(data), headers, self.args.get('compression'))
+        methods = [r['method'] for r in (data if isinstance(data, list) else [data])]
+        retries = max(self.args.get('retries') or 0, 0) if is_read_only(methods) else 0
+
+        for attempt in range(retries + 1):
+            if getattr(self, 'rate_limiter', None) is not None:
+                try:
+                    self.rate_limiter.acquire()
+                except (IOError, OSError) as e:
+                    raise AnsibleConnectionFailure('Failed to use the rate limit file: {0}'.format(to_text(e)))
+
+            start = time.time()
+            try:
+                status, reason, response, encoding = self.post_request(headers, body)
+            except AnsibleConnectionFailure as e:
+                if attempt >= retries:
+                    raise
+                error = to_text(e)
+            else:
+                if attempt >= retries or status not in retry_http_codes:
+                    break
+                error = 'HTTP Error {0}: {1}'.format(status, reason)
+
+            delay = retry_delay(attempt, self.args.get('retry_delay') or 0)
+            display.vvv('Zabbix API request {0} failed: {1}. Repeating in {2:.1f} s'.format(
+                ','.join(methods), error, delay))
+            time.sleep(delay)
+
+        if status >= 400:
+            raise AnsibleConnectionFailure('HTTP Error {0}: {1}'.format(status, reason))
+
+        server_time = time.time() - start
+        response_bytes = len(response)
+
+        try:
+            response = BytesIO(decompress_response(response, encoding))
+        except Exception as e:
+            raise AnsibleParserError("Error during decompress response from Zabbix API: {0}".format(to_text(e)))
+
         # Parse response
         try:
             result = json.load(response)
@@ -651,11 +983,114 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         except Exception as e:
             raise AnsibleParserError(to_text(e))
 
+        if getattr(self, 'api_stats', None) is not None:
+            self.api_stats.add(
+                ','.join(methods), len(body), response_bytes, status, server_time,
+                time.time() - start - server_time, reqid=(data[0] if isinstance(data, list) else data).get('id'))
+
+        return result
+
+    def api_request(self, method, params, reqid=str(uuid4())):
+        """
+        Function to send a request to Zabbix API.
+        If the input parameters contain data for basic HTTP authorization,
+        then this data will be added to the request header.
+
+        :param method: Request method
+        :type method: str
+        :param reqid: Unique request ID
+        :type reqid: str
+        :param params: Additional request parameters
+        :type params: dict
+
+        :rtype: str | dict
+        :returns:
+            * Data from the 'result' field from the response from the server
+            * If the 'result' field is not found, then the response will be returned
+              in its original form
+
+        :raises:
+            * AnsibleConnectionFailure: If there was an error connecting to the server.
+            * AnsibleParserError:
+                - Error during parse response from Zabbix API. (Invalid JSON)
+                - Any error while parsing the response from the server.
+                - An 'error' field was found in the response from the server.
+            * AnsibleAuthenticationFailure: if Basic HTTP auth was used with Zabbix API version >= 7.2.0
+        """
+        headers = {'Content-Type': 'application/json-rpc', 'Accept': 'application/json'}
+        payload = self.build_request(method, params, reqid, headers)
+
+        result = self.send_request(headers, payload)
+
         if 'error' in result:
             raise AnsibleParserError('Zabbix API returned error: {0}'.format(result['error']))
 
         return result.get('result', result)
 
+    def api_batch_request(self, requests):
+        """
+        Function to send several requests to Zabbix API with one HTTP request (JSON-RPC batch).
+
+        :param requests: list of pairs (method, params)
+        :type requests: list
+
+        :rtype: list
+        :return: data from the 'result' field of each response in the order of requests
+
+        :raises:
+            * AnsibleConnectionFailure: If there was an error connecting to the server.
+            * AnsibleParserError:
+                - Error during parse response from Zabbix API. (Invalid JSON)
+                - Any error while parsing the response from the server.
+                - An 'error' field was found in any response from the server.
+                - A response for any request was not found.
+            * AnsibleAuthenticationFailure: if Basic HTTP auth was used with Zabbix API version >= 7.2.0
+        """
+        headers = {'Content-Type': 'application/json-rpc', 'Accept': 'application/json'}
+        payloads = [
+            self.build_request(method, params, str(uuid4()), headers)
+            for method, params in requests]
+
+        result = self.send_request(headers, payloads)
+
+        # The whole batch was rejected
+        if isinstance(result, dict):
+            raise AnsibleParserError('Zabbix API returned error: {0}'.format(result.get('error', result)))
+
+        # Responses in a batch may come in any order
+        responses = dict((r.get('id'), r) for r in result if isinstance(r, dict))
+        results = []
+        for payload in payloads:
+            response = responses.get(payload['id'])
+            if response is None:
+                raise AnsibleParserError('Zabbix API returned no response for method: {0}'.format(payload['method']))
+            if 'error' in response:
+                raise AnsibleParserError('Zabbix API returned error: {0}'.format(response['error']))
+            results.append(response.get('result'))
+
+        return results
+
+    def api_requests(self, requests):
+        """
+        Function to send independent requests to Zabbix API.
+        Requests are combined into batches of 'batch_size' requests.
+
+        :param requests: list of pairs (method, params)
+        :type requests: list
+
+        :rtype: list
+        :return: results in the order of requests
+        """
+        batch_size = self.args.get('batch_size') or 1
+        if batch_size <= 1 or len(requests) <= 1:
+            return [self.api_request(method=method, params=params) for method, params in requests]
+
+        results = []
+        for i in range(0, len(requests), batch_size):
+            results.extend(self.api_batch_request(requests[i:i + batch_size]))
+
+        return results
+
     def validate_params(self):
         """
         This function checks the input parameters for correctness.
@@ -769,55 +1204,73 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         :return: condition for final host request.
         """
         zabbix_filter = {}
-        subquery_params = {"searchByAny": True, "searchWildcardsEnabled": True}
+        subqueries = []
         self.ids = {'proxy': {}, 'proxy_group': {}}
 
+        def add_subquery(name, method, output, search):
+            subquery_params = {"searchByAny": True, "searchWildcardsEnabled": True}
+            subquery_params['output'] = output
+            subquery_params['search'] = search
+            subqueries.append((name, method, subquery_params))
+
         # Zabbix host groups
         if self.args['filter'].get('hostgroups') is not None:
-            subquery_params['output'] = ["name", "groupid"]
-            subquery_params['search'] = {"name": self.args['filter']['hostgroups']}
-            response = self.api_request(method='hostgroup.get', params=subquery_params)
-            zabbix_filter['groupids'] = [g['groupid'] for g in response]
+            add_subquery('hostgroups', 'hostgroup.get', ["name", "groupid"],
+                         {"name": self.args['filter']['hostgroups']})
 
         # Zabbix templates
         if self.args['filter'].get('templates') is not None:
-            subquery_params['output'] = ["name", "templateid"]
-            subquery_params['search'] = {"name": self.args['filter']['templates']}
-            response = self.api_request(method='template.get', params=subquery_params)
-            zabbix_filter['templateids'] = [t['templateid'] for t in response]
+            add_subquery('templates', 'template.get', ["name", "templateid"],
+                         {"name": self.args['filter']['templates']})
 
         # Zabbix proxies
         if self.args['filter'].get('proxy') is not None:
             param_name = "host" if Zabbix_version(self.zabbix_version) < Zabbix_version('7.0.0') else "name"
-            subquery_params['output'] = [param_name, "proxyid"]
-            subquery_params['search'] = {param_name: self.args['filter']['proxy']}
-            response = self.api_request(method='proxy.get', params=subquery_params)
-            self.ids['proxy'].update({p['proxyid']: p[param_name] for p in response})
-            zabbix_filter['proxyids'] = [p['proxyid'] for p in response]
+            add_subquery('proxy', 'proxy.get', [param_name, "proxyid"],
+                         {param_name: self.args['filter']['proxy']})
 
         # Zabbix proxy groups
         if self.args['filter'].get('proxy_group') is not None:
-            subquery_params['output'] = ["name", "proxy_groupid"]
-            subquery_params['search'] = {"name": self.args['filter']['proxy_group']}
-            response = self.api_request(method='proxygroup.get', params=subquery_params)
-            self.ids['proxy_group'].update({pg['proxy_groupid']: pg['name'] for pg in response})
-            zabbix_filter['proxy_groupids'] = [pg['proxy_groupid'] for pg in response]
+            add_subquery('proxy_group', 'proxygroup.get', ["name", "proxy_groupid"],
+                         {"name": self.args['filter']['proxy_group']})
 
         # Host
         if self.args['filter'].get('host') is not None:
-            subquery_params['output'] = ["host", "hostid"]
-            subquery_params['search'] = {'host': self.args['filter']['host']}
-            response = self.api_request(method='host.get', params=subquery_params)
-            zabbix_filter['hostids'] = [h['hostid'] for h in response]
+            add_subquery('host', 'host.get', ["host", "hostid"],
+                         {'host': self.args['filter']['host']})
+
         # Name
         if self.args['filter'].get('name') is not None:
-            subquery_params['output'] = ["name", "hostid"]
-            subquery_params['search'] = {'name': self.args['filter']['name']}
-            response = self.api_request(method='host.get', params=subquery_params)
+            add_subquery('name', 'host.get', ["name", "hostid"],
+                         {'name': self.args['filter']['name']})
+
+        # All subqueries are independent, so they are sent together
+        responses = dict(zip(
+            [name for name, method, params in subqueries],
+            self.api_requests([(method, params) for name, method, params in subqueries])))
+
+        if 'hostgroups' in responses:
+            zabbix_filter['groupids'] = [g['groupid'] for g in responses['hostgroups']]
+
+        if 'templates' in responses:
+            zabbix_filter['templateids'] = [t['templateid'] for t in responses['templates']]
+
+        if 'proxy' in responses:
+            self.ids['proxy'].update({p['proxyid']: p[param_name] for p in responses['proxy']})
+            zabbix_filter['proxyids'] = [p['proxyid'] for p in responses['proxy']]
+
+        if 'proxy_group' in responses:
+            self.ids['proxy_group'].update({pg['proxy_groupid']: pg['name'] for pg in responses['proxy_group']})
+            zabbix_filter['proxy_groupids'] = [pg['proxy_groupid'] for pg in responses['proxy_group']]
+
+        if 'host' in responses:
+            zabbix_filter['hostids'] = [h['hostid'] for h in responses['host']]
+
+        if 'name' in responses:
             if 'hostids' in zabbix_filter:
-                zabbix_filter['hostids'] = list(set(zabbix_filter['hostids']) & set([h['hostid'] for h in response]))
+                zabbix_filter['hostids'] = list(set(zabbix_filter['hostids']) & set([h['hostid'] for h in responses['name']]))
             else:
-                zabbix_filter['hostids'] = [h['hostid'] for h in response]
+                zabbix_filter['hostids'] = [h['hostid'] for h in responses['name']]
 
         # Status
         if self.args['filter'].get('status') is not None:
@@ -843,6 +1296,39 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         return zabbix_filter
 
+    def get_input_args_fingerprint(self, input_args):
+        """
+        This function calculates the hash of the input parameters that may affect the data:
+        URL, user, output, query and filter. The parameters are normalized,
+        so the order of the list elements and the case of the query names do not matter.
+        The hash is used as the cache key, which can be read by other users of the cache,
+        so the password is not hashed. The API token is replaced with its own hash,
+        as the cache keys of the httpapi plugin.
+
+        :param input_args: input arguments
+        :type input_args: dict
+
+        :rtype: str
+        :return: SHA-256 hash in hex format
+        """
+        def canonical(value):
+            if isinstance(value, (list, tuple)):
+                items = dict((json.dumps(e, sort_keys=True), e) for e in value)
+                return [items[key] for key in sorted(items)]
+            return value
+
+        user = input_args.get('zabbix_user')
+        if input_args.get('zabbix_api_token'):
+            user = 'token:{0}'.format(hashlib.sha256(to_bytes(input_args['zabbix_api_token'])).hexdigest())
+
+        normalized = {
+            'connection': [input_args.get('zabbix_api_url'), user],
+            'output': canonical(input_args.get('output') or []),
+            'query': dict((key.lower(), canonical(value)) for key, value in (input_args.get('query') or {}).items()),
+            'filter': dict((key, canonical(value)) for key, value in (input_args.get('filter') or {}).items())}
+
+        return hashlib.sha256(to_bytes(json.dumps(normalized, sort_keys=True))).hexdigest()
+
     def compare_cached_input_args(self, old_input_args):
         """
         This function compares the current input parameters
@@ -859,45 +1345,81 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             * True - If all current input parameters match those in the cache.
             * False - If any of the parameters affecting the data has been changed.
         """
+        return self.get_input_args_fingerprint(old_input_args) == self.get_input_args_fingerprint(self.args)
 
-        # Check simple parameters
-        for parameter in ['zabbix_user', 'zabbix_password', 'zabbix_api_token', 'zabbix_api_url']:
-            if self.args.get(parameter) != old_input_args.get(parameter):
-                return False
+    def pack_hosts(self, zabbix_hosts):
+        """
+        The function converts hosts to the compact layout for the cache.
+        Hosts are stored as columns: the list of fields and a list of values for each host.
+        The result is compressed JSON encoded with base64, so the cache plugin
+        stores one string instead of a large structure.
 
-        # output
-        if len(list(set(self.args.get('output', [])) ^ set(old_input_args.get('output', [])))) != 0:
-            return False
+        :param zabbix_hosts: hosts from Zabbix API
+        :type zabbix_hosts: list
 
-        # query
-        old_query = dict((e.lower(), old_input_args['query'][e]) for e in old_input_args.get('query', {}))
-        new_query = dict((e.lower(), self.args['query'][e]) for e in self.args.get('query', {}))
-        if len(list(set(new_query) ^ set(old_query))) != 0:
-            return False
-        for key in new_query:
-            if len(list(set(new_query[key]) ^ set(old_query[key]))) != 0:
-                return False
-
-        # filter
-        old_filter_keys = old_input_args.get('filter', {}).keys()
-        new_filter_keys = self.args.get('filter', {}).keys()
-        if len(list(set(new_filter_keys) ^ set(old_filter_keys))) != 0:
-            return False
-        for key in self.args.get('filter', {}):
-            if key == 'status' or key == 'tags_behavior':
-                if self.args['filter'][key] != old_input_args['filter'][key]:
-                    return False
-            elif key == 'tags':
-                for tag in old_input_args['filter'][key] + self.args['filter'][key]:
-                    if tag not in old_input_args['filter'][key] or tag not in self.args['filter'][key]:
-                        return False
-            elif key in ['hostgroups', 'templates', 'proxy', 'proxy_group', 'name', 'host']:
-                if len(list(set(self.args['filter'][key]) ^ set(old_input_args['filter'][key]))) != 0:
-                    return False
+        :rtype: str
+        :return: packed hosts
+        """
+        fields = []
+        for host in zabbix_hosts:
+            for field in host:
+                if field not in fields:
+                    fields.append(field)
+        # Hosts with other fields are stored with their own list of fields
+        rows = []
+        for host in zabbix_hosts:
+            if len(host) == len(fields):
+                rows.append([host[field] for field in fields])
+            else:
+                rows.append({'fields': list(host), 'values': list(host.values())})
 
-        return True
+        data = json.dumps({'fields': fields, 'rows': rows}, separators=(',', ':'))
+        return to_text(base64.b64encode(zlib.compress(data.encode('utf-8'))))
 
-    def resolve_id_to_names(self):
+    def unpack_hosts(self, packed_hosts):
+        """
+        The function converts hosts from the compact layout of the cache.
+
+        :param packed_hosts: packed hosts
+        :type packed_hosts: str
+
+        :rtype: list
+        :return: hosts
+
+        :raises:
+            * ValueError: If the data is corrupted.
+        """
+        try:
+            data = json.loads(zlib.decompress(base64.b64decode(packed_hosts)).decode('utf-8'))
+        except (TypeError, zlib.error) as e:
+            raise ValueError(str(e))
+
+        fields = data['fields']
+        return [
+            dict(zip(row['fields'], row['values'])) if isinstance(row, dict) else dict(zip(fields, row))
+            for row in data['rows']]
+
+    def read_cached_hosts(self, cached_data):
+        """
+        The function reads hosts saved in the cache with the compact layout.
+
+        :param cached_data: header of the cached data
+        :type cached_data: dict
+
+        :rtype: list|None
+        :return: hosts or None, if they are missing in the cache or are in an unknown format.
+        """
+        if cached_data.get('format') != self.CACHE_FORMAT:
+            return None
+        try:
+            zabbix_hosts = self.unpack_hosts(self._cache[cached_data['hosts_key']])
+        except (KeyError, ValueError):
+            return None
+        if len(zabbix_hosts) != cached_data.get('hosts_count'):
+            return None
+        return zabbix_hosts
+
+    def resolve_id_to_names(self, zabbix_hosts=None):
         """
         The function resolves IDs to names and adds them to the output
         as additional parameters. If a name for any ID is not found among
@@ -907,8 +1429,13 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             - proxyid -> proxy_name
             - proxy_groupid -> proxy_group_name
 
+        :param zabbix_hosts: hosts to process. By default, self.zabbix_hosts.
+        :type zabbix_hosts: list
+
         :return: None
         """
+        if zabbix_hosts is None:
+            zabbix_hosts = self.zabbix_hosts
 
         if hasattr(self, 'ids') is False:
             self.ids = {'proxy': {}, 'proxy_group': {}}
@@ -917,7 +1444,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         proxy_param_name = "host" if Zabbix_version(self.zabbix_version) < Zabbix_version('7.0.0') else "name"
         proxy_field_name = "proxy_hostid" if Zabbix_version(self.zabbix_version) < Zabbix_version('7.0.0') else "proxyid"
         if 'extend' in self.args.get('output') or proxy_field_name in self.args.get('output'):
-            host_proxy_ids = [h.get(proxy_field_name, '0') for h in self.zabbix_hosts]
+            host_proxy_ids = [h.get(proxy_field_name, '0') for h in zabbix_hosts]
             request_ids = list(set(host_proxy_ids) - set(self.ids['proxy'].keys()) - set(['0']))
             if len(request_ids) > 0:
                 response = self.api_request(
@@ -929,7 +1456,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         # find all proxy_groupid in self.zabbix_host and request missing proxy_group
         if 'extend' in self.args.get('output') or 'proxy_groupid' in self.args.get('output'):
-            host_proxy_groupid_ids = [h.get('proxy_groupid', '0') for h in self.zabbix_hosts]
+            host_proxy_groupid_ids = [h.get('proxy_groupid', '0') for h in zabbix_hosts]
             request_ids = list(set(host_proxy_groupid_ids) - set(self.ids['proxy_group'].keys()) - set(['0']))
             if len(request_ids) > 0:
                 response = self.api_request(
@@ -939,15 +1466,550 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                         'proxy_groupids': request_ids})
                 self.ids['proxy_group'].update({pg['proxy_groupid']: pg['name'] for pg in response})
 
-        for i, host in enumerate(self.zabbix_hosts):
+        for i, host in enumerate(zabbix_hosts):
 
             # resolve proxy name
             if proxy_field_name in host:
-                self.zabbix_hosts[i]['proxy_name'] = self.ids['proxy'].get(host[proxy_field_name], '')
+                zabbix_hosts[i]['proxy_name'] = self.ids['proxy'].get(host[proxy_field_name], '')
 
             # # resolve proxy group name
             if 'proxy_groupid' in host:
-                self.zabbix_hosts[i]['proxy_group_name'] = self.ids['proxy_group'].get(host['proxy_groupid'], '')
+                zabbix_hosts[i]['proxy_group_name'] = self.ids['proxy_group'].get(host['proxy_groupid'], '')
+
+    def get_zabbix_hostids(self):
+        """
+        The function requests IDs of the hosts matching the query, sorted by host ID.
+
+        :rtype: list
+        :return: IDs of hosts
+        """
+        # Linked objects are not required to get IDs of hosts
+        id_query = dict((k, v) for k, v in self.query.items() if not k.startswith('select'))
+        id_query['output'] = ['hostid']
+        id_query['sortfield'] = 'hostid'
+
+        return [h['hostid'] for h in self.api_request('host.get', params=id_query)]
+
+    def get_zabbix_hosts_by_pages(self, hostids=None):
+        """
+        The function requests hosts from Zabbix by pages.
+        First, only IDs of the hosts matching the query are requested.
+        Then the hosts are requested in chunks of 'page_size' IDs,
+        so the size of each response is limited.
+        If 'page_workers' is greater than 1, several pages are requested concurrently.
+
+        :param hostids: IDs of hosts to request. By default, all hosts matching the query.
+        :type hostids: list
+
+        :rtype: generator
+        :return: lists of hosts in the order of pages
+        """
+        if hostids is None:
+            hostids = self.get_zabbix_hostids()
+
+        if not hostids:
+            return
+
+        page_size = self.args.get('page_size') or len(hostids)
+        pages = [hostids[i:i + page_size] for i in range(0, len(hostids), page_size)]
+        workers = min(self.args.get('page_workers') or 1, len(pages))
+        if workers <= 1:
+            for page in pages:
+                yield self.get_zabbix_hosts_page(page)
+        else:
+            for page in self.get_zabbix_hosts_pages_concurrently(pages, workers):
+                yield page
+
+    def get_zabbix_hosts_page(self, hostids):
+        """
+        The function requests one page of hosts.
+
+        :param hostids: IDs of hosts of the page
+        :type hostids: list
+
+        :rtype: list
+        :return: hosts
+        """
+        page_query = dict(self.query)
+        page_query['hostids'] = hostids
+        page_query['sortfield'] = 'hostid'
+        return self.api_request('host.get', params=page_query)
+
+    def get_zabbix_hosts_pages_concurrently(self, pages, workers):
+        """
+        The function requests pages of hosts with several threads.
+        Each thread uses its own copy of the plugin with its own connection,
+        and requests the next page when the previous one is received.
+        Pages are returned in their order as soon as they are received.
+        A page takes one of 'workers' slots from its request until the consumer
+        asks for the next page, so at most 'workers' pages are requested or kept in memory.
+
+        :param pages: lists of host IDs
+        :type pages: list
+        :param workers: number of threads
+        :type workers: int
+
+        :rtype: generator
+        :return: lists of hosts in the order of pages
+
+        :raises:
+            * AnsibleConnectionFailure, AnsibleParserError: If any page could not be requested.
+        """
+        results = [None] * len(pages)
+        errors = [None] * len(pages)
+        received = [threading.Event() for page in pages]
+        next_pages = iter(range(len(pages)))
+        lock = threading.Lock()
+        slots = threading.Semaphore(workers)
+        stop = threading.Event()
+
+        def work(page_inventory):
+            try:
+                while True:
+                    slots.acquire()
+                    if stop.is_set():
+                        return
+                    with lock:
+                        index = next(next_pages, None)
+                    if index is None:
+                        return
+                    try:
+                        results[index] = page_inventory.get_zabbix_hosts_page(pages[index])
+                    except Exception as e:
+                        errors[index] = e
+                    received[index].set()
+            finally:
+                if getattr(page_inventory, 'http_session', None) is not None:
+                    page_inventory.http_session.close()
+
+        threads = []
+        for i in range(workers):
+            page_inventory = copy.copy(self)
+            if getattr(self, 'http_session', None) is not None:
+                page_inventory.http_session = HttpSession(
+                    self.zabbix_api_url,
+                    timeout=self.args['connection_timeout'],
+                    validate_certs=self.args['validate_certs'])
+            threads.append(threading.Thread(target=work, args=(page_inventory,)))
+        for thread in threads:
+            thread.start()
+
+        try:
+            for index in range(len(pages)):
+                received[index].wait()
+                if errors[index] is not None:
+                    raise errors[index]
+                page = results[index]
+                results[index] = None
+                yield page
+                slots.release()
+        finally:
+            stop.set()
+            # Threads waiting for a slot are woken up to stop
+            for thread in threads:
+                slots.release()
+            for thread in threads:
+                thread.join()
+
+    def get_audit_clock(self):
+        """
+        The function requests the time of the last record in the audit log.
+        It is used as a marker for the next incremental refresh of the cache.
+
+        :rtype: str | None
+        :return: time of the last record or None, if the audit log is not available
+        """
+        try:
+            records = self.api_request('auditlog.get', params={
+                'output': ['clock'],
+                'sortfield': 'clock',
+                'sortorder': 'DESC',
+                'limit': 1})
+        except AnsibleParserError:
+            return None
+
+        return records[0]['clock'] if records else '0'
+
+    def can_refresh_incrementally(self):
+        """
+        The function checks whether the hosts can be refreshed incrementally.
+        Changes of other objects requested with hosts (e.g. items, triggers or
+        values of the automatic inventory) are not recorded in the audit log as
+        changes of hosts, so all hosts are requested if the query selects them.
+
+        :rtype: bool
+        :return: result of checking
+        """
+        return all(
+            not each.startswith('select') or each in self.AUDITED_SELECTS
+            for each in (self.args.get('query') or {}))
+
+    def refresh_zabbix_hosts(self, cached_hosts, audit_clock):
+        """
+        The function refreshes cached hosts incrementally.
+        IDs of the hosts matching the query and IDs of hosts changed since
+        the last refresh (according to the audit log) are requested.
+        Only new and changed hosts are requested in full,
+        hosts that no longer match the query are dropped.
+        If host groups, proxies or templates were changed, e.g. renamed,
+        all hosts are requested in full.
+
+        :param cached_hosts: hosts from cache
+        :type cached_hosts: list
+        :param audit_clock: time of the last audit log record at the last refresh
+        :type audit_clock: str
+
+        :rtype: list
+        :return: refreshed hosts
+        """
+        hostids = self.get_zabbix_hostids()
+        records = self.api_request('auditlog.get', params={
+            'output': ['resourceid', 'resourcetype'],
+            'filter': {'resourcetype': [self.AUDIT_HOST] + self.AUDIT_RELATED},
+            'time_from': audit_clock})
+        changed_hostids = set(r['resourceid'] for r in records if str(r.get('resourcetype', self.AUDIT_HOST)) == self.AUDIT_HOST)
+
+        hosts = dict((h['hostid'], h) for h in cached_hosts)
+        if len(changed_hostids) < len(records):
+            # Names of related objects can be changed in all hosts
+            hosts = {}
+        request_ids = [h for h in hostids if h not in hosts or h in changed_hostids]
+        self.refresh_runtime_fields(hosts, [h for h in hostids if h in hosts and h not in changed_hostids])
+        for page in self.get_zabbix_hosts_by_pages(request_ids):
+            self.resolve_id_to_names(page)
+            hosts.update((h['hostid'], h) for h in page)
+
+        return [hosts[h] for h in hostids if h in hosts]
+
+    def get_runtime_fields(self):
+        """
+        The function returns the requested fields of hosts and interfaces
+        that are changed by Zabbix server without audit log records,
+        e.g. availability of interfaces or maintenance status.
+
+        :rtype: tuple
+        :return: lists of fields of hosts and of interfaces
+        """
+        host_fields = list(self.RUNTIME_HOST_FIELDS)
+        if Zabbix_version(self.zabbix_version) >= Zabbix_version('6.4.0'):
+            host_fields.append('active_available')
+        if Zabbix_version(self.zabbix_version) >= Zabbix_version('7.0.0'):
+            host_fields.append('assigned_proxyid')
+        output = self.query.get('output')
+        if output != 'extend':
+            host_fields = [f for f in host_fields if f in (output or [])]
+
+        interface_fields = []
+        select_interfaces = self.query.get('selectInterfaces')
+        if select_interfaces == 'extend':
+            interface_fields = list(self.RUNTIME_INTERFACE_FIELDS)
+        elif isinstance(select_interfaces, list):
+            interface_fields = [f for f in self.RUNTIME_INTERFACE_FIELDS if f in select_interfaces]
+
+        return host_fields, interface_fields
+
+    def refresh_runtime_fields(self, hosts, hostids):
+        """
+        The function refreshes fields of cached hosts that are changed
+        without audit log records. Only these fields are requested
+        in chunks of 'page_size' IDs, so the request is cheap.
+
+        :param hosts: cached hosts by IDs, updated in place
+        :type hosts: dict
+        :param hostids: IDs of hosts to refresh
+        :type hostids: list
+
+        :return: None
+        """
+        host_fields, interface_fields = self.get_runtime_fields()
+        if not hostids or not (host_fields or interface_fields):
+            return
+
+        params = {'output': ['hostid'] + host_fields}
+        if interface_fields:
+            params['selectInterfaces'] = ['interfaceid'] + interface_fields
+        page_size = self.args.get('page_size') or len(hostids)
+        for i in range(0, len(hostids), page_size):
+            params['hostids'] = hostids[i:i + page_size]
+            for runtime in self.api_request('host.get', params=dict(params)):
+                host = hosts.get(runtime['hostid'])
+                if host is None:
+                    continue
+                host.update((f, runtime[f]) for f in host_fields if f in runtime)
+                if not interface_fields or not isinstance(host.get('interfaces'), list):
+                    continue
+                interfaces = dict((each['interfaceid'], each) for each in runtime.get('interfaces', []))
+                for index, interface in enumerate(host['interfaces']):
+                    # Without IDs in the cache, interfaces are matched by their order
+                    if 'interfaceid' in interface:
+                        fresh = interfaces.get(interface['interfaceid'], {})
+                    elif index < len(runtime.get('interfaces', [])):
+                        fresh = runtime['interfaces'][index]
+                    else:
+                        fresh = {}
+                    interface.update((f, fresh[f]) for f in interface_fields if f in fresh)
+
+    def add_zabbix_hosts(self, zabbix_hosts):
+        """
+        The function adds hosts with their variables to the inventory
+        and applies compose, groups and keyed_groups to them.
+
+        :param zabbix_hosts: hosts from Zabbix API
+        :type zabbix_hosts: list
+
+        :return: None
+        """
+        keyed_groups = self.args.get('keyed_groups')
+        strict = self.args.get('strict')
+        groups = self.args.get('groups')
+        compose = self.args.get('compose')
+        compact = self.args.get('host_vars_format') == 'compact'
+        if compact:
+            expanded_fields = self.get_referenced_fields()
+
+        for host in zabbix_hosts:
+
+            # Add data about host to inventory
+            self.inventory.add_host(host['host'])
+            if compact:
+                self.inventory.set_variable(host['host'], '{0}data'.format(self.args['prefix']), host)
+                fields = [each for each in host if each in expanded_fields]
+            else:
+                fields = host
+            for each in fields:
+                self.inventory.set_variable(
+                    host['host'],
+                    '{0}{1}'.format(self.args['prefix'], each),
+                    host[each])
+
+            # added for compose vars, keyed-groups, and composed groups
+            if compose:
+                self._set_composite_vars(
+                    compose,
+                    self.inventory.get_host(host['host']).get_vars(),
+                    host['host'],
+                    strict=strict)
+            self._add_host_to_composed_groups(groups, dict(), host['host'], strict=strict)
+            self._add_host_to_keyed_groups(keyed_groups, dict(), host['host'], strict=strict)
+
+    def can_compile_templates(self):
+        """
+        The function checks whether expressions can be compiled by the plugin
+        with the Jinja2 environment of the templar. The plugin repeats the templating
+        of strings by ansible-core, so only the known versions of ansible-core are used.
+        Otherwise, the expressions are templated by Ansible.
+
+        :rtype: bool
+        :return: result of checking
+        """
+        if AnsibleJ2Vars is None or getattr(self.templar, 'environment', None) is None:
+            return False
+        min_version, max_version = COMPILED_TEMPLATES_VERSIONS
+        return min_version <= LooseVersion(ansible_core_version) < max_version
+
+    def get_compiled_template(self, source):
+        """
+        The function compiles a template with the Jinja2 environment of the templar.
+        Compiled templates are cached by their source, so each expression of compose,
+        groups and keyed_groups is compiled once for all hosts.
+
+        :param source: template
+        :type source: str
+
+        :rtype: tuple
+        :return: template with escaped backslashes and the compiled template,
+                 or None instead of the compiled template if Ansible returns
+                 the template as is
+
+        :raises:
+            * AnsibleError: if the template is invalid
+        """
+        environment = self.templar.environment
+
+        # Templates compiled with another environment are not reused
+        if getattr(self, 'templates_environment', None) is not environment:
+            self.templates_environment = environment
+            self.compiled_templates = {}
+
+        if source not in self.compiled_templates:
+            data = _escape_backslashes(source, environment)
+            try:
+                compiled = environment.from_string(data)
+            except (TemplateSyntaxError, SyntaxError) as e:
+                raise AnsibleError('template error while templating string: {0}. String: {1}'.format(
+                    to_text(e), to_text(data)), orig_exc=e)
+            except Exception as e:
+                if 'recursion' in to_text(e):
+                    raise AnsibleError('recursive loop detected in template string: {0}'.format(to_text(data)), orig_exc=e)
+                compiled = None
+            self.compiled_templates[source] = (data, compiled)
+        return self.compiled_templates[source]
+
+    def render_template(self, source, variables, disable_lookups=False):
+        """
+        The function renders a template with the variables of a host
+        in the same way as Templar.template of ansible-core.
+        Ansible parses and compiles a template each time it is templated,
+        so the template is compiled once, see get_compiled_template,
+        and the compiled template is rendered for each host.
+
+        :param source: template
+        :type source: str
+        :param variables: variables of the host
+        :type variables: dict
+        :param disable_lookups: whether lookups are not allowed in the template
+        :type disable_lookups: bool
+
+        :return: result of the template
+
+        :raises:
+            * AnsibleError: if the template is invalid
+            * AnsibleUndefinedVariable: if the template uses an undefined variable
+        """
+        # Unsafe strings are not templated
+        if hasattr(source, '__UNSAFE__'):
+            return source
+
+        templar = self.templar
+        templar.available_variables = variables
+
+        # A template referencing one variable returns the variable without changing its type
+        only_one = templar.SINGLE_VAR.match(source)
+        if only_one and only_one.group(1) in variables:
+            value = variables[only_one.group(1)]
+            if isinstance(value, NON_TEMPLATED_TYPES):
+                return value
+            elif value is None:
+                return C.DEFAULT_NULL_REPRESENTATION
+
+        data, compiled = self.get_compiled_template(source)
+        if compiled is None:
+            return data
+
+        # The compiled template is not changed, so it is used with and without lookups
+        template_globals = compiled.globals
+        if disable_lookups:
+            template_globals = dict(template_globals, query=fail_lookup, q=fail_lookup, lookup=fail_lookup)
+
+        cached_context = templar.cur_context
+        templar.cur_context = compiled.new_context(AnsibleJ2Vars(templar, template_globals), shared=True)
+        try:
+            try:
+                result = templar.environment.__class__.concat(compiled.root_render_func(templar.cur_context))
+                if getattr(templar.cur_context, 'unsafe', False):
+                    result = wrap_var(result)
+                return result
+            except TypeError as e:
+                if 'AnsibleUndefined' in to_text(e):
+                    raise AnsibleUndefinedVariable(
+                        "Unable to look up a name or access an attribute in template string ({0}).\n"
+                        "Make sure your variable name does not contain invalid characters like '-': {1}".format(
+                            to_text(data), to_text(e)), orig_exc=e)
+                raise AnsibleError('Unexpected templating type error occurred on ({0}): {1}'.format(
+                    to_text(data), to_text(e)), orig_exc=e)
+            finally:
+                templar.cur_context = cached_context
+        except (UndefinedError, AnsibleUndefinedVariable) as e:
+            if templar._fail_on_undefined_errors:
+                if isinstance(e, AnsibleUndefinedVariable):
+                    raise
+                raise AnsibleUndefinedVariable(e)
+            display.debug('Ignoring undefined failure: {0}'.format(to_text(e)))
+            return data
+
+    def _compose(self, template, variables, disable_lookups=True):
+        """
+        The function evaluates an expression of compose or keyed_groups for a host.
+        The expression is compiled once for all hosts, see render_template.
+
+        :param template: expression without delimiters
+        :type template: str
+        :param variables: variables of the host
+        :type variables: dict
+        :param disable_lookups: whether lookups are not allowed in the expression
+        :type disable_lookups: bool
+
+        :return: result of the expression
+        """
+        if not self.can_compile_templates() or not isinstance(template, string_types):
+            return super(InventoryModule, self)._compose(template, variables, disable_lookups=disable_lookups)
+
+        try:
+            use_extra = self.get_option('use_extra_vars')
+        except Exception:
+            use_extra = False
+        if use_extra:
+            variables = combine_vars(variables, self._vars)
+
+        environment = self.templar.environment
+        return self.render_template(
+            '{0}{1}{2}'.format(environment.variable_start_string, template, environment.variable_end_string),
+            variables, disable_lookups=disable_lookups)
+
+    def _add_host_to_composed_groups(self, groups, variables, host, strict=False, fetch_hostvars=True):
+        """
+        The function adds the host to the groups whose conditions are true for the host.
+        The conditions are compiled once for all hosts, see render_template.
+
+        :param groups: conditions of groups by names of groups
+        :type groups: dict
+        :param variables: additional variables
+        :type variables: dict
+        :param host: name of the host
+        :type host: str
+        :param strict: whether an invalid condition is an error
+        :type strict: bool
+        :param fetch_hostvars: whether the variables of the host are used
+        :type fetch_hostvars: bool
+
+        :return: None
+
+        :raises:
+            * AnsibleParserError: if a condition is invalid and 'strict' is enabled
+        """
+        if not self.can_compile_templates():
+            return super(InventoryModule, self)._add_host_to_composed_groups(
+                groups, variables, host, strict=strict, fetch_hostvars=fetch_hostvars)
+
+        if groups and isinstance(groups, dict):
+            if fetch_hostvars:
+                variables = combine_vars(variables, self.inventory.get_host(host).get_vars())
+            for group_name in groups:
+                conditional = "{%% if %s %%} True {%% else %%} False {%% endif %%}" % groups[group_name]
+                group_name = self._sanitize_group_name(group_name)
+                try:
+                    result = boolean(self.render_template(conditional, variables))
+                except Exception as e:
+                    if strict:
+                        raise AnsibleParserError("Could not add host {0} to group {1}: {2}".format(host, group_name, to_text(e)))
+                    continue
+
+                if result:
+                    # ensure group exists, use sanitized name
+                    group_name = self.inventory.add_group(group_name)
+                    # add host to group
+                    self.inventory.add_child(group_name, host)
+
+    def get_referenced_fields(self):
+        """
+        The function finds the fields of hosts referenced with the prefix
+        in the expressions of compose, groups and keyed_groups,
+        e.g. 'status' for the expression 'zabbix_status == "0"'.
+
+        :rtype: set
+        :return: names of fields without the prefix
+        """
+        expressions = list((self.args.get('compose') or {}).values())
+        expressions.extend((self.args.get('groups') or {}).values())
+        for keyed_group in self.args.get('keyed_groups') or []:
+            expressions.extend([keyed_group.get('key'), keyed_group.get('parent_group')])
+
+        pattern = re.compile(r'\b{0}(\w+)'.format(re.escape(self.args['prefix'])))
+        fields = set()
+        for expression in expressions:
+            if isinstance(expression, string_types):
+                fields.update(pattern.findall(expression))
+        return fields
 
     def resolve_extra_vars(self):
         """
@@ -964,71 +2026,86 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         if extra_vars and self.templar.is_template(self.args) and self.args.get('use_extra_vars') is True:
             self.args = self.templar.template(self.args)
 
+    def filter_hosts_by_tags(self, zabbix_hosts, tags):
+        """
+        The function applies strict "AND" logic of tag conditions to hosts.
+        Tags of each host are indexed once, then all conditions are checked
+        against the index.
+
+        :param zabbix_hosts: hosts with tags from Zabbix API
+        :type zabbix_hosts: list
+        :param tags: tag conditions from the filter
+        :type tags: list
+
+        :rtype: list
+        :return: hosts matching all conditions
+        """
+        conditions = [
+            (t['tag'], tags_match_operators[t.get('operator', 'contains')], str(t.get('value', '')))
+            for t in tags]
+
+        result = []
+        for host in zabbix_hosts:
+            host_tags = {}
+            for htag in host.get('tags', []):
+                host_tags.setdefault(htag['tag'], set()).add(htag['value'])
+
+            if all(match(host_tags.get(tag), value) for tag, match, value in conditions):
+                result.append(host)
+
+        return result
+
     def preload_data(self):
         """
         The function preloads data from Zabbix in order to perform
         additional actions if required.
 
+        Hosts matching the strict "AND" tag logic are saved to 'self.preloaded_hosts',
+        so they are not requested again. In case of requesting hosts by pages
+        or refreshing the cache incrementally, only IDs and tags are preloaded.
+
         :return: None
         """
+        self.preloaded_hosts = None
+        if hasattr(self, 'refresh_cache') is False:
+            self.refresh_cache = False
+
         # Resolve strict "AND" logic
         #
-        # This part of the code will load hosts from Zabbix
-        # and apply strict "AND" filtering logic to them.
+        # The tag conditions of the query narrow the hosts on the server side
+        # ('AND/OR' logic). This part of the code applies strict "AND" logic to them.
         if (self.args['filter'].get('tags_behavior') is not None and
                 self.args['filter']['tags_behavior'].lower() == 'and'):
 
-            # replace the "output" field to receive only hostid and tags
+            user_select_tags = self.query.get('selectTags')
             preload_query = dict(self.query)
-            preload_query['output'] = ['hostid', 'tags']
-            preload_query['selectTags'] = 'extend'
-            zabbix_preload_hosts = self.api_request('host.get', params=preload_query)
-
-            # set of the resulting hostids
-            hostids = set([h['hostid'] for h in zabbix_preload_hosts])
-
-            # process tags from inventory file
-            for tag in self.args['filter']['tags']:
-                for host in zabbix_preload_hosts:
-
-                    # Check that this host still in set
-                    if host['hostid'] not in hostids:
-                        continue
-
-                    if tag['operator'] == 'exists':
-                        if tag['tag'] not in [t['tag'] for t in host['tags']]:
-                            hostids.remove(host['hostid'])
-
-                    elif tag['operator'] == 'not exists':
-                        if tag['tag'] in [t['tag'] for t in host['tags']]:
-                            hostids.remove(host['hostid'])
-
-                    elif tag['operator'] == 'equals':
-                        for htag in host['tags']:
-                            if htag['tag'] == tag['tag'] and htag['value'] == str(tag['value']):
-                                break
-                        else:
-                            hostids.remove(host['hostid'])
-
-                    elif tag['operator'] == 'contains':
-                        for htag in host['tags']:
-                            if htag['tag'] == tag['tag'] and str(tag['value']) in htag['value']:
-                                break
-                        else:
-                            hostids.remove(host['hostid'])
-
-                    elif tag['operator'] == 'not equal':
-                        for htag in host['tags']:
-                            if htag['tag'] == tag['tag'] and htag['value'] == str(tag['value']):
-                                hostids.remove(host['hostid'])
-
-                    elif tag['operator'] == 'not like':
-                        for htag in host['tags']:
-                            if htag['tag'] == tag['tag'] and str(tag['value']) in htag['value']:
-                                hostids.remove(host['hostid'])
+            if self.args.get('page_size') or self.refresh_cache:
+                # receive only hostid and tags, hosts will be requested by IDs
+                preload_query = dict((k, v) for k, v in preload_query.items() if not k.startswith('select'))
+                preload_query['output'] = ['hostid']
+                preload_query['selectTags'] = ['tag', 'value']
+            elif user_select_tags != 'extend':
+                preload_query['selectTags'] = sorted(set(user_select_tags or []) | set(['tag', 'value']))
+
+            zabbix_preload_hosts = self.filter_hosts_by_tags(
+                self.api_request('host.get', params=preload_query),
+                self.args['filter']['tags'])
 
             # add resulting hostids
-            self.query['hostids'] = list(hostids)
+            self.query = dict(self.query)
+            self.query['hostids'] = [h['hostid'] for h in zabbix_preload_hosts]
+
+            if not self.args.get('page_size') and not self.refresh_cache:
+                # remove tags and fields of tags if they were not requested
+                if user_select_tags is None:
+                    for host in zabbix_preload_hosts:
+                        host.pop('tags', None)
+                elif user_select_tags != 'extend':
+                    for host in zabbix_preload_hosts:
+                        host['tags'] = [
+                            dict((k, v) for k, v in tag.items() if k in user_select_tags)
+                            for tag in host.get('tags', [])]
+                self.preloaded_hosts = zabbix_preload_hosts
 
     def parse(self, inventory, loader, path, cache=True):
         """
@@ -1056,19 +2133,145 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         # Get and validate input parameters
         self.args = self.get_options()
         self.resolve_extra_vars()
-        self.zabbix_api_url = self.get_absolute_url()
-        self.validate_params()
 
-        # Get constructed parameters
-        keyed_groups = self.args.get('keyed_groups')
-        strict = self.args.get('strict')
-        groups = self.args.get('groups')
+        # Statistics of requests are shared by all servers and pages
+        self.api_stats = RequestStats(path=self.args.get('api_stats_path'))
+
+        # Hosts from several servers are requested concurrently
+        if self.args.get('zabbix_servers'):
+            self.add_zabbix_hosts(self.get_zabbix_hosts_from_servers(cache))
+        else:
+            self.zabbix_api_url = self.get_absolute_url()
+            self.validate_params()
+            self.load_zabbix_hosts(cache)
 
+        inventory_request_stats[path] = self.api_stats.totals
+        self.display_api_stats()
+
+    def display_api_stats(self):
+        """
+        The function displays the number of requests, total sizes and times
+        of Zabbix API requests for each method with verbosity 3 (-vvv).
+
+        :return: None
+        """
+        summary = self.api_stats.totals
+        for method in sorted(summary, key=lambda m: -summary[m]['server_time']):
+            each = summary[method]
+            display.vvv(
+                'Zabbix API {0}: {1} request(s), sent {2} bytes, received {3} bytes, '
+                'waiting {4:.3f} s, decoding {5:.3f} s'.format(
+                    method, each['requests'], each['request_bytes'], each['response_bytes'],
+                    each['server_time'], each['decode_time']))
+
+    def get_server_inventory(self, server):
+        """
+        The function creates a copy of the plugin for one of the servers from 'zabbix_servers'.
+        The copy has its own input parameters, connection and session, so the servers
+        can be requested concurrently.
+
+        :param server: server from 'zabbix_servers'
+        :type server: dict
+
+        :rtype: InventoryModule
+        :return: copy of the plugin
+        """
+        server_inventory = copy.copy(self)
+        server_inventory.args = copy.deepcopy(self.args)
+        server_inventory.args['zabbix_servers'] = None
+        for option in ['zabbix_api_url', 'zabbix_user', 'zabbix_password', 'zabbix_api_token']:
+            if server.get(option) is not None:
+                server_inventory.args[option] = server[option]
+        server_inventory.http_session = None
+        return server_inventory
+
+    def get_zabbix_hosts_from_servers(self, cache=True):
+        """
+        The function gets hosts from all servers from 'zabbix_servers' concurrently,
+        one thread for each server. The hosts are combined in the order of the servers,
+        each host gets the 'server' field with the name of its server.
+
+        :param cache: Cache parameter
+        :type cache: bool
+
+        :rtype: list
+        :return: hosts of all servers
+
+        :raises:
+            * AnsibleError: If hosts of any server could not be requested.
+        """
+        servers = self.args['zabbix_servers']
+        results = [None] * len(servers)
+        errors = [None] * len(servers)
+
+        def load(index, server_inventory):
+            try:
+                server_inventory.zabbix_api_url = server_inventory.get_absolute_url()
+                server_inventory.validate_params()
+                results[index] = server_inventory.load_zabbix_hosts(cache, add_hosts=False)
+            except Exception as e:
+                errors[index] = e
+
+        threads = [
+            threading.Thread(target=load, args=(index, self.get_server_inventory(server)))
+            for index, server in enumerate(servers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        names = [server.get('name') or server['zabbix_api_url'] for server in servers]
+        for name, error in zip(names, errors):
+            if error is not None:
+                message = 'Failed to get hosts from Zabbix server {0}: {1}'.format(name, to_text(error))
+                if isinstance(error, AnsibleError):
+                    raise error.__class__(message, orig_exc=error)
+                raise AnsibleParserError(message, orig_exc=error)
+
+        # Duplicate names are resolved in the order of the servers, so the result is always the same
+        zabbix_hosts = []
+        host_names = set()
+        for name, server_hosts in zip(names, results):
+            skipped = []
+            for host in server_hosts:
+                host['server'] = name
+                if host['host'] in host_names and self.args.get('duplicate_hosts') == 'rename':
+                    host['host'] = '{0}_{1}'.format(host['host'], name)
+                if host['host'] in host_names:
+                    skipped.append(host['host'])
+                    continue
+                host_names.add(host['host'])
+                zabbix_hosts.append(host)
+            if skipped:
+                display.warning('{0} host(s) from Zabbix server {1} are skipped, hosts with the same names '
+                                'are already added from other servers: {2}{3}'.format(
+                                    len(skipped), name, ', '.join(skipped[:10]), ', ...' if len(skipped) > 10 else ''))
+
+        return zabbix_hosts
+
+    def load_zabbix_hosts(self, cache=True, add_hosts=True):
+        """
+        The function gets hosts of one Zabbix server from the cache or from Zabbix API
+        and saves them to the cache if needed.
+
+        :param cache: Cache parameter
+        :type cache: bool
+        :param add_hosts: whether the hosts should be added to the inventory
+        :type add_hosts: bool
+
+        :rtype: list
+        :return: hosts
+        """
         # Get cache parameters
-        cache_key = self.get_cache_key(path)
+        # The hash of the input parameters is used as the cache key, so inventories
+        # with different parameters do not overwrite the cached data of each other.
+        fingerprint = self.get_input_args_fingerprint(self.args)
+        cache_key = '{0}_{1}'.format(self.NAME, fingerprint)
         user_cache_setting = self.args.get('cache')
         attempt_to_read_cache = user_cache_setting and cache
         cache_needs_update = user_cache_setting and not cache
+        hosts_added = False
+        self.refresh_cache = False
 
         # Check cache
         if attempt_to_read_cache:
@@ -1078,15 +2281,22 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             except KeyError:
                 cache_needs_update = True
 
-            # Check the data from the cache. If the data is received, compare the input parameters.
+            # Check the data from the cache. If the data is received, compare the hash of the input parameters.
             # If the filter, output, or query parameters have changed, data will be requested again.
+            # The hosts are read only if the header matches the input parameters.
             if cached_data:
-                if 'input_args' not in cached_data:
+                if cached_data.get('fingerprint') != fingerprint:
                     cache_needs_update = True
-                elif self.compare_cached_input_args(cached_data['input_args']) is False:
-                    cache_needs_update = True
-                elif 'zabbix_hosts' in cached_data:
-                    self.zabbix_hosts = cached_data['zabbix_hosts']
+                elif 'hosts_key' in cached_data:
+                    self.zabbix_hosts = self.read_cached_hosts(cached_data)
+                    if self.zabbix_hosts is None:
+                        cache_needs_update = True
+                    # Refresh hosts incrementally if the cached data is outdated
+                    elif (self.args.get('cache_refresh_interval') and cached_data.get('audit_clock') is not None and
+                            self.can_refresh_incrementally() and
+                            time.time() - cached_data.get('timestamp', 0) >= self.args['cache_refresh_interval']):
+                        self.refresh_cache = True
+                        cache_needs_update = True
                 else:
                     cache_needs_update = True
 
@@ -1100,11 +2310,22 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 os.environ['https_proxy'] = proxy
                 os.environ['HTTPS_PROXY'] = proxy
 
-            if hasattr(self, "zabbix_version") is False:
-                self.zabbix_version = self.get_api_version()
+            # The rate limit is shared by all processes sending requests to the same URL
+            if self.args.get('rate_limit'):
+                self.rate_limiter = RateLimiter(rate_limit_path(self.zabbix_api_url), self.args['rate_limit'])
+
+            # All requests are sent over one persistent connection
+            if self.args.get('keep_alive') and HttpSession.is_supported(self.zabbix_api_url):
+                self.http_session = HttpSession(
+                    self.zabbix_api_url,
+                    timeout=self.args['connection_timeout'],
+                    validate_certs=self.args['validate_certs'])
 
             self.auth = self.login()
 
+            if hasattr(self, "zabbix_version") is False:
+                self.zabbix_version = self.get_api_version()
+
             self.query = {
                 'output': 'extend',
                 'searchWildcardsEnabled': True}
@@ -1128,41 +2349,62 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                     if 'host' not in self.query['output']:
                         self.query['output'].append('host')
 
+            # marker for the next incremental refresh
+            audit_clock = None
+            if self.args.get('cache_refresh_interval') and user_cache_setting:
+                audit_clock = self.get_audit_clock()
+
             # preload data
             self.preload_data()
 
-            # getting result data
-            self.zabbix_hosts = self.api_request('host.get', params=self.query)
+            if self.refresh_cache:
+                # getting only new and changed hosts
+                self.zabbix_hosts = self.refresh_zabbix_hosts(self.zabbix_hosts, cached_data['audit_clock'])
+            elif self.args.get('page_size'):
+                # getting result data by pages and adding each page to inventory
+                self.zabbix_hosts = []
+                for page in self.get_zabbix_hosts_by_pages():
+                    self.resolve_id_to_names(page)
+                    if add_hosts:
+                        self.add_zabbix_hosts(page)
+                    # All hosts are kept only for saving them to cache
+                    if cache_needs_update or not add_hosts:
+                        self.zabbix_hosts.extend(page)
+                hosts_added = add_hosts
+            else:
+                # getting result data, if it was not preloaded
+                if self.preloaded_hosts is not None:
+                    self.zabbix_hosts = self.preloaded_hosts
+                else:
+                    self.zabbix_hosts = self.api_request('host.get', params=self.query)
 
-            # resolve id to names
-            self.resolve_id_to_names()
+                # resolve id to names
+                self.resolve_id_to_names()
 
             # logout
             self.logout()
 
-        # Process data from Zabbix API / cached data
-        for host in self.zabbix_hosts:
+            if getattr(self, 'http_session', None) is not None:
+                self.http_session.close()
+                self.http_session = None
 
-            # Add data about host to inventory
-            self.inventory.add_host(host['host'])
-            for each in host:
-                self.inventory.set_variable(
-                    host['host'],
-                    '{0}{1}'.format(self.args['prefix'], each),
-                    host[each])
-
-            # added for compose vars, keyed-groups, and composed groups
-            self._set_composite_vars(
-                self.args.get('compose'),
-                self.inventory.get_host(host['host']).get_vars(),
-                host['host'],
-                strict=strict)
-            self._add_host_to_composed_groups(groups, dict(), host['host'], strict=strict)
-            self._add_host_to_keyed_groups(keyed_groups, dict(), host['host'], strict=strict)
+        # Process data from Zabbix API / cached data
+        if add_hosts and not hosts_added:
+            self.add_zabbix_hosts(self.zabbix_hosts)
 
         # Save new data to cache
         if cache_needs_update:
+            # The header and the hosts are saved with different keys,
+            # so the header can be checked without loading the hosts.
             cached_data = {}
-            cached_data['zabbix_hosts'] = self.zabbix_hosts
-            cached_data['input_args'] = self.args
+            cached_data['format'] = self.CACHE_FORMAT
+            cached_data['hosts_key'] = '{0}_hosts'.format(cache_key)
+            cached_data['hosts_count'] = len(self.zabbix_hosts)
+            cached_data['fingerprint'] = fingerprint
+            if self.args.get('cache_refresh_interval'):
+                cached_data['timestamp'] = time.time()
+                cached_data['audit_clock'] = audit_clock
+            self._cache[cached_data['hosts_key']] = self.pack_hosts(self.zabbix_hosts)
             self._cache[cache_key] = cached_data
+
+        return self.zabbix_hosts
@@ -7,6 +7,19 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import fcntl
+import hashlib
+import json
+import math
+import os
+import random
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from email.utils import mktime_tz, parsedate_tz
+
 
 class Zabbix_version:
     """
@@ -251,6 +264,17 @@ tags_compare_operators = {
     'not exists': '5'
 }
 
+# Functions for checking a tag condition against the values of the tag on a host.
+# 'values' is a set of values of the tag on the host or None if the host has no such tag.
+tags_match_operators = {
+    'contains': lambda values, value: values is not None and any(value in v for v in values),
+    'equals': lambda values, value: values is not None and value in values,
+    'not like': lambda values, value: values is None or not any(value in v for v in values),
+    'not equal': lambda values, value: values is None or value not in values,
+    'exists': lambda values, value: values is not None,
+    'not exists': lambda values, value: values is None
+}
+
 # All available query
 # (See also: https://www.zabbix.com/documentation/current/manual/api/reference/host/get)
 host_subquery = [
@@ -272,3 +296,416 @@ proxy_timeouts = [
     'timeout_ssh_agent', 'timeout_telnet_agent', 'timeout_script',
     'timeout_browser'
 ]
+
+# Dictionary with methods and output fields for searching for objects in Zabbix
+# The output field 'name' of proxies is replaced with 'host' for Zabbix versions below 7.0
+search_objects = {
+    'host': {'method': 'host.get', 'output': ['name', 'host', 'hostid']},
+    'hostgroup': {'method': 'hostgroup.get', 'output': ['name', 'groupid']},
+    'template': {'method': 'template.get', 'output': ['name', 'templateid']},
+    'proxy': {'method': 'proxy.get', 'output': ['name', 'proxyid']},
+    'proxy_group': {'method': 'proxygroup.get', 'output': ['name', 'proxy_groupid']}
+}
+
+
+class ObjectCache(object):
+    """
+    Class for caching Zabbix objects by their names.
+    Objects are kept for 'ttl' seconds. When the number of objects
+    exceeds 'max_size', the least recently used objects are evicted.
+
+    :param ttl: time to live of cached objects in seconds, 0 disables the cache
+    :type ttl: int
+    :param max_size: maximum number of cached objects
+    :type max_size: int
+    """
+    def __init__(self, ttl=300, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.objects = OrderedDict()
+
+    def get(self, key, names):
+        """
+        Function for getting cached objects by names
+
+        :param key: key of the object set (e.g. API URL, user and object type)
+        :type key: tuple
+        :param names: names of objects
+        :type names: list
+
+        :return: found objects by names
+        :rtype: dict
+        """
+        result = {}
+        if not self.ttl or self.ttl <= 0:
+            return result
+
+        now = time.time()
+        for name in names:
+            entry = self.objects.pop((key, name), None)
+            if entry is None or now - entry[0] > self.ttl:
+                continue
+            # Move the object to the end as the recently used one
+            self.objects[(key, name)] = entry
+            result[name] = entry[1]
+
+        return result
+
+    def set(self, key, name_field, objects):
+        """
+        Function for caching objects
+
+        :param key: key of the object set (e.g. API URL, user and object type)
+        :type key: tuple
+        :param name_field: field containing the object name
+        :type name_field: str
+        :param objects: objects for caching
+        :type objects: list
+
+        :return: None
+        """
+        if not self.ttl or self.ttl <= 0:
+            return
+
+        now = time.time()
+        for each in objects:
+            if each.get(name_field) is None:
+                continue
+            self.objects.pop((key, each[name_field]), None)
+            self.objects[(key, each[name_field])] = (now, each)
+
+        while len(self.objects) > max(self.max_size, 0):
+            self.objects.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Function for removing all cached objects of the object set
+
+        :param key: key of the object set (e.g. API URL, user and object type)
+        :type key: tuple
+
+        :return: None
+        """
+        for each in [k for k in self.objects if k[0] == key]:
+            del self.objects[each]
+
+
+class RequestStats(object):
+    """
+    Class for collecting statistics of Zabbix API requests.
+    The last 'max_size' records are kept in memory, the totals for each method
+    are kept for all records. If 'path' is set, each record is also appended
+    to the file in JSON lines format. Records can be added from several threads.
+
+    :param path: path to the file for records, None to keep them only in memory
+    :type path: str
+    :param max_size: maximum number of records kept in memory
+    :type max_size: int
+    """
+    def __init__(self, path=None, max_size=1000):
+        self.path = path
+        self.records = deque(maxlen=max_size)
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def add(self, method, request_bytes, response_bytes, status, server_time, decode_time, reqid=None):
+        """
+        Function for adding a record about a request
+
+        :param method: Zabbix API method, methods of a batch are separated by commas
+        :type method: str
+        :param request_bytes: size of the request body
+        :type request_bytes: int
+        :param response_bytes: size of the response body as received
+        :type response_bytes: int
+        :param status: HTTP status of the response
+        :type status: int
+        :param server_time: time in seconds from sending the request to receiving the response
+        :type server_time: float
+        :param decode_time: time in seconds for decompressing and parsing the response
+        :type decode_time: float
+        :param reqid: ID of the request
+        :type reqid: str
+
+        :return: added record
+        :rtype: dict
+        """
+        record = {
+            'id': reqid, 'method': method, 'time': round(time.time(), 3),
+            'request_bytes': request_bytes, 'response_bytes': response_bytes, 'status': status,
+            'server_time': round(server_time, 6), 'decode_time': round(decode_time, 6)}
+
+        with self.lock:
+            self.records.append(record)
+            self.add_to_summary(self.totals, method, record)
+            if self.path:
+                with open(self.path, 'a') as stats_file:
+                    stats_file.write(json.dumps(record, sort_keys=True) + '\n')
+
+        return record
+
+    def get(self, ids=None):
+        """
+        Function for getting records
+
+        :param ids: IDs of requests, None to get all records
+        :type ids: list
+
+        :return: records in the order of requests
+        :rtype: list
+        """
+        with self.lock:
+            if ids is None:
+                return list(self.records)
+            ids = set(ids)
+            return [r for r in self.records if r['id'] in ids]
+
+    @staticmethod
+    def add_to_summary(summary, key, record):
+        """
+        Function for adding a record or the totals of other records to a summary
+
+        :param summary: totals for each key
+        :type summary: dict
+        :param key: key of the totals to update (e.g. method)
+        :type key: str
+        :param record: record of a request or totals of several requests
+        :type record: dict
+
+        :return: None
+        """
+        each = summary.setdefault(key, {
+            'requests': 0, 'request_bytes': 0, 'response_bytes': 0,
+            'server_time': 0.0, 'decode_time': 0.0})
+        each['requests'] += record.get('requests', 1)
+        for field in ['request_bytes', 'response_bytes', 'server_time', 'decode_time']:
+            each[field] += record[field]
+
+    @staticmethod
+    def summary(records):
+        """
+        Function for summarizing records by methods
+
+        :param records: records of requests
+        :type records: list
+
+        :return: number of requests, total sizes and times for each method
+        :rtype: dict
+        """
+        result = {}
+        for record in records:
+            RequestStats.add_to_summary(result, record['method'], record)
+
+        return result
+
+
+# HTTP status codes of transient errors, e.g. of an overloaded web server,
+# after which read-only requests are repeated
+retry_http_codes = [429, 502, 503, 504]
+
+# Maximum delay in seconds before repeating a request
+RETRY_MAX_DELAY = 30
+
+
+def is_read_only(methods):
+    """
+    Function for checking whether Zabbix API methods do not change any data,
+    so the request can be safely repeated.
+
+    :param methods: Zabbix API methods of the request (several for a batch)
+    :type methods: list
+
+    :rtype: bool
+    :return: result of checking
+    """
+    return all(m.endswith('.get') or m in ['apiinfo.version', 'user.checkAuthentication'] for m in methods)
+
+
+# Parts of error messages of Zabbix API about conflicts between concurrent transactions
+# in the database, after which the request can be repeated
+lock_conflict_errors = ['deadlock', 'lock wait timeout', 'could not serialize access']
+
+
+def is_lock_conflict(message):
+    """
+    Function for checking whether a request failed because of a conflict with another
+    transaction in the database of Zabbix, e.g. a deadlock.
+
+    :param message: error message of the request
+    :type message: str
+
+    :rtype: bool
+    :return: result of checking
+    """
+    message = (message or '').lower()
+    return any(e in message for e in lock_conflict_errors)
+
+
+def retry_delay(attempt, base_delay):
+    """
+    Function for getting the delay before repeating a request.
+    The delay grows exponentially with the number of the attempt and is randomized
+    (full jitter), so the processes failed at the same time do not repeat their requests
+    at the same time.
+
+    :param attempt: number of the failed attempt starting from 0
+    :type attempt: int
+    :param base_delay: delay in seconds after the first failed attempt (on average, twice as much)
+    :type base_delay: float
+
+    :rtype: float
+    :return: delay in seconds
+    """
+    return random.uniform(0, min(RETRY_MAX_DELAY, base_delay * 2 ** (attempt + 1)))
+
+
+def retry_after(headers):
+    """
+    Function for getting the delay requested by the server with the Retry-After header,
+    e.g. in a response with the HTTP code 429. The delay is limited by RETRY_MAX_DELAY.
+
+    :param headers: headers of the response
+    :type headers: dict
+
+    :rtype: float
+    :return: delay in seconds or None if the header is missing or invalid
+    """
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except (TypeError, ValueError):
+        # The header contains the date to repeat the request at
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        delay = mktime_tz(date) - time.time()
+    if math.isnan(delay):
+        return None
+    return min(max(delay, 0), RETRY_MAX_DELAY)
+
+
+def rate_limit_path(url):
+    """
+    Function for getting the path to the file with the state of the rate limiter.
+    The limiter is shared by all processes of the current user sending requests to the same URL.
+    The file is kept in the directory of the current user in the temporary directory,
+    which is created by RateLimiter with access for the user only.
+
+    :param url: URL of Zabbix API
+    :type url: str
+
+    :rtype: str
+    :return: path to the file
+    """
+    return os.path.join(
+        tempfile.gettempdir(), 'ansible-zabbix-{0}'.format(os.getuid()),
+        'rate-{0}'.format(hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]))
+
+
+class RateLimiter(object):
+    """
+    Class for limiting the rate of requests with a token bucket shared by all processes
+    of the host, e.g. by all forks of Ansible. The state of the bucket is kept in a file,
+    which is locked during each update. The file and its directory must belong to the current user
+    and must not be accessible by other users, so they cannot change the state of the bucket.
+
+    :param path: path to the file with the state of the bucket
+    :type path: str
+    :param rate: number of requests per second
+    :type rate: float
+    :param burst: maximum number of requests sent without waiting, by default the rate of one second
+    :type burst: float
+    """
+    def __init__(self, path, rate, burst=None):
+        self.path = path
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+
+    def open(self):
+        """
+        Function for opening the file with the state of the bucket.
+        The directory of the file is created if it does not exist.
+
+        :rtype: file
+        :return: opened file
+
+        :raises:
+            * OSError: if the file or its directory is not safe to use
+        """
+        directory = os.path.dirname(self.path)
+        try:
+            os.mkdir(directory, 0o700)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+        directory_stat = os.lstat(directory)
+        if (not stat.S_ISDIR(directory_stat.st_mode) or directory_stat.st_uid != os.getuid()
+                or directory_stat.st_mode & 0o077):
+            raise OSError(
+                'The directory {0} must belong to the current user and must not be accessible '
+                'by other users'.format(directory))
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+        file_stat = os.fstat(fd)
+        if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_uid != os.getuid():
+            os.close(fd)
+            raise OSError('The file {0} must be a regular file of the current user'.format(self.path))
+
+        return os.fdopen(fd, 'r+')
+
+    def take(self):
+        """
+        Function for taking a token from the bucket
+
+        :rtype: float
+        :return: 0 if the token is taken, otherwise time in seconds until a token is available
+
+        :raises:
+            * OSError: if the file with the state of the bucket cannot be used
+        """
+        with self.open() as bucket_file:
+            fcntl.flock(bucket_file, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                bucket_file.seek(0)
+                try:
+                    tokens, updated = [float(v) for v in bucket_file.read().split()]
+                    if any(math.isnan(v) or math.isinf(v) for v in [tokens, updated]):
+                        raise ValueError('Invalid state of the bucket')
+                    # The state written by another process cannot be trusted completely,
+                    # so it is limited to the possible values
+                    tokens = min(self.burst, max(0, tokens) + max(0, now - min(updated, now)) * self.rate)
+                except ValueError:
+                    tokens = self.burst
+
+                wait = 0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+
+                bucket_file.seek(0)
+                bucket_file.truncate()
+                bucket_file.write('{0} {1}'.format(tokens, now))
+            finally:
+                fcntl.flock(bucket_file, fcntl.LOCK_UN)
+
+        return wait
+
+    def acquire(self):
+        """
+        Function for waiting until a request can be sent
+
+        :return: None
+        """
+        wait = self.take()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.take()
+
+
+# Totals of Zabbix API requests sent by the inventory plugin in the current process
+# for each inventory source. They are reported by the zabbix_api_stats callback plugin.
+inventory_request_stats = {}
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import gzip
+import io
+import socket
+import ssl
+import zlib
+
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
+
+
+# Request bodies smaller than this size are sent uncompressed
+COMPRESS_MIN_SIZE = 1024
+
+# Errors of a reused connection closed by the server before any response was received,
+# after which the request is sent again over a new connection
+try:
+    CLOSED_CONNECTION_ERRORS = (http_client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+except AttributeError:
+    # Python 2
+    CLOSED_CONNECTION_ERRORS = (http_client.BadStatusLine,)
+
+
+def compress_request(data, headers, compression):
+    """
+    Function for compressing the body of a request.
+    The body is compressed with gzip only if compression of requests is enabled
+    and the body is big enough. Headers are updated in place.
+
+    :param data: request body
+    :type data: str
+    :param headers: request headers
+    :type headers: dict
+    :param compression: compression mode (disabled, responses or all)
+    :type compression: str
+
+    :rtype: str | bytes
+    :return: request body for sending
+    """
+    if compression in ['responses', 'all']:
+        headers['Accept-Encoding'] = 'gzip, deflate'
+
+    if compression == 'all' and len(data) >= COMPRESS_MIN_SIZE:
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as gzip_file:
+            gzip_file.write(data.encode('utf-8'))
+        headers['Content-Encoding'] = 'gzip'
+        return buffer.getvalue()
+
+    return data
+
+
+def decompress_response(body, encoding):
+    """
+    Function for decompressing the body of a response.
+    The body is returned as is if it is not compressed
+    or it has already been decompressed by the transport.
+
+    :param body: response body
+    :type body: bytes
+    :param encoding: value of the Content-Encoding header
+    :type encoding: str
+
+    :rtype: bytes
+    :return: decompressed response body
+    """
+    encoding = (encoding or '').lower()
+    if encoding == 'gzip' and body[:2] == b'\x1f\x8b':
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate data without the zlib header
+            try:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+            except zlib.error:
+                return body
+
+    return body
+
+
+class HttpSession(object):
+    """
+    Class for sending HTTP(S) POST requests to one URL over a persistent (keep-alive) connection.
+    The connection is opened on the first request and reused by the following ones.
+    If the server has closed an idle connection before responding, the request is sent again over a new one.
+    Unlike open_url, redirects are not followed, and only the system CA certificates are used.
+
+    :param url: URL for sending requests
+    :type url: str
+    :param timeout: timeout for connecting and reading in seconds
+    :type timeout: int
+    :param validate_certs: whether the server certificate should be validated
+    :type validate_certs: bool
+    """
+    def __init__(self, url, timeout=10, validate_certs=True):
+        parsed_url = urlparse(url)
+        self.scheme = parsed_url.scheme
+        self.host = parsed_url.hostname
+        self.port = parsed_url.port
+        self.path = parsed_url.path or '/'
+        if parsed_url.query:
+            self.path = '{0}?{1}'.format(self.path, parsed_url.query)
+        self.timeout = timeout
+        self.validate_certs = validate_certs
+        self.connection = None
+
+    @staticmethod
+    def is_supported(url):
+        """
+        Function for checking whether the URL can be used with a persistent connection.
+        Requests through HTTP proxies are not supported.
+
+        :param url: URL for sending requests
+        :type url: str
+
+        :rtype: bool
+        :return: result of checking
+        """
+        parsed_url = urlparse(url)
+        if parsed_url.scheme not in ['http', 'https']:
+            return False
+
+        if parsed_url.scheme in getproxies() and not proxy_bypass(parsed_url.hostname):
+            return False
+
+        return True
+
+    def connect(self):
+        """
+        Function for opening a new connection
+
+        :rtype: object
+        :return: HTTP(S) connection
+        """
+        if self.scheme == 'https':
+            context = ssl.create_default_context()
+            if not self.validate_certs:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            return http_client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=context)
+
+        return http_client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def post(self, data, headers):
+        """
+        Function for sending a POST request
+
+        :param data: request body
+        :type data: str | bytes
+        :param headers: request headers
+        :type headers: dict
+
+        :rtype: tuple
+        :return: response status, reason, body and content encoding
+
+        :raises:
+            * http_client.HTTPException, socket.error: if the request failed or was redirected
+        """
+        for attempt in range(2):
+            reused = self.connection is not None
+            if self.connection is None:
+                self.connection = self.connect()
+
+            try:
+                try:
+                    self.connection.request('POST', self.path, body=data, headers=headers)
+                    response = self.connection.getresponse()
+                except CLOSED_CONNECTION_ERRORS:
+                    # The server could close the idle connection before receiving the request,
+                    # so the request is sent again once. Other errors, e.g. timeouts, are not repeated.
+                    self.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                body = response.read()
+            except (http_client.HTTPException, socket.error):
+                self.close()
+                raise
+
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+
+            if 300 <= response.status < 400:
+                raise http_client.HTTPException(
+                    'HTTP {0} redirect to {1} is not followed over the persistent connection, '
+                    'use the final URL or disable keep_alive'.format(response.status, response.getheader('Location', '')))
+
+            return response.status, response.reason, body, response.getheader('Content-Encoding', '')
+
+    def close(self):
+        """
+        Function for closing the connection
+
+        :return: None
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -7,11 +7,13 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import json
 from uuid import uuid4
 
 from ansible.module_utils.connection import ConnectionError
 from ansible.module_utils.connection import Connection
-from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import Zabbix_version
+from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import (
+    Zabbix_version, search_objects)
 
 
 class ZabbixException(Exception):
@@ -31,16 +33,63 @@ class NoParametersForSearch(ZabbixException):
     pass
 
 
+class ZabbixApiRequestError(ZabbixException):
+    """Exception class when Zabbix API request failed"""
+    pass
+
+
 class ZabbixApi(object):
 
     def __init__(self, module):
         self.module = module
         self.connection = Connection(self.module._socket_path)
-        self.connection.setup_connection()
         self.jsonrpc_version = '2.0'
-        self.zbx_api_version = None
+        # IDs of sent requests to get their statistics from the connection
+        self.request_ids = []
+        connection_info = self.connection.setup_connection() or {}
+        if connection_info.get('zabbix_api_stats'):
+            self.add_stats_to_results()
+        # The version is known if it was detected by one of the previous tasks
+        self.zbx_api_version = connection_info.get('zabbix_api_version')
         self.global_setting = None
-        self.connection.set_api_version(self.api_version())
+        self.prefetched = {}
+        # Objects found by names are cached in the persistent connection
+        # only if it is enabled, e.g. to resolve the linked objects of a host
+        self.use_cache = False
+        self.cached_objects = {}
+        if not self.zbx_api_version:
+            self.connection.set_api_version(self.api_version())
+
+    def add_stats_to_results(self):
+        """
+        Function for adding statistics of the requests sent by the module
+        to its results as 'zabbix_api_stats'. The exit functions of the module
+        are wrapped, so the statistics are added to any result.
+
+        :return: None
+        """
+        def with_stats(exit_function):
+            def wrapper(**kwargs):
+                kwargs['zabbix_api_stats'] = self.get_api_stats()
+                exit_function(**kwargs)
+            return wrapper
+
+        self.module.exit_json = with_stats(self.module.exit_json)
+        self.module.fail_json = with_stats(self.module.fail_json)
+
+    def get_api_stats(self):
+        """
+        Function for getting statistics of the requests sent by the module
+
+        :return: records of the requests
+        :rtype: list
+        """
+        if not self.request_ids:
+            return []
+        try:
+            return self.connection.get_request_stats(self.request_ids)
+        except ConnectionError:
+            return []
 
     def api_version(self):
         """
@@ -53,6 +102,7 @@ class ZabbixApi(object):
             payload = {
                 'jsonrpc': self.jsonrpc_version, 'method': 'apiinfo.version',
                 'id': str(uuid4()), 'params': {}}
+            self.request_ids.append(payload['id'])
             code, result = self.connection.send_request(data=payload)
             if code == 200 and result != '':
                 self.zbx_api_version = result
@@ -71,9 +121,16 @@ class ZabbixApi(object):
         :return: response from Zabbix API
         :rtype: dict
         """
+        if self.prefetched:
+            request_key = self.request_key(method, params)
+            if request_key in self.prefetched:
+                return self.prefetched.pop(request_key)
+
+        self.invalidate_cache(method)
         payload = {
             'jsonrpc': self.jsonrpc_version, 'method': method,
             'id': str(uuid4()), 'params': params}
+        self.request_ids.append(payload['id'])
         try:
             code, response = self.connection.send_request(data=payload)
 
@@ -90,6 +147,237 @@ class ZabbixApi(object):
 
         return response
 
+    def try_api_request(self, method, params):
+        """
+        Function for sending a request via HTTP API plugin.
+        Unlike send_api_request, it does not stop the module in case of an error,
+        so the caller can decide how to handle the failed request.
+
+        :param method: required Zabbix API method
+        :type method: str
+        :param params: params for method
+        :type params: dict|list
+
+        :return: response from Zabbix API
+        :rtype: dict
+
+        :raise:
+            * ZabbixApiRequestError - if the request failed
+        """
+        self.invalidate_cache(method)
+        payload = {
+            'jsonrpc': self.jsonrpc_version, 'method': method,
+            'id': str(uuid4()), 'params': params}
+        self.request_ids.append(payload['id'])
+        try:
+            code, response = self.connection.send_request(data=payload)
+        except (ConnectionError, ValueError) as e:
+            raise ZabbixApiRequestError(str(e))
+
+        if not (code >= 200 and code < 300):
+            raise ZabbixApiRequestError(
+                "Zabbix API returned error {0} with message {1}".format(
+                    code, response))
+
+        return response
+
+    def send_batch(self, requests):
+        """
+        Function for sending several requests via HTTP API plugin
+        with one HTTP request (JSON-RPC batch).
+
+        :param requests: list of pairs (method, params)
+        :type requests: list
+
+        :return: responses in the order of requests.
+            Each response contains the 'result' or 'error' key.
+        :rtype: list
+        """
+        payloads = [{
+            'jsonrpc': self.jsonrpc_version, 'method': method,
+            'id': str(uuid4()), 'params': params} for method, params in requests]
+        self.request_ids.append(payloads[0]['id'])
+        try:
+            code, response = self.connection.send_batch(data=payloads)
+
+        except ConnectionError as e:
+            self.module.fail_json(msg="Connection error: {0}".format(e))
+
+        except ValueError as e:
+            self.module.fail_json(msg="Certificate not found: {0}".format(e))
+
+        if not (code >= 200 and code < 300):
+            self.module.fail_json(
+                msg="Zabbix API returned error {0} with message {1}".format(
+                    code, response))
+
+        # Responses in a batch may come in any order
+        responses = dict((r.get('id'), r) for r in response if isinstance(r, dict))
+        result = []
+        for payload in payloads:
+            each = responses.get(payload['id'])
+            if each is None:
+                result.append({'error': "No response for method {0}".format(payload['method'])})
+            elif 'error' in each:
+                result.append({'error': each['error']})
+            else:
+                result.append({'result': each.get('result')})
+
+        return result
+
+    def prefetch(self, requests):
+        """
+        Function for sending requests in advance with one batch request.
+        The results are saved and returned by send_api_request when it is called
+        with the same method and params, without sending a new request.
+        Failed requests are not saved, so they will be sent again and
+        processed as usual.
+
+        :param requests: list of pairs (method, params)
+        :type requests: list
+
+        :return: None
+        """
+        if len(requests) < 2:
+            return
+
+        for request, response in zip(requests, self.send_batch(requests)):
+            if 'result' in response:
+                self.prefetched[self.request_key(*request)] = response['result']
+
+    @staticmethod
+    def request_key(method, params):
+        """
+        Function for generating a key of request
+
+        :param method: Zabbix API method
+        :type method: str
+        :param params: params for method
+        :type params: dict|list
+
+        :return: key of request
+        :rtype: str
+        """
+        return '{0}:{1}'.format(method, json.dumps(params, sort_keys=True))
+
+    def search_request(self, object_type, search_filter):
+        """
+        Function for generating a request to search for objects in Zabbix
+        by a given filter
+
+        :param object_type: type of object (host, hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+        :param search_filter: search filter
+        :type search_filter: dict
+
+        :return: method and params for request
+        :rtype: tuple
+        """
+        output_list = list(search_objects[object_type]['output'])
+        if object_type == 'proxy' and Zabbix_version(self.api_version()) < Zabbix_version('7.0.0'):
+            output_list = ['host', 'proxyid']
+
+        return search_objects[object_type]['method'], {
+            'output': output_list,
+            'filter': search_filter}
+
+    def name_field(self, object_type):
+        """
+        Function for getting the field containing the name of objects
+
+        :param object_type: type of object (hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+
+        :return: name of the field
+        :rtype: str
+        """
+        if object_type == 'proxy' and Zabbix_version(self.api_version()) < Zabbix_version('7.0.0'):
+            return 'host'
+
+        return 'name'
+
+    def names_request(self, object_type, names):
+        """
+        Function for generating a request to search for objects in Zabbix by names.
+        If the cache is used, objects found in the cache are returned
+        and their names are excluded from the request.
+
+        :param object_type: type of object (hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+        :param names: names of objects
+        :type names: list|str
+
+        :return: request (method, params) or None if all objects are cached,
+            and list of cached objects
+        :rtype: tuple
+        """
+        if not isinstance(names, list):
+            names = [names]
+
+        cached = {}
+        if self.use_cache:
+            cached = self.cached_objects.setdefault(object_type, {})
+            missing = [n for n in names if n not in cached]
+            if missing:
+                try:
+                    cached.update(self.connection.get_cached_objects(object_type, missing))
+                except ConnectionError:
+                    # The connection plugin does not support caching
+                    self.use_cache = False
+
+        found = [cached[n] for n in names if n in cached]
+        missing = [n for n in names if n not in cached]
+        if not missing:
+            return None, found
+
+        return self.search_request(object_type, {self.name_field(object_type): missing}), found
+
+    def find_zabbix_objects_by_names(self, object_type, names):
+        """
+        Function to search for objects in Zabbix by names.
+        If the cache is used, found objects are saved in the cache of the connection.
+
+        :param object_type: type of object (hostgroup, template, proxy, proxy_group)
+        :type object_type: str
+        :param names: names of objects
+        :type names: list|str
+
+        :return: found objects
+        :rtype: list
+        """
+        request, found = self.names_request(object_type, names)
+        if request is None:
+            return found
+
+        result = self.send_api_request(*request)
+        if self.use_cache and result:
+            name_field = self.name_field(object_type)
+            self.cached_objects[object_type].update((o[name_field], o) for o in result)
+            self.connection.cache_objects(object_type, name_field, result)
+
+        return found + result
+
+    def invalidate_cache(self, method):
+        """
+        Function for removing objects from the cache if they are changed by the method
+
+        :param method: Zabbix API method
+        :type method: str
+
+        :return: None
+        """
+        object_method, sep, action = method.rpartition('.')
+        if action not in ['create', 'update', 'delete']:
+            return
+
+        for object_type, search in search_objects.items():
+            if search['method'] == '{0}.get'.format(object_method):
+                self.cached_objects.pop(object_type, None)
+                try:
+                    self.connection.invalidate_cached_objects(object_type)
+                except ConnectionError:
+                    pass
+
     # #########################################################
     # ZABBIX GLOBAL SETTING
     def get_global_setting(self):
@@ -125,10 +413,7 @@ class ZabbixApi(object):
         :rtype: dict
         """
         existing_host = self.send_api_request(
-            method='host.get',
-            params={
-                'output': ['name', 'host', 'hostid'],
-                'filter': search_filter})
+            *self.search_request('host', search_filter))
 
         return existing_host
 
@@ -205,10 +490,7 @@ class ZabbixApi(object):
         :rtype: dict
         """
         existing_groups = self.send_api_request(
-            method='hostgroup.get',
-            params={
-                'output': ['name', 'groupid'],
-                'filter': search_filter})
+            *self.search_request('hostgroup', search_filter))
 
         return existing_groups
 
@@ -225,13 +507,11 @@ class ZabbixApi(object):
         :raise:
             * NoParametersForSearch - if hostgroup_names is empty
         """
-        if hostgroup_names and len(hostgroup_names) > 0:
-            search_filter = {'name': hostgroup_names}
-        else:
+        if not hostgroup_names:
             raise NoParametersForSearch(
                 "No parameters for searching for Zabbix host group(s)")
 
-        return self.find_zabbix_hostgroups(search_filter)
+        return self.find_zabbix_objects_by_names('hostgroup', hostgroup_names)
 
     def find_zabbix_hostgroups_by_group_ids(self, hostgroup_ids):
         """
@@ -267,10 +547,7 @@ class ZabbixApi(object):
         :rtype: dict
         """
         existing_templates = self.send_api_request(
-            method='template.get',
-            params={
-                'output': ['name', 'templateid'],
-                'filter': search_filter})
+            *self.search_request('template', search_filter))
         return existing_templates
 
     def find_zabbix_templates_by_names(self, template_names):
@@ -286,13 +563,11 @@ class ZabbixApi(object):
         :raise:
             * NoParametersForSearch - if template_names is empty
         """
-        if template_names and len(template_names) > 0:
-            search_filter = {'name': template_names}
-        else:
+        if not template_names:
             raise NoParametersForSearch(
                 "No parameters for searching for Zabbix templates")
 
-        return self.find_zabbix_templates(search_filter)
+        return self.find_zabbix_objects_by_names('template', template_names)
 
     def find_zabbix_templates_by_ids(self, template_ids):
         """
@@ -327,15 +602,8 @@ class ZabbixApi(object):
         :return: found proxy
         :rtype: list
         """
-        output_list = ['name', 'proxyid']
-        if Zabbix_version(self.zbx_api_version) < Zabbix_version('7.0.0'):
-            output_list = ['host', 'proxyid']
-
         existing_proxies = self.send_api_request(
-            method='proxy.get',
-            params={
-                'output': output_list,
-                'filter': search_filter})
+            *self.search_request('proxy', search_filter))
 
         return existing_proxies
 
@@ -352,15 +620,11 @@ class ZabbixApi(object):
         :raise:
             * NoParametersForSearch - if proxy_names is empty
         """
-        if proxy_names and len(proxy_names) > 0:
-            search_filter = {'name': proxy_names}
-            if Zabbix_version(self.zbx_api_version) < Zabbix_version('7.0.0'):
-                search_filter = {'host': proxy_names}
-        else:
+        if not proxy_names:
             raise NoParametersForSearch(
                 "No parameters for searching for Zabbix proxy")
 
-        return self.find_zabbix_proxies(search_filter)
+        return self.find_zabbix_objects_by_names('proxy', proxy_names)
 
     def find_zabbix_proxy_by_ids(self, proxy_ids):
         """
@@ -396,10 +660,7 @@ class ZabbixApi(object):
         :rtype: list
         """
         existing_proxy_groups = self.send_api_request(
-            method='proxygroup.get',
-            params={
-                'output': ['name', 'proxy_groupid'],
-                'filter': search_filter})
+            *self.search_request('proxy_group', search_filter))
 
         return existing_proxy_groups
 
@@ -416,10 +677,8 @@ class ZabbixApi(object):
         :raise:
             * NoParametersForSearch - if proxy_group_names is empty
         """
-        if proxy_group_names and len(proxy_group_names) > 0:
-            search_filter = {'name': proxy_group_names}
-        else:
+        if not proxy_group_names:
             raise NoParametersForSearch(
                 "No parameters for searching for Zabbix proxy group")
 
-        return self.find_zabbix_proxy_groups(search_filter)
+        return self.find_zabbix_objects_by_names('proxy_group', proxy_group_names)
@@ -13,6 +13,11 @@ module: zabbix_event
 short_description: Module for event actions
 description:
     - Update/Get existing events in Zabbix. Currently implemented only message action.
+    - If C(queue_path) is specified, messages are not sent immediately, but saved to the queue file.
+      The queue is flushed when it contains C(flush_size) events or its oldest message is older
+      than C(flush_interval) seconds. The events that get the same message are updated
+      with one C(event.acknowledge) request, and the requests are sent in JSON-RPC batches
+      of C(batch_size) requests, so a storm of events costs a few API calls.
 author:
     - Zabbix Ltd (@zabbix)
 requirements:
@@ -23,17 +28,41 @@ options:
         type: str
         default: message
         required: false
-        choices: [ message ]
+        choices: [ message, flush ]
     ids:
-        description: List of host groups to create/remove.
+        description:
+            - List of event IDs to update.
+            - Required if C(action=message).
         type: list
         elements: str
-        required: true
         aliases: [ eventids, event_ids ]
     msg:
-        description: Update event with message
+        description:
+            - Update event with message.
+            - Required if C(action=message).
         type: str
-        required: true
+    queue_path:
+        description:
+            - Path to the queue file on the node that executes the module.
+            - If specified, messages are queued and sent in batches.
+            - Use C(action=flush) to send all queued messages, e.g. at the end of a playbook or periodically.
+            - Messages that are being sent are kept in the file with the C(.pending) suffix until
+              they are sent. If the module is killed, its messages are queued again by the next module.
+        type: path
+    flush_size:
+        description: Number of queued events that triggers sending of the queue.
+        type: int
+        default: 100
+    flush_interval:
+        description: Age of the oldest queued message in seconds that triggers sending of the queue.
+        type: int
+        default: 30
+    batch_size:
+        description:
+            - Maximum number of C(event.acknowledge) requests in one JSON-RPC batch.
+            - Used only with C(queue_path).
+        type: int
+        default: 10
 '''
 
 EXAMPLES = r'''
@@ -48,20 +77,281 @@ EXAMPLES = r'''
     ansible_connection: httpapi
     ansible_user: Admin
     ansible_httpapi_pass: zabbix
+
+# To queue a message, so that it is sent together with the messages of other playbooks
+- name: Queue event message
+  zabbix.zabbix.zabbix_event:
+    action: message
+    ids: ["2222"]
+    msg: "EDA : Starting remediation"
+    queue_path: /var/tmp/zabbix_event_queue
+  vars:
+    ansible_network_os: zabbix.zabbix.zabbix
+    ansible_connection: httpapi
+    ansible_user: Admin
+    ansible_httpapi_pass: zabbix
+
+# To send all queued messages
+- name: Flush event messages
+  zabbix.zabbix.zabbix_event:
+    action: flush
+    queue_path: /var/tmp/zabbix_event_queue
+  vars:
+    ansible_network_os: zabbix.zabbix.zabbix
+    ansible_connection: httpapi
+    ansible_user: Admin
+    ansible_httpapi_pass: zabbix
 '''
 
 RETURN = r""" # """
 
+import errno
+import fcntl
+import json
+import os
+import time
+from collections import OrderedDict
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api import ZabbixApi
 
 
+class EventQueue(object):
+    """
+    Class for the queue of event messages saved in a file.
+    Each line of the file is a JSON object with the event IDs, the message and the time
+    when it was queued. The file is locked while it is read or changed, so several
+    playbooks can use the same queue at the same time.
+    Taken entries are kept in the pending file (the queue path with the '.pending' suffix)
+    with the PID of the module that sends them until they are released. Entries of
+    modules that are no longer running (e.g. killed) are queued again.
+
+    :param path: path to the queue file
+    :type path: str
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pending_path = path + '.pending'
+
+    @staticmethod
+    def read(entries_file):
+        """
+        The function reads entries from the file.
+
+        :param entries_file: opened file
+        :type entries_file: file
+
+        :rtype: list
+        :return: entries
+        """
+        entries = []
+        entries_file.seek(0)
+        for line in entries_file:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A line written partially, e.g. when the disk is full
+                continue
+        return entries
+
+    @staticmethod
+    def is_running(pid):
+        """
+        The function checks whether the process is running.
+
+        :param pid: process ID
+        :type pid: int
+
+        :rtype: bool
+        :return: result of checking
+        """
+        if not pid:
+            return False
+        try:
+            os.kill(pid, 0)
+        except OSError as e:
+            return e.errno == errno.EPERM
+        return True
+
+    def load_pending(self):
+        """
+        The function reads the pending entries.
+        The queue file must be locked.
+
+        :rtype: list
+        :return: pending entries
+        """
+        try:
+            with open(self.pending_path, 'r') as pending_file:
+                return self.read(pending_file)
+        except (IOError, OSError) as e:
+            if e.errno == errno.ENOENT:
+                return []
+            raise
+
+    def save_pending(self, entries):
+        """
+        The function replaces the pending entries.
+        The queue file must be locked.
+
+        :param entries: pending entries
+        :type entries: list
+
+        :return: None
+        """
+        if not entries:
+            if os.path.exists(self.pending_path):
+                os.remove(self.pending_path)
+            return
+        tmp_path = self.pending_path + '.tmp'
+        with open(tmp_path, 'w') as pending_file:
+            for entry in entries:
+                pending_file.write(json.dumps(entry) + '\n')
+            pending_file.flush()
+            os.fsync(pending_file.fileno())
+        os.rename(tmp_path, self.pending_path)
+
+    @staticmethod
+    def write(queue_file, entries):
+        """
+        The function writes entries to the end of the queue file and syncs it.
+
+        :param queue_file: opened queue file
+        :type queue_file: file
+        :param entries: entries to write
+        :type entries: list
+
+        :return: None
+        """
+        for entry in entries:
+            queue_file.write(json.dumps(dict((k, v) for k, v in entry.items() if k != 'pid')) + '\n')
+        queue_file.flush()
+        os.fsync(queue_file.fileno())
+
+    def exchange(self, entries, flush_size, flush_interval, force=False, check_mode=False):
+        """
+        The function adds entries to the queue and takes all queued entries
+        if the queue should be flushed. Taken entries are moved to the pending file
+        and must be released with the release function after they are sent.
+        In check mode, the queue file is not changed.
+
+        :param entries: new entries with 'ids', 'msg' and 'time' keys
+        :type entries: list
+        :param flush_size: number of queued events that triggers flushing
+        :type flush_size: int
+        :param flush_interval: age of the oldest entry in seconds that triggers flushing
+        :type flush_interval: int
+        :param force: whether the queue should be flushed regardless of its size and age
+        :type force: bool
+        :param check_mode: whether the queue file should be left unchanged
+        :type check_mode: bool
+
+        :rtype: tuple
+        :return: taken entries and number of events left in the queue
+        """
+        if check_mode and not os.path.exists(self.path):
+            return self.take(list(entries), flush_size, flush_interval, force)
+
+        with open(self.path, 'r' if check_mode else 'a+') as queue_file:
+            fcntl.flock(queue_file, fcntl.LOCK_SH if check_mode else fcntl.LOCK_EX)
+            queued = self.read(queue_file)
+            pending = self.load_pending()
+            orphaned = [entry for entry in pending if not self.is_running(entry.get('pid'))]
+            taken, events = self.take(queued + orphaned + list(entries), flush_size, flush_interval, force)
+            if check_mode:
+                return taken, events
+
+            pending = [entry for entry in pending if entry not in orphaned]
+            if taken:
+                # The entries are saved as pending before the queue is truncated,
+                # so they are not lost if the module is killed while sending them
+                taken = [dict(entry, pid=os.getpid()) for entry in taken]
+                self.save_pending(pending + taken)
+                queue_file.truncate(0)
+            else:
+                self.write(queue_file, orphaned + list(entries))
+                if orphaned:
+                    self.save_pending(pending)
+            return taken, events
+
+    def release(self, taken, requeued=None):
+        """
+        The function removes the taken entries from the pending file
+        and queues again the entries which were not sent.
+
+        :param taken: entries returned by the exchange function
+        :type taken: list
+        :param requeued: taken entries to queue again
+        :type requeued: list
+
+        :return: None
+        """
+        with open(self.path, 'a') as queue_file:
+            fcntl.flock(queue_file, fcntl.LOCK_EX)
+            if requeued:
+                self.write(queue_file, requeued)
+            pending = self.load_pending()
+            for entry in taken:
+                if entry in pending:
+                    pending.remove(entry)
+            self.save_pending(pending)
+
+    @staticmethod
+    def take(queued, flush_size, flush_interval, force):
+        """
+        The function checks whether the queue should be flushed.
+
+        :param queued: all queued entries including the new ones
+        :type queued: list
+        :param flush_size: number of queued events that triggers flushing
+        :type flush_size: int
+        :param flush_interval: age of the oldest entry in seconds that triggers flushing
+        :type flush_interval: int
+        :param force: whether the queue should be flushed regardless of its size and age
+        :type force: bool
+
+        :rtype: tuple
+        :return: taken entries and number of events left in the queue
+        """
+        if not queued:
+            return [], 0
+
+        events = sum(len(entry['ids']) for entry in queued)
+        oldest = min(entry['time'] for entry in queued)
+        if force or events >= flush_size or time.time() - oldest >= flush_interval:
+            return queued, 0
+        return [], events
+
+
+def coalesce(entries):
+    """
+    The function groups the event IDs of queued entries by messages.
+
+    :param entries: queued entries
+    :type entries: list
+
+    :rtype: list
+    :return: pairs (message, event IDs) in the order of the first entry with the message
+    """
+    messages = OrderedDict()
+    for entry in entries:
+        ids, seen = messages.setdefault(entry['msg'], ([], set()))
+        for eventid in entry['ids']:
+            if eventid not in seen:
+                seen.add(eventid)
+                ids.append(eventid)
+    return [(msg, ids) for msg, (ids, seen) in messages.items()]
+
+
 class Event(object):
 
     def __init__(self, module):
         self.module = module
         self.zapi = ZabbixApi(module)
         self.zbx_api_version = self.zapi.api_version()
+        # Messages of the batches for which responses were received
+        self.sent_messages = set()
 
     def message(self, ids, msg):
         """
@@ -87,6 +377,36 @@ class Event(object):
 
         return [str(elem) for elem in result["eventids"]]
 
+    def message_batch(self, messages, batch_size):
+        """
+        The function adds messages to the events, one request for each message.
+        Requests are sent in JSON-RPC batches.
+
+        :param messages: pairs (message, event IDs)
+        :type messages: list
+        :param batch_size: maximum number of requests in one batch
+        :type batch_size: int
+
+        :rtype: tuple
+        :return: list of updated event IDs and list of failed messages
+            as tuples (message, event IDs, error)
+        """
+        updated = []
+        failed = []
+        for start in range(0, len(messages), batch_size):
+            chunk = messages[start:start + batch_size]
+            responses = self.zapi.send_batch([
+                ('event.acknowledge', {'action': 4, 'eventids': ids, 'message': msg})
+                for msg, ids in chunk])
+            for (msg, ids), response in zip(chunk, responses):
+                self.sent_messages.add(msg)
+                if 'error' in response:
+                    failed.append((msg, ids, response['error']))
+                else:
+                    updated.extend(str(elem) for elem in response['result']['eventids'])
+
+        return updated, failed
+
 
 def main():
     """entry point for module execution"""
@@ -94,24 +414,91 @@ def main():
         'action': {
             'type': 'str',
             'default': 'message',
-            'choices': ['message']},
+            'choices': ['message', 'flush']},
         'ids': {
             'type': 'list',
             'elements': 'str',
-            'aliases': ['event_ids', 'eventids'],
-            'required': True},
+            'aliases': ['event_ids', 'eventids']},
         'msg': {
-            'type': 'str',
-            'required': True}}
+            'type': 'str'},
+        'queue_path': {
+            'type': 'path'},
+        'flush_size': {
+            'type': 'int',
+            'default': 100},
+        'flush_interval': {
+            'type': 'int',
+            'default': 30},
+        'batch_size': {
+            'type': 'int',
+            'default': 10}}
 
     module = AnsibleModule(
         argument_spec=spec,
+        required_if=[
+            ['action', 'message', ['ids', 'msg']],
+            ['action', 'flush', ['queue_path']]],
         supports_check_mode=True)
 
     action = module.params['action']
     ids = module.params['ids']
     message = module.params['msg']
 
+    if module.params['batch_size'] < 1:
+        module.fail_json(msg="The batch_size parameter must be greater than 0.")
+
+    if module.params['queue_path']:
+        entries = []
+        if action == 'message':
+            entries.append({'ids': ids, 'msg': message, 'time': time.time()})
+        queue = EventQueue(module.params['queue_path'])
+        try:
+            taken, queued = queue.exchange(
+                entries, module.params['flush_size'], module.params['flush_interval'],
+                force=action == 'flush', check_mode=module.check_mode)
+        except (IOError, OSError) as e:
+            module.fail_json(msg="Failed to use the queue file: {0}".format(e))
+
+        if not taken:
+            module.exit_json(
+                changed=False, queued=queued,
+                result="Queued event(s): {0}".format(queued))
+
+        # Check mode
+        if module.check_mode:
+            module.exit_json(changed=True, queued=0)
+
+        # The API connection is opened only when the queue is flushed
+        event = None
+        try:
+            event = Event(module)
+            updated, failed = event.message_batch(coalesce(taken), module.params['batch_size'])
+        except BaseException:
+            # The module is stopped by a connection error, so the taken messages
+            # which were not sent are queued again before the module exits
+            sent_messages = event.sent_messages if event is not None else set()
+            queue.release(taken, [entry for entry in taken if entry['msg'] not in sent_messages])
+            raise
+        # Failed messages are sent again with the next flush
+        failed_messages = set(msg for msg, failed_ids, error in failed)
+        try:
+            queue.release(taken, [entry for entry in taken if entry['msg'] in failed_messages])
+        except (IOError, OSError) as e:
+            module.fail_json(changed=len(updated) > 0, msg="Failed to use the queue file: {0}".format(e))
+        if failed:
+            module.fail_json(
+                changed=len(updated) > 0,
+                msg="Failed to update event(s): {0}".format("; ".join(
+                    "{0}: {1}".format(", ".join(failed_ids), error)
+                    for msg, failed_ids, error in failed)))
+        module.exit_json(
+            changed=len(updated) > 0, queued=0,
+            result="Successfully updated event(s): {0}".format(", ".join(updated)))
+
+    # Check mode
+    if module.check_mode:
+        module.exit_json(changed=True)
+
     event = Event(module)
 
     if action == 'message':
@@ -32,6 +32,13 @@ options:
         elements: str
         required: true
         aliases: [ host_group, host_groups, name ]
+    batch_size:
+        description:
+            - Maximum number of host groups created with one request.
+            - If the request fails, the host groups are created one by one
+              and the error is reported for each failed host group.
+        type: int
+        default: 100
 '''
 
 EXAMPLES = r'''
@@ -91,7 +98,8 @@ EXAMPLES = r'''
 RETURN = r""" # """
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api import ZabbixApi
+from ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api import (
+    ZabbixApi, ZabbixApiRequestError)
 
 
 class HostGroup(object):
@@ -100,6 +108,7 @@ class HostGroup(object):
         self.module = module
         self.zapi = ZabbixApi(module)
         self.zbx_api_version = self.zapi.api_version()
+        self.batch_size = module.params['batch_size']
 
     def create(self, hostgroups):
         """
@@ -131,23 +140,45 @@ class HostGroup(object):
                 msg="Failed to get existing host group(s): {0}".format(e))
 
         # search for host group to create
-        hostgroup_for_create = list(
-            set(hostgroup_names) - set(eg['name'] for eg in existing_hostgroups))
+        existing_names = set(eg['name'] for eg in existing_hostgroups)
+        hostgroup_for_create = []
+        for group in hostgroup_names:
+            if group not in existing_names and group not in hostgroup_for_create:
+                hostgroup_for_create.append(group)
 
         if self.module.check_mode:
             self.module.exit_json(changed=True)
 
-        # creating host group
+        # creating host groups with one request for each 'batch_size' host groups
         added_hostgroups = []
-        for group in hostgroup_for_create:
+        failed_hostgroups = []
+        for i in range(0, len(hostgroup_for_create), self.batch_size):
+            batch = hostgroup_for_create[i:i + self.batch_size]
             try:
-                self.zapi.send_api_request(
+                self.zapi.try_api_request(
                     method='hostgroup.create',
-                    params={'name': group})
-            except Exception as e:
-                self.module.fail_json(
-                    msg="Failed to create host group(s): {0}".format(e))
-            added_hostgroups.append(group)
+                    params=[{'name': group} for group in batch])
+                added_hostgroups.extend(batch)
+                continue
+            except ZabbixApiRequestError as e:
+                if len(batch) == 1:
+                    failed_hostgroups.append('{0}: {1}'.format(batch[0], e.message))
+                    continue
+
+            # The request is rolled back completely, so find the failed host groups
+            for group in batch:
+                try:
+                    self.zapi.try_api_request(
+                        method='hostgroup.create',
+                        params=[{'name': group}])
+                    added_hostgroups.append(group)
+                except ZabbixApiRequestError as e:
+                    failed_hostgroups.append('{0}: {1}'.format(group, e.message))
+
+        if failed_hostgroups:
+            self.module.fail_json(
+                changed=len(added_hostgroups) > 0,
+                msg="Failed to create host group(s): {0}".format("; ".join(failed_hostgroups)))
 
         return added_hostgroups
 
@@ -211,12 +242,18 @@ def main():
             'type': 'list',
             'elements': 'str',
             'aliases': ['host_group', 'name', 'host_groups'],
-            'required': True}}
+            'required': True},
+        'batch_size': {
+            'type': 'int',
+            'default': 100}}
 
     module = AnsibleModule(
         argument_spec=spec,
         supports_check_mode=True)
 
+    if module.params['batch_size'] < 1:
+        module.fail_json(msg="batch_size must be greater than 0")
+
     state = module.params['state']
     hostgroups = module.params['hostgroups']
 
@@ -0,0 +1,433 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: zabbix_hosts
+short_description: Module for creating, updating and deleting many hosts at once.
+description:
+    - The module is designed to create, update, or delete a list of hosts in Zabbix with a few API requests.
+    - All existing hosts, host groups, templates, proxies and proxy groups of all hosts
+      are requested from Zabbix with one JSON-RPC batch request.
+    - Hosts are created, updated, and deleted in batches. If a batch fails,
+      its hosts are processed one by one to find the failed ones.
+    - A host with invalid parameters is reported as failed, and the other hosts are still processed.
+    - In case of updating an existing host, only the specified parameters will be updated.
+author:
+    - Zabbix Ltd (@zabbix)
+requirements:
+    - "python >= 2.6"
+options:
+    batch_size:
+        description: Maximum number of hosts in one request to create, update, or delete hosts.
+        type: int
+        default: 100
+extends_documentation_fragment:
+    - zabbix.zabbix.host.hosts
+notes:
+    - If I(tls_psk_identity) or I(tls_psk) is defined or macro I(type=secret), then every launch of the task will update the host
+      because Zabbix API does not have access to an existing PSK key or secret macros, and it is not possible to compare
+      the specified value with the existing one.
+    - Only one interface of each type is supported.
+    - Each host name can be specified only once in the list.
+'''
+
+EXAMPLES = r'''
+# To create or update several hosts at once
+- name: Create hosts
+  zabbix.zabbix.zabbix_hosts:
+    hosts:
+      - host: Example host 1
+        hostgroups:
+          - Linux servers
+        templates:
+          - Linux by Zabbix agent
+        interfaces:
+          - type: agent
+            ip: 192.168.100.51
+      - host: Example host 2
+        hostgroups:
+          - Linux servers
+        status: disabled
+  vars:
+    ansible_network_os: zabbix.zabbix.zabbix
+    ansible_connection: httpapi
+    ansible_user: Admin
+    ansible_httpapi_pass: zabbix
+
+# To create some hosts and delete others
+- name: Create and delete hosts
+  zabbix.zabbix.zabbix_hosts:
+    batch_size: 50
+    hosts:
+      - host: New host
+        hostgroups:
+          - Linux servers
+      - host: Old host
+        state: absent
+  vars:
+    ansible_network_os: zabbix.zabbix.zabbix
+    ansible_connection: httpapi
+    ansible_user: Admin
+    ansible_httpapi_pass: zabbix
+'''
+
+RETURN = r""" # """
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api import (
+    ZabbixApi, ZabbixException, NoParametersForSearch, ZabbixApiRequestError)
+from ansible_collections.zabbix.zabbix.plugins.module_utils.host import (
+    Host, host_spec)
+from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import (
+    Zabbix_version)
+
+
+class BulkZabbixApi(ZabbixApi):
+    """
+    Zabbix API class that resolves names of host groups, templates,
+    proxies and proxy groups for all hosts at once.
+    Names that were not preloaded are requested from Zabbix as usual.
+    """
+
+    def __init__(self, module):
+        super(BulkZabbixApi, self).__init__(module)
+        self.use_cache = True
+        self.resolved = {
+            'hostgroups': {}, 'templates': {},
+            'proxies': {}, 'proxy_groups': {}}
+
+    def preload(self, hosts, requests=None):
+        """
+        The function requests all host groups, templates, proxies and proxy groups
+        used by the given hosts. All searches and additional requests are sent
+        with one batch request.
+
+        :param hosts: list of host parameters
+        :type hosts: list
+        :param requests: additional requests (method, params) to send in the same batch
+        :type requests: list
+
+        :return: None
+        """
+        names = dict((k, set()) for k in self.resolved)
+        for each in hosts:
+            if each.get('state') == 'absent':
+                continue
+            names['hostgroups'].update(each.get('hostgroups') or [])
+            names['templates'].update(each.get('templates') or [])
+            if each.get('proxy'):
+                names['proxies'].add(each['proxy'])
+            if each.get('proxy_group'):
+                names['proxy_groups'].add(each['proxy_group'])
+        names = dict((k, sorted(v)) for k, v in names.items())
+
+        proxy_name = 'name'
+        if Zabbix_version(self.api_version()) < Zabbix_version('7.0.0'):
+            proxy_name = 'host'
+            names['proxy_groups'] = []
+
+        batch = list(requests or [])
+        object_types = [
+            ('hostgroups', 'hostgroup'), ('templates', 'template'),
+            ('proxies', 'proxy'), ('proxy_groups', 'proxy_group')]
+        for key, object_type in object_types:
+            if names[key]:
+                # Objects found in the cache are not requested
+                request, cached = self.names_request(object_type, names[key])
+                if request is not None:
+                    batch.append(request)
+        self.prefetch(batch)
+
+        if names['hostgroups']:
+            self.resolved['hostgroups'] = dict(
+                (g['name'], g) for g in super(BulkZabbixApi, self).find_zabbix_hostgroups_by_names(
+                    names['hostgroups']))
+        if names['templates']:
+            self.resolved['templates'] = dict(
+                (t['name'], t) for t in super(BulkZabbixApi, self).find_zabbix_templates_by_names(
+                    names['templates']))
+        if names['proxies']:
+            self.resolved['proxies'] = dict(
+                (p[proxy_name], p) for p in super(BulkZabbixApi, self).find_zabbix_proxy_by_names(
+                    names['proxies']))
+        if names['proxy_groups']:
+            self.resolved['proxy_groups'] = dict(
+                (pg['name'], pg) for pg in super(BulkZabbixApi, self).find_zabbix_proxy_groups_by_names(
+                    names['proxy_groups']))
+
+    def _find_resolved(self, object_type, names):
+        """
+        The function returns preloaded objects with the given names.
+
+        :param object_type: type of objects (key of self.resolved)
+        :type object_type: str
+        :param names: names of objects
+        :type names: list|str
+
+        :rtype: list
+        :return: found objects
+        """
+        if not isinstance(names, list):
+            names = [names]
+        return [self.resolved[object_type][n] for n in names if n in self.resolved[object_type]]
+
+    def find_zabbix_hostgroups_by_names(self, hostgroup_names):
+        if not hostgroup_names:
+            raise NoParametersForSearch(
+                "No parameters for searching for Zabbix host group(s)")
+        return self._find_resolved('hostgroups', hostgroup_names)
+
+    def find_zabbix_templates_by_names(self, template_names):
+        if not template_names:
+            raise NoParametersForSearch(
+                "No parameters for searching for Zabbix templates")
+        return self._find_resolved('templates', template_names)
+
+    def find_zabbix_proxy_by_names(self, proxy_names):
+        if not proxy_names:
+            raise NoParametersForSearch(
+                "No parameters for searching for Zabbix proxy")
+        return self._find_resolved('proxies', proxy_names)
+
+    def find_zabbix_proxy_groups_by_names(self, proxy_group_names):
+        if not proxy_group_names:
+            raise NoParametersForSearch(
+                "No parameters for searching for Zabbix proxy group")
+        return self._find_resolved('proxy_groups', proxy_group_names)
+
+
+class HostValidationError(ZabbixException):
+    """Exception class when the parameters of one host of the list are invalid"""
+    pass
+
+
+class HostDefinition(object):
+    """
+    Class representing one element of the 'hosts' list as a module
+    for the Host class. Errors are raised as HostValidationError,
+    so the other hosts of the list are still processed.
+    """
+
+    def __init__(self, module, params):
+        self.module = module
+        self.params = params
+        self.check_mode = module.check_mode
+
+    def fail_json(self, **kwargs):
+        raise HostValidationError(kwargs.get('msg'))
+
+    def exit_json(self, **kwargs):
+        self.module.exit_json(**kwargs)
+
+
+class Hosts(object):
+
+    def __init__(self, module):
+        self.module = module
+        self.zapi = BulkZabbixApi(module)
+        self.zbx_api_version = self.zapi.api_version()
+        self.batch_size = module.params['batch_size']
+
+    def get_zabbix_hosts_request(self, hosts):
+        """
+        The function generates a request to get information about
+        all existing hosts from the list.
+
+        :param hosts: list of host parameters
+        :type hosts: list
+
+        :rtype: tuple
+        :return: method and params for request
+        """
+        params = Host(self.module, self.zapi).get_zabbix_host_params(hosts)
+        params['filter'] = {'host': [h['host'] for h in hosts]}
+
+        return 'host.get', params
+
+    def get_zabbix_hosts(self, hosts):
+        """
+        The function gets information about all existing hosts from the list
+        with one request. Items linked to inventory fields are requested
+        with one more request if inventory is specified.
+
+        :param hosts: list of host parameters
+        :type hosts: list
+
+        :rtype: dict
+        :return: parameters of existing hosts by technical name
+        """
+        try:
+            existing_hosts = self.zapi.send_api_request(
+                *self.get_zabbix_hosts_request(hosts))
+        except Exception as e:
+            self.module.fail_json(
+                msg="Failed to get existing hosts: {0}".format(e))
+        existing_hosts = dict((h['host'], h) for h in existing_hosts)
+
+        # Items linked to inventory fields are required only to update the inventory
+        hostids = [
+            existing_hosts[h['host']]['hostid'] for h in hosts
+            if h.get('inventory') is not None and h['host'] in existing_hosts]
+        if hostids:
+            try:
+                items = self.zapi.send_api_request(
+                    *Host(self.module, self.zapi).get_inventory_links_request(hostids))
+            except Exception as e:
+                self.module.fail_json(
+                    msg="Failed to get items of existing hosts: {0}".format(e))
+            for host in existing_hosts.values():
+                host['items'] = [i for i in items if i['hostid'] == host['hostid']]
+
+        return existing_hosts
+
+    def send_in_batches(self, method, requests, results):
+        """
+        The function sends requests in batches of 'batch_size' elements.
+        If a batch fails, its elements are sent one by one to find the failed ones.
+
+        :param method: method for request
+        :type method: str
+        :param requests: list of pairs (host name, request parameters)
+        :type requests: list
+        :param results: summary for each host by technical name
+        :type results: dict
+
+        :return: None
+        """
+        for i in range(0, len(requests), self.batch_size):
+            batch = requests[i:i + self.batch_size]
+            try:
+                self.zapi.try_api_request(
+                    method=method,
+                    params=[r[1] for r in batch])
+                continue
+            except ZabbixApiRequestError as e:
+                if len(batch) == 1:
+                    results[batch[0][0]]['failed'] = True
+                    results[batch[0][0]]['msg'] = e.message
+                    continue
+
+            for name, params in batch:
+                try:
+                    self.zapi.try_api_request(
+                        method=method,
+                        params=[params])
+                except ZabbixApiRequestError as e:
+                    results[name]['failed'] = True
+                    results[name]['msg'] = e.message
+
+    def process(self, hosts):
+        """
+        The function compares the list of hosts with existing hosts in Zabbix
+        and creates, updates, or deletes them.
+
+        :param hosts: list of host parameters
+        :type hosts: list
+
+        :rtype: list
+        :return: summary for each host
+        """
+        names = [h['host'] for h in hosts]
+        duplicates = sorted(set(n for n in names if names.count(n) > 1))
+        if duplicates:
+            self.module.fail_json(
+                msg="Duplicate hosts in the list: {0}".format(', '.join(duplicates)))
+
+        self.zapi.preload(hosts, [self.get_zabbix_hosts_request(hosts)])
+        existing_hosts = self.get_zabbix_hosts(hosts)
+
+        results = {}
+        for_create = []
+        for_update = []
+        for_delete = []
+        for each in hosts:
+            host_name = each['host']
+            host = Host(HostDefinition(self.module, each), self.zapi)
+            exist_host = existing_hosts.get(host_name)
+            result = {'host': host_name, 'action': 'not changed', 'failed': False}
+
+            try:
+                if each['state'] == 'present':
+                    if exist_host is not None:
+                        host.set_inventory_links(exist_host)
+                        new_host_params = host.generate_zabbix_host(exist_host)
+                        compare_result = host.compare_zabbix_host(exist_host, new_host_params)
+                        if compare_result:
+                            result['action'] = 'updated'
+                            result['changes'] = sorted(
+                                k for k in compare_result if k != 'templates_clear')
+                            compare_result['hostid'] = exist_host['hostid']
+                            for_update.append((host_name, compare_result))
+                    else:
+                        new_host_params = host.generate_zabbix_host()
+                        result['action'] = 'created'
+                        for_create.append((host_name, new_host_params))
+                elif exist_host is not None:
+                    result['action'] = 'deleted'
+                    for_delete.append((host_name, exist_host['hostid']))
+            except HostValidationError as e:
+                # The host is reported as failed, the other hosts are processed
+                result['failed'] = True
+                result['msg'] = e.message
+
+            results[host_name] = result
+
+        if not self.module.check_mode:
+            self.send_in_batches('host.create', for_create, results)
+            self.send_in_batches('host.update', for_update, results)
+            self.send_in_batches('host.delete', for_delete, results)
+
+        return [results[n] for n in names]
+
+
+def main():
+    """entry point for module execution"""
+    spec = {
+        'batch_size': {
+            'type': 'int',
+            'default': 100},
+        'hosts': {
+            'type': 'list',
+            'elements': 'dict',
+            'required': True,
+            'options': host_spec,
+            'mutually_exclusive': [('proxy', 'proxy_group')],
+            'required_together': [('tls_psk_identity', 'tls_psk')]}}
+
+    module = AnsibleModule(
+        argument_spec=spec,
+        supports_check_mode=True)
+
+    if module.params['batch_size'] < 1:
+        module.fail_json(msg="batch_size must be greater than 0")
+
+    hosts = Hosts(module)
+    result = hosts.process(module.params['hosts'])
+
+    failed = [h['host'] for h in result if h['failed']]
+    changed = any(h['action'] != 'not changed' and not h['failed'] for h in result)
+    counts = dict((a, len([h for h in result if h['action'] == a and not h['failed']]))
+                  for a in ['created', 'updated', 'deleted', 'not changed'])
+
+    if failed:
+        module.fail_json(
+            msg="Failed to process host(s): {0}".format(', '.join(failed)),
+            changed=changed,
+            hosts=result)
+
+    module.exit_json(
+        changed=changed,
+        result="Successfully processed hosts. Created: {0}, updated: {1}, deleted: {2}, not changed: {3}".format(
+            counts['created'], counts['updated'], counts['deleted'], counts['not changed']),
+        hosts=result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: zabbix_proxy_balance
+short_description: Module for distributing hosts evenly across proxies.
+description:
+    - The module reads the current distribution of hosts across the specified proxies
+      and moves hosts from the most loaded proxies to the least loaded ones.
+    - Only the hosts required to even out the load are moved.
+    - Hosts are moved with C(host.massupdate) requests, one request for each target proxy
+      and each C(batch_size) hosts.
+    - Only enabled hosts monitored by the specified proxies are balanced.
+      Hosts monitored by proxy groups are not changed.
+author:
+    - Zabbix Ltd (@zabbix)
+requirements:
+    - "python >= 2.6"
+options:
+    proxies:
+        description: Names of the proxies to distribute hosts across.
+        type: list
+        elements: str
+        required: true
+    hostgroups:
+        description: Balance only the hosts of these host groups.
+        type: list
+        elements: str
+    include_unassigned:
+        description: Whether hosts monitored by Zabbix server should also be assigned to the proxies.
+        type: bool
+        default: false
+    load_item_key:
+        description:
+            - Key of the item whose last value is used as the load of a host, for example its required performance (NVPS).
+            - If not specified, each host has the same load, so the number of hosts is balanced.
+            - Hosts without this item get the average load of other hosts.
+        type: str
+    tolerance:
+        description:
+            - Allowed excess of the proxy load over the average load, in percent.
+            - Hosts are not moved if the load of all proxies is within the tolerance.
+        type: int
+        default: 0
+    batch_size:
+        description: Maximum number of hosts in one C(host.massupdate) request.
+        type: int
+        default: 100
+'''
+
+EXAMPLES = r'''
+# To distribute all hosts of three proxies evenly
+- name: Balance proxies
+  zabbix.zabbix.zabbix_proxy_balance:
+    proxies:
+      - Proxy 1
+      - Proxy 2
+      - Proxy 3
+  vars:
+    ansible_network_os: zabbix.zabbix.zabbix
+    ansible_connection: httpapi
+    ansible_user: Admin
+    ansible_httpapi_pass: zabbix
+
+# To assign hosts of a host group monitored by the server to proxies
+# according to the value of an item and to allow 10% of imbalance
+- name: Balance proxies by required performance
+  zabbix.zabbix.zabbix_proxy_balance:
+    proxies:
+      - Proxy 1
+      - Proxy 2
+    hostgroups:
+      - Linux servers
+    include_unassigned: true
+    load_item_key: nvps
+    tolerance: 10
+  vars:
+    ansible_network_os: zabbix.zabbix.zabbix
+    ansible_connection: httpapi
+    ansible_user: Admin
+    ansible_httpapi_pass: zabbix
+'''
+
+RETURN = r""" # """
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api import (
+    ZabbixApi, ZabbixApiRequestError)
+from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import (
+    Zabbix_version)
+
+
+class ProxyBalance(object):
+
+    def __init__(self, module):
+        self.module = module
+        self.zapi = ZabbixApi(module)
+        self.zbx_api_version = self.zapi.api_version()
+        self.batch_size = module.params['batch_size']
+
+        if Zabbix_version(self.zbx_api_version) < Zabbix_version('7.0.0'):
+            self.proxy_field = 'proxy_hostid'
+            self.proxy_name = 'host'
+        else:
+            self.proxy_field = 'proxyid'
+            self.proxy_name = 'name'
+
+    def get_proxies(self, proxy_names):
+        """
+        The function gets IDs of the proxies by names.
+
+        :param proxy_names: names of proxies
+        :type proxy_names: list
+
+        :rtype: dict
+        :return: proxy names by IDs
+        """
+        proxies = self.zapi.find_zabbix_proxy_by_names(proxy_names)
+        found = dict((p['proxyid'], p[self.proxy_name]) for p in proxies)
+
+        missing = sorted(set(proxy_names) - set(found.values()))
+        if missing:
+            self.module.fail_json(
+                msg="Proxy not found in Zabbix: {0}".format(', '.join(missing)))
+
+        return found
+
+    def get_hosts(self, proxyids, hostgroups, include_unassigned):
+        """
+        The function gets the hosts for balancing.
+
+        :param proxyids: IDs of proxies
+        :type proxyids: list
+        :param hostgroups: names of host groups to limit the hosts
+        :type hostgroups: list
+        :param include_unassigned: whether hosts monitored by the server are included
+        :type include_unassigned: bool
+
+        :rtype: list
+        :return: hosts with current proxy IDs. The proxy ID of unassigned hosts is '0'.
+        """
+        output = ['hostid', 'host', self.proxy_field]
+        values = list(proxyids)
+        if include_unassigned:
+            values.append('0')
+        params = {
+            'output': output,
+            'filter': {'status': '0', self.proxy_field: values},
+            'sortfield': 'hostid'}
+
+        if Zabbix_version(self.zbx_api_version) >= Zabbix_version('7.0.0'):
+            output.append('monitored_by')
+            params['filter']['monitored_by'] = ['0', '1'] if include_unassigned else ['1']
+
+        if hostgroups:
+            groups = self.zapi.find_zabbix_hostgroups_by_names(hostgroups)
+            missing = sorted(set(hostgroups) - set(g['name'] for g in groups))
+            if missing:
+                self.module.fail_json(
+                    msg="Host group not found in Zabbix: {0}".format(', '.join(missing)))
+            params['groupids'] = [g['groupid'] for g in groups]
+
+        try:
+            hosts = self.zapi.send_api_request(
+                method='host.get',
+                params=params)
+        except Exception as e:
+            self.module.fail_json(msg="Failed to get hosts: {0}".format(e))
+
+        return hosts
+
+    def get_loads(self, hosts, load_item_key):
+        """
+        The function gets the load of each host.
+
+        :param hosts: hosts for balancing
+        :type hosts: list
+        :param load_item_key: key of the item with the load of a host
+        :type load_item_key: str
+
+        :rtype: dict
+        :return: loads by host IDs
+        """
+        if not load_item_key or not hosts:
+            return dict((h['hostid'], 1.0) for h in hosts)
+
+        try:
+            items = self.zapi.send_api_request(
+                method='item.get',
+                params={
+                    'output': ['hostid', 'lastvalue'],
+                    'hostids': [h['hostid'] for h in hosts],
+                    'filter': {'key_': load_item_key}})
+        except Exception as e:
+            self.module.fail_json(msg="Failed to get load items: {0}".format(e))
+
+        loads = {}
+        for each in items:
+            try:
+                loads[each['hostid']] = max(float(each['lastvalue']), 0.0)
+            except (TypeError, ValueError):
+                continue
+
+        # Hosts without the value get the average load
+        average = sum(loads.values()) / len(loads) if loads else 1.0
+        return dict((h['hostid'], loads.get(h['hostid'], average)) for h in hosts)
+
+    def plan(self, hosts, loads, proxyids, tolerance):
+        """
+        The function calculates the new distribution of hosts.
+        Unassigned hosts are assigned to the least loaded proxies, then hosts are
+        moved from the most loaded proxy to the least loaded one while it evens out the load.
+
+        :param hosts: hosts for balancing
+        :type hosts: list
+        :param loads: loads by host IDs
+        :type loads: dict
+        :param proxyids: IDs of proxies
+        :type proxyids: list
+        :param tolerance: allowed excess of the average load in percent
+        :type tolerance: int
+
+        :rtype: dict
+        :return: new proxy IDs by host IDs
+        """
+        assignment = dict((h['hostid'], h[self.proxy_field]) for h in hosts)
+        proxy_loads = dict((p, 0.0) for p in proxyids)
+        proxy_hosts = dict((p, set()) for p in proxyids)
+        for hostid, proxyid in assignment.items():
+            if proxyid in proxy_loads:
+                proxy_loads[proxyid] += loads[hostid]
+                proxy_hosts[proxyid].add(hostid)
+
+        def least_loaded():
+            return min(proxyids, key=lambda p: (proxy_loads[p], p))
+
+        def move(hostid, source, target):
+            if source is not None:
+                proxy_loads[source] -= loads[hostid]
+                proxy_hosts[source].discard(hostid)
+            proxy_loads[target] += loads[hostid]
+            proxy_hosts[target].add(hostid)
+            assignment[hostid] = target
+
+        # Unassigned hosts, the heaviest ones first
+        unassigned = [h for h in assignment if assignment[h] not in proxy_loads]
+        for hostid in sorted(unassigned, key=lambda h: (-loads[h], h)):
+            move(hostid, None, least_loaded())
+
+        limit = sum(proxy_loads.values()) / len(proxyids) * (1 + tolerance / 100.0)
+        while True:
+            source = max(proxyids, key=lambda p: (proxy_loads[p], p))
+            target = least_loaded()
+            difference = proxy_loads[source] - proxy_loads[target]
+            if proxy_loads[source] <= limit or difference <= 0:
+                break
+
+            # The host that makes the loads of both proxies the closest
+            candidates = [h for h in proxy_hosts[source] if 0 < loads[h] < difference]
+            if not candidates:
+                break
+            hostid = min(candidates, key=lambda h: (abs(difference - 2 * loads[h]), h))
+            move(hostid, source, target)
+
+        return assignment
+
+    def apply(self, moves):
+        """
+        The function moves hosts to new proxies.
+
+        :param moves: new proxy IDs by host IDs
+        :type moves: dict
+
+        :return: None
+        """
+        by_proxy = {}
+        for hostid in sorted(moves, key=int):
+            by_proxy.setdefault(moves[hostid], []).append(hostid)
+
+        changed = False
+        for proxyid in sorted(by_proxy, key=int):
+            hostids = by_proxy[proxyid]
+            for i in range(0, len(hostids), self.batch_size):
+                params = {
+                    'hosts': [{'hostid': h} for h in hostids[i:i + self.batch_size]],
+                    self.proxy_field: proxyid}
+                if self.proxy_field == 'proxyid':
+                    params['monitored_by'] = '1'
+                try:
+                    self.zapi.try_api_request(
+                        method='host.massupdate',
+                        params=params)
+                except ZabbixApiRequestError as e:
+                    self.module.fail_json(
+                        msg="Failed to move hosts to proxy: {0}".format(e.message),
+                        changed=changed)
+                changed = True
+
+    def balance(self, params):
+        """
+        The function balances hosts across the proxies.
+
+        :param params: module parameters
+        :type params: dict
+
+        :rtype: tuple
+        :return: list of moves and summary for each proxy
+        """
+        proxies = self.get_proxies(params['proxies'])
+        proxyids = sorted(proxies, key=int)
+        hosts = self.get_hosts(proxyids, params.get('hostgroups'), params['include_unassigned'])
+        loads = self.get_loads(hosts, params.get('load_item_key'))
+        assignment = self.plan(hosts, loads, proxyids, params['tolerance'])
+
+        names = dict((h['hostid'], h['host']) for h in hosts)
+        current = dict((h['hostid'], h[self.proxy_field]) for h in hosts)
+        moves = dict((h, p) for h, p in assignment.items() if current[h] != p)
+
+        summary = []
+        for proxyid in proxyids:
+            summary.append({
+                'proxy': proxies[proxyid],
+                'hosts_before': len([h for h in current if current[h] == proxyid]),
+                'hosts_after': len([h for h in assignment if assignment[h] == proxyid]),
+                'load_before': round(sum(loads[h] for h in current if current[h] == proxyid), 2),
+                'load_after': round(sum(loads[h] for h in assignment if assignment[h] == proxyid), 2)})
+        moved = [{
+            'host': names[h],
+            'from': proxies.get(current[h], ''),
+            'to': proxies[moves[h]]} for h in sorted(moves, key=int)]
+
+        if moves and not self.module.check_mode:
+            self.apply(moves)
+
+        return moved, summary
+
+
+def main():
+    """entry point for module execution"""
+    spec = {
+        'proxies': {
+            'type': 'list',
+            'elements': 'str',
+            'required': True},
+        'hostgroups': {
+            'type': 'list',
+            'elements': 'str'},
+        'include_unassigned': {
+            'type': 'bool',
+            'default': False},
+        'load_item_key': {
+            'type': 'str'},
+        'tolerance': {
+            'type': 'int',
+            'default': 0},
+        'batch_size': {
+            'type': 'int',
+            'default': 100}}
+
+    module = AnsibleModule(
+        argument_spec=spec,
+        supports_check_mode=True)
+
+    if module.params['batch_size'] < 1:
+        module.fail_json(msg="batch_size must be greater than 0")
+    if module.params['tolerance'] < 0:
+        module.fail_json(msg="tolerance must not be negative")
+    if not module.params['proxies']:
+        module.fail_json(msg="At least one proxy is required")
+
+    balance = ProxyBalance(module)
+    moved, proxies = balance.balance(module.params)
+
+    if moved:
+        module.exit_json(
+            changed=True,
+            result="Successfully moved {0} host(s)".format(len(moved)),
+            moves=moved,
+            proxies=proxies)
+
+    module.exit_json(
+        changed=False,
+        result="Hosts are already balanced",
+        moves=moved,
+        proxies=proxies)
+
+
+if __name__ == '__main__':
+    main()
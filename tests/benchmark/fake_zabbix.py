@@ -0,0 +1,586 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+"""
+Fake Zabbix JSON-RPC server for benchmarks.
+
+The server keeps generated hosts, host groups, templates, proxies and proxy groups in memory,
+implements the subset of get/create/update/delete methods used by this collection,
+simulates network latency and counts API calls, HTTP requests and transferred bytes.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import gzip
+import io
+import json
+import threading
+import time
+
+from ansible.module_utils.six.moves import BaseHTTPServer, socketserver
+
+
+# Object types: API prefix -> (ID field, name field)
+OBJECT_TYPES = {
+    'host': ('hostid', 'host'),
+    'hostgroup': ('groupid', 'name'),
+    'template': ('templateid', 'host'),
+    'proxy': ('proxyid', 'name'),
+    'proxygroup': ('proxy_groupid', 'name'),
+    'item': ('itemid', 'key_'),
+}
+
+# Names of the parameters with IDs of objects in get requests
+ID_PARAMS = {
+    'hostids': 'hostid',
+    'groupids': 'groupid',
+    'templateids': 'templateid',
+    'proxyids': 'proxyid',
+    'proxy_groupids': 'proxy_groupid',
+}
+
+# Host fields returned by select* parameters
+HOST_SELECTS = {
+    'selectGroups': 'groups',
+    'selectHostGroups': 'hostgroups',
+    'selectParentTemplates': 'parentTemplates',
+    'selectTags': 'tags',
+    'selectInheritedTags': 'inheritedTags',
+    'selectInterfaces': 'interfaces',
+    'selectMacros': 'macros',
+    'selectInventory': 'inventory',
+    'selectItems': 'items',
+}
+
+
+class Statistics(object):
+    """
+    Counters of the server
+
+    :param lock: lock for updating of counters from several threads
+    :type lock: threading.Lock
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Function for resetting of counters
+
+        :return: None
+        """
+        with self.lock:
+            self.http_requests = 0
+            self.connections = 0
+            self.bytes_received = 0
+            self.bytes_sent = 0
+            self.methods = {}
+
+    def add(self, methods, received, sent):
+        """
+        Function for counting of an HTTP request
+
+        :param methods: called API methods
+        :type methods: list
+        :param received: size of the request body in bytes
+        :type received: int
+        :param sent: size of the response body in bytes
+        :type sent: int
+
+        :return: None
+        """
+        with self.lock:
+            self.http_requests += 1
+            self.bytes_received += received
+            self.bytes_sent += sent
+            for method in methods:
+                self.methods[method] = self.methods.get(method, 0) + 1
+
+    def as_dict(self):
+        """
+        Function for getting of counters
+
+        :rtype: dict
+        :return: counters
+        """
+        with self.lock:
+            return {
+                'api_calls': sum(self.methods.values()),
+                'http_requests': self.http_requests,
+                'connections': self.connections,
+                'bytes_received': self.bytes_received,
+                'bytes_sent': self.bytes_sent,
+                'methods': dict(self.methods)}
+
+
+class ZabbixData(object):
+    """
+    Generated Zabbix objects
+
+    :param hosts: number of hosts
+    :type hosts: int
+    :param groups: number of host groups
+    :type groups: int
+    :param templates: number of templates
+    :type templates: int
+    :param proxies: number of proxies
+    :type proxies: int
+    :param version: version of Zabbix API
+    :type version: str
+    """
+    def __init__(self, hosts=10000, groups=100, templates=50, proxies=10, version='7.0.0'):
+        self.version = version
+        self.major = tuple(int(v) for v in version.split('.')[:2])
+        self.lock = threading.Lock()
+        self.objects = dict((t, {}) for t in OBJECT_TYPES)
+        self.next_id = 1
+        self.audit = []
+
+        for i in range(groups):
+            self.add('hostgroup', {'name': 'Group {0}'.format(i), 'flags': '0'})
+        for i in range(templates):
+            self.add('template', {'host': 'Template {0}'.format(i), 'name': 'Template {0}'.format(i)})
+        for i in range(proxies):
+            self.add('proxy', self.proxy_fields({'name': 'proxy-{0}'.format(i)}))
+
+        group_ids = list(self.objects['hostgroup'])
+        template_ids = list(self.objects['template'])
+        proxy_ids = list(self.objects['proxy'])
+        for i in range(hosts):
+            host = {
+                'host': 'host-{0}'.format(i),
+                'name': 'host-{0}'.format(i),
+                'status': '1' if i % 10 == 0 else '0',
+                'description': '',
+                'groups': [{'groupid': group_ids[i % len(group_ids)]}] if group_ids else [],
+                'templates': [{'templateid': template_ids[i % len(template_ids)]}] if template_ids else [],
+                'tags': [{'tag': 'env', 'value': ['prod', 'test', 'dev'][i % 3]}],
+                'macros': [],
+                'interfaces': [{
+                    'type': '1', 'main': '1', 'useip': '1', 'ip': '10.{0}.{1}.{2}'.format(
+                        i // 65536 % 256, i // 256 % 256, i % 256),
+                    'dns': '', 'port': '10050'}],
+                'inventory': {'os': 'Linux'}}
+            host[self.proxy_field()] = proxy_ids[i % len(proxy_ids)] if proxy_ids and i % 2 else '0'
+            self.add('host', host)
+
+    def proxy_field(self):
+        """
+        Function for getting the name of the host field with the proxy ID
+
+        :rtype: str
+        :return: field name
+        """
+        return 'proxyid' if self.major >= (7, 0) else 'proxy_hostid'
+
+    def proxy_fields(self, proxy):
+        """
+        Function for adding version dependent fields of a proxy
+
+        :param proxy: proxy parameters
+        :type proxy: dict
+
+        :rtype: dict
+        :return: proxy parameters
+        """
+        if self.major < (7, 0):
+            proxy['host'] = proxy.pop('name', proxy.get('host'))
+        proxy.setdefault('operating_mode' if self.major >= (7, 0) else 'status', '0')
+        return proxy
+
+    def add(self, object_type, fields):
+        """
+        Function for adding a new object
+
+        :param object_type: type of the object
+        :type object_type: str
+        :param fields: object fields
+        :type fields: dict
+
+        :rtype: str
+        :return: ID of the new object
+        """
+        id_field = OBJECT_TYPES[object_type][0]
+        objectid = str(self.next_id)
+        self.next_id += 1
+        obj = dict(fields)
+        obj[id_field] = objectid
+        self.objects[object_type][objectid] = obj
+        if object_type == 'host':
+            self.audit.append({'clock': str(int(time.time())), 'resourceid': objectid})
+        return objectid
+
+    def host_view(self, host, params):
+        """
+        Function for representing a host in a response of host.get
+
+        :param host: stored host
+        :type host: dict
+        :param params: parameters of the request
+        :type params: dict
+
+        :rtype: dict
+        :return: host for the response
+        """
+        result = self.output(host, params.get('output', 'extend'), 'host')
+        for param, field in HOST_SELECTS.items():
+            if param not in params:
+                continue
+            if field in ['groups', 'hostgroups']:
+                result[field] = [
+                    self.output(self.objects['hostgroup'][g['groupid']], params[param], 'hostgroup')
+                    for g in host['groups'] if g['groupid'] in self.objects['hostgroup']]
+            elif field == 'parentTemplates':
+                result[field] = [
+                    self.output(self.objects['template'][t['templateid']], params[param], 'template')
+                    for t in host['templates'] if t['templateid'] in self.objects['template']]
+            elif field == 'items':
+                result[field] = []
+            elif field == 'inheritedTags':
+                result[field] = []
+            else:
+                result[field] = host.get(field, [])
+        return result
+
+    @staticmethod
+    def output(obj, output, object_type):
+        """
+        Function for applying the 'output' parameter
+
+        :param obj: stored object
+        :type obj: dict
+        :param output: value of the 'output' parameter
+        :type output: str | list
+        :param object_type: type of the object
+        :type object_type: str
+
+        :rtype: dict
+        :return: object with requested fields
+        """
+        id_field = OBJECT_TYPES[object_type][0]
+        hidden = ['groups', 'templates', 'tags', 'macros', 'interfaces', 'inventory']
+        if output == 'extend':
+            result = dict((k, v) for k, v in obj.items() if k not in hidden)
+        else:
+            result = dict((k, obj[k]) for k in output or [] if k in obj and k not in hidden)
+        result[id_field] = obj[id_field]
+        return result
+
+    def get(self, object_type, params):
+        """
+        Function for processing of get requests
+
+        :param object_type: type of objects
+        :type object_type: str
+        :param params: parameters of the request
+        :type params: dict
+
+        :rtype: list | str
+        :return: found objects or their number
+        """
+        objects = self.objects[object_type].values()
+
+        for param, field in ID_PARAMS.items():
+            if params.get(param) is None:
+                continue
+            ids = set(params[param] if isinstance(params[param], list) else [params[param]])
+            if object_type == 'host' and field == 'groupid':
+                objects = [o for o in objects if ids & set(g['groupid'] for g in o['groups'])]
+            elif object_type == 'host' and field == 'templateid':
+                objects = [o for o in objects if ids & set(t['templateid'] for t in o['templates'])]
+            elif object_type == 'host' and field == 'proxyid':
+                objects = [o for o in objects if o.get(self.proxy_field()) in ids]
+            else:
+                objects = [o for o in objects if o.get(field) in ids]
+
+        for field, value in (params.get('filter') or {}).items():
+            values = set(str(v) for v in (value if isinstance(value, list) else [value]))
+            objects = [o for o in objects if str(o.get(field)) in values]
+
+        for field, value in (params.get('search') or {}).items():
+            values = value if isinstance(value, list) else [value]
+            objects = [o for o in objects if any(str(v) in str(o.get(field, '')) for v in values)]
+
+        objects = list(objects)
+        if params.get('sortfield'):
+            objects.sort(key=lambda o: int(o.get(params['sortfield'], 0))
+                         if str(o.get(params['sortfield'], '')).isdigit() else o.get(params['sortfield']))
+        if params.get('limit'):
+            objects = objects[:int(params['limit'])]
+        if params.get('countOutput'):
+            return str(len(objects))
+        if object_type == 'host':
+            return [self.host_view(o, params) for o in objects]
+        return [self.output(o, params.get('output', 'extend'), object_type) for o in objects]
+
+    def create(self, object_type, params):
+        """
+        Function for processing of create requests
+
+        :param object_type: type of objects
+        :type object_type: str
+        :param params: one object or list of objects
+        :type params: dict | list
+
+        :rtype: dict
+        :return: IDs of created objects
+        """
+        new_objects = [dict(o) for o in (params if isinstance(params, list) else [params])]
+        if object_type == 'proxy':
+            new_objects = [self.proxy_fields(o) for o in new_objects]
+        name_field = 'host' if object_type == 'proxy' and self.major < (7, 0) else OBJECT_TYPES[object_type][1]
+        names = set(o.get(name_field) for o in self.objects[object_type].values())
+        for obj in new_objects:
+            if obj.get(name_field) in names:
+                raise ValueError('Object "{0}" already exists.'.format(obj.get(name_field)))
+            names.add(obj.get(name_field))
+
+        ids = []
+        for obj in new_objects:
+            obj.setdefault('groups', [])
+            obj.setdefault('templates', [])
+            ids.append(self.add(object_type, obj))
+        return {OBJECT_TYPES[object_type][0] + 's': ids}
+
+    def update(self, object_type, params):
+        """
+        Function for processing of update requests
+
+        :param object_type: type of objects
+        :type object_type: str
+        :param params: one object or list of objects
+        :type params: dict | list
+
+        :rtype: dict
+        :return: IDs of updated objects
+        """
+        id_field = OBJECT_TYPES[object_type][0]
+        ids = []
+        for obj in params if isinstance(params, list) else [params]:
+            stored = self.objects[object_type].get(obj.get(id_field))
+            if stored is None:
+                raise ValueError('No permissions to referred object or it does not exist!')
+            stored.update(obj)
+            ids.append(stored[id_field])
+            if object_type == 'host':
+                self.audit.append({'clock': str(int(time.time())), 'resourceid': stored[id_field]})
+        return {id_field + 's': ids}
+
+    def massupdate(self, object_type, params):
+        """
+        Function for processing of massupdate requests
+
+        :param object_type: type of objects
+        :type object_type: str
+        :param params: objects and fields for updating
+        :type params: dict
+
+        :rtype: dict
+        :return: IDs of updated objects
+        """
+        id_field = OBJECT_TYPES[object_type][0]
+        fields = dict((k, v) for k, v in params.items() if k != object_type + 's')
+        return self.update(object_type, [
+            dict(fields, **{id_field: o[id_field]}) for o in params.get(object_type + 's', [])])
+
+    def delete(self, object_type, params):
+        """
+        Function for processing of delete requests
+
+        :param object_type: type of objects
+        :type object_type: str
+        :param params: list of IDs
+        :type params: list
+
+        :rtype: dict
+        :return: IDs of deleted objects
+        """
+        for objectid in params:
+            if objectid not in self.objects[object_type]:
+                raise ValueError('No permissions to referred object or it does not exist!')
+        for objectid in params:
+            del self.objects[object_type][objectid]
+        return {OBJECT_TYPES[object_type][0] + 's': list(params)}
+
+    def call(self, method, params):
+        """
+        Function for processing of one API call
+
+        :param method: API method
+        :type method: str
+        :param params: parameters of the method
+        :type params: dict | list
+
+        :rtype: object
+        :return: result of the method
+
+        :raises:
+            * ValueError: if the method failed
+        """
+        if method == 'apiinfo.version':
+            return self.version
+        if method == 'user.login':
+            return 'fake_session_id'
+        if method == 'user.logout':
+            return True
+        if method == 'settings.get':
+            return {'default_timezone': 'UTC'}
+        if method == 'auditlog.get':
+            records = [r for r in self.audit if int(r['clock']) >= int(params.get('time_from', 0))]
+            records.reverse()
+            return records[:int(params['limit'])] if params.get('limit') else records
+        if method == 'event.acknowledge':
+            return {'eventids': params.get('eventids', [])}
+
+        object_type, action = method.split('.', 1)
+        if object_type not in OBJECT_TYPES or not hasattr(self, action):
+            raise ValueError('Incorrect method "{0}".'.format(method))
+        with self.lock:
+            return getattr(self, action)(object_type, params)
+
+
+def make_handler(data, stats, latency):
+    """
+    Function for creating of the class of the request handler
+
+    :param data: Zabbix objects
+    :type data: ZabbixData
+    :param stats: counters of the server
+    :type stats: Statistics
+    :param latency: delay of each HTTP response in seconds
+    :type latency: float
+
+    :rtype: type
+    :return: class of the request handler
+    """
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+            with stats.lock:
+                stats.connections += 1
+
+        def process(self, request):
+            try:
+                result = data.call(request.get('method'), request.get('params', {}))
+                return {'jsonrpc': '2.0', 'result': result, 'id': request.get('id')}
+            except ValueError as e:
+                return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {
+                    'code': -32602, 'message': 'Invalid params.', 'data': str(e)}}
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            received = len(raw)
+            if self.headers.get('Content-Encoding') == 'gzip':
+                raw = gzip.GzipFile(fileobj=io.BytesIO(raw)).read()
+            body = json.loads(raw.decode('utf-8'))
+
+            if isinstance(body, list):
+                methods = [r.get('method') for r in body]
+                response = [self.process(r) for r in body]
+            else:
+                methods = [body.get('method')]
+                response = self.process(body)
+
+            if latency:
+                time.sleep(latency)
+
+            payload = json.dumps(response).encode('utf-8')
+            encoding = None
+            if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                buffer = io.BytesIO()
+                with gzip.GzipFile(fileobj=buffer, mode='wb') as gzip_file:
+                    gzip_file.write(payload)
+                payload = buffer.getvalue()
+                encoding = 'gzip'
+            stats.add(methods, received, len(payload))
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class FakeZabbixServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Threaded HTTP server with fake Zabbix API
+
+    :param address: address and port for listening, port 0 selects a free port
+    :type address: tuple
+    :param data: Zabbix objects
+    :type data: ZabbixData
+    :param latency: delay of each HTTP response in seconds
+    :type latency: float
+    """
+    daemon_threads = True
+
+    def __init__(self, address, data, latency=0.0):
+        self.data = data
+        self.stats = Statistics()
+        BaseHTTPServer.HTTPServer.__init__(self, address, make_handler(data, self.stats, latency))
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}'.format(*self.server_address[:2])
+
+    def start(self):
+        """
+        Function for starting the server in a background thread
+
+        :return: None
+        """
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        """
+        Function for stopping the server
+
+        :return: None
+        """
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Zabbix JSON-RPC server for benchmarks')
+    parser.add_argument('--address', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='delay of each response in seconds')
+    parser.add_argument('--hosts', type=int, default=10000)
+    parser.add_argument('--groups', type=int, default=100)
+    parser.add_argument('--templates', type=int, default=50)
+    parser.add_argument('--proxies', type=int, default=10)
+    parser.add_argument('--zabbix-version', default='7.0.0')
+    args = parser.parse_args()
+
+    data = ZabbixData(args.hosts, args.groups, args.templates, args.proxies, args.zabbix_version)
+    server = FakeZabbixServer((args.address, args.port), data, args.latency)
+    print('Fake Zabbix API is listening on {0}/api_jsonrpc.php'.format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats.as_dict(), indent=2, sort_keys=True))
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
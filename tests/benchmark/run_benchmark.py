@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+"""
+Benchmarks of the collection against the fake Zabbix JSON-RPC server.
+
+Each scenario runs the inventory plugin or a module of the collection end to end
+(ansible-inventory or ansible-playbook) and reports the number of API calls and HTTP requests,
+wall time, transferred bytes and peak RSS of the Ansible process.
+With --baseline the numbers of API calls and HTTP requests are compared with a previous report,
+so regressions in the number of round trips fail the run.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_zabbix import FakeZabbixServer, ZabbixData
+
+
+SCENARIOS = ['inventory', 'hostgroup', 'host', 'proxy']
+
+# Counters compared with the baseline
+COMPARED_COUNTERS = ['api_calls', 'http_requests']
+
+
+def default_collections_path():
+    """
+    Function for getting the path to collections, if the repository is placed
+    in the ansible_collections/zabbix/zabbix directory
+
+    :rtype: str | None
+    :return: path to collections
+    """
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    namespace_dir = os.path.dirname(root)
+    if os.path.basename(os.path.dirname(namespace_dir)) == 'ansible_collections':
+        return os.path.dirname(os.path.dirname(namespace_dir))
+    return None
+
+
+def write_json(path, data):
+    """
+    Function for writing a file. JSON is used for YAML files too.
+
+    :param path: path to the file
+    :type path: str
+    :param data: data for writing
+    :type data: dict | list
+
+    :return: None
+    """
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def parse_options(options):
+    """
+    Function for parsing of options of the inventory plugin
+
+    :param options: list of KEY=VALUE strings, values are parsed as JSON if possible
+    :type options: list
+
+    :rtype: dict
+    :return: options
+    """
+    result = {}
+    for option in options or []:
+        key, value = option.split('=', 1)
+        try:
+            result[key] = json.loads(value)
+        except ValueError:
+            result[key] = value
+    return result
+
+
+class Benchmark(object):
+    """
+    Class for running of scenarios
+
+    :param server: fake Zabbix server
+    :type server: FakeZabbixServer
+    :param args: command line arguments
+    :type args: argparse.Namespace
+    """
+    def __init__(self, server, args):
+        self.server = server
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix='zabbix_benchmark_')
+        self.env = dict(os.environ)
+        self.env.update({
+            'ANSIBLE_PERSISTENT_CONTROL_PATH_DIR': os.path.join(self.workdir, 'pc'),
+            'ANSIBLE_INVENTORY_ENABLED': 'zabbix.zabbix.zabbix_inventory,ini',
+            'ANSIBLE_HOST_KEY_CHECKING': 'False',
+            'ANSIBLE_RETRY_FILES_ENABLED': 'False',
+            'ANSIBLE_NOCOLOR': 'True'})
+        if args.collections_path:
+            self.env['ANSIBLE_COLLECTIONS_PATH'] = args.collections_path
+
+        port = server.server_address[1]
+        with open(os.path.join(self.workdir, 'hosts.ini'), 'w') as f:
+            f.write('\n'.join([
+                '[zabbix]',
+                'fake_zabbix ansible_host=127.0.0.1',
+                '[zabbix:vars]',
+                'ansible_connection=httpapi',
+                'ansible_network_os=zabbix.zabbix.zabbix',
+                'ansible_httpapi_port={0}'.format(port),
+                'ansible_user=Admin',
+                'ansible_httpapi_pass=zabbix',
+                '']))
+
+    def cleanup(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def execute(self, name, command):
+        """
+        Function for running an Ansible command and measuring it
+
+        :param name: name of the scenario
+        :type name: str
+        :param command: command for running
+        :type command: list
+
+        :rtype: dict
+        :return: result of the scenario
+        """
+        log_path = os.path.join(self.workdir, name + '.log')
+        self.server.stats.reset()
+        start = time.time()
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(command, cwd=self.workdir, env=self.env, stdout=log, stderr=subprocess.STDOUT)
+            # wait4() returns resource usage of the finished process only
+            status, rusage = os.wait4(process.pid, 0)[1:]
+            process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1
+        wall_time = time.time() - start
+
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss = rusage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        result = dict(self.server.stats.as_dict(), scenario=name, wall_time=round(wall_time, 3),
+                      peak_rss=peak_rss, failed=process.returncode != 0)
+        if result['failed']:
+            with open(log_path) as log:
+                result['output'] = log.read()[-4000:]
+        return result
+
+    def run_inventory(self):
+        """
+        Function for running the inventory plugin
+
+        :rtype: dict
+        :return: result of the scenario
+        """
+        config = dict({
+            'plugin': 'zabbix.zabbix.zabbix_inventory',
+            'zabbix_api_url': self.server.url,
+            'zabbix_user': 'Admin',
+            'zabbix_password': 'zabbix',
+            'output': 'extend',
+            'query': {'selectGroups': ['name'], 'selectTags': ['tag', 'value']}},
+            **parse_options(self.args.inventory_option))
+        path = os.path.join(self.workdir, 'benchmark.zabbix.yml')
+        write_json(path, config)
+        return self.execute('inventory', [
+            'ansible-inventory', '-i', path, '--list', '--output', os.path.join(self.workdir, 'inventory.json')])
+
+    def run_playbook(self, name, task):
+        """
+        Function for running a playbook with one task in a loop
+
+        :param name: name of the scenario
+        :type name: str
+        :param task: task of the playbook
+        :type task: dict
+
+        :rtype: dict
+        :return: result of the scenario
+        """
+        path = os.path.join(self.workdir, name + '.yml')
+        write_json(path, [{'hosts': 'zabbix', 'gather_facts': False, 'tasks': [task]}])
+        return self.execute(name, [
+            'ansible-playbook', '-i', os.path.join(self.workdir, 'hosts.ini'), path])
+
+    def run_hostgroup(self):
+        """
+        Function for creating of host groups with one task
+
+        :rtype: dict
+        :return: result of the scenario
+        """
+        return self.run_playbook('hostgroup', {'zabbix.zabbix.zabbix_hostgroup': {
+            'state': 'present',
+            'hostgroups': ['Benchmark group {0}'.format(i) for i in range(self.args.operations)]}})
+
+    def run_host(self):
+        """
+        Function for creating of hosts in a loop
+
+        :rtype: dict
+        :return: result of the scenario
+        """
+        return self.run_playbook('host', {
+            'zabbix.zabbix.zabbix_host': {
+                'state': 'present',
+                'host': '{{ item }}',
+                'hostgroups': ['Group 0', 'Group 1'],
+                'templates': ['Template 0'],
+                'proxy': 'proxy-0' if self.args.proxies else '',
+                'tags': [{'tag': 'scope', 'value': 'benchmark'}],
+                'interfaces': [{'type': 'agent', 'ip': '127.0.0.1'}]},
+            'loop': ['benchmark-host-{0}'.format(i) for i in range(self.args.operations)]})
+
+    def run_proxy(self):
+        """
+        Function for creating of proxies in a loop
+
+        :rtype: dict
+        :return: result of the scenario
+        """
+        return self.run_playbook('proxy', {
+            'zabbix.zabbix.zabbix_proxy': {'state': 'present', 'name': '{{ item }}', 'mode': 'active'},
+            'loop': ['benchmark-proxy-{0}'.format(i) for i in range(self.args.operations)]})
+
+
+def compare(results, baseline, tolerance):
+    """
+    Function for comparing results with the baseline
+
+    :param results: results of scenarios
+    :type results: list
+    :param baseline: previous results
+    :type baseline: list
+    :param tolerance: allowed increase in percent
+    :type tolerance: float
+
+    :rtype: list
+    :return: messages about regressions
+    """
+    previous = dict((r['scenario'], r) for r in baseline)
+    regressions = []
+    for result in results:
+        if result['scenario'] not in previous:
+            continue
+        for counter in COMPARED_COUNTERS:
+            limit = previous[result['scenario']][counter] * (1 + tolerance / 100.0)
+            if result[counter] > limit:
+                regressions.append('{0}: {1} increased from {2} to {3}'.format(
+                    result['scenario'], counter, previous[result['scenario']][counter], result[counter]))
+    return regressions
+
+
+def print_report(results, verbose):
+    """
+    Function for printing results as a table
+
+    :param results: results of scenarios
+    :type results: list
+    :param verbose: whether the number of calls of each method should be printed
+    :type verbose: bool
+
+    :return: None
+    """
+    row = '{0:<10} {1:>9} {2:>9} {3:>9} {4:>7} {5:>12} {6:>12} {7:>9}  {8}'
+    print(row.format('scenario', 'time, s', 'api calls', 'http reqs', 'conns', 'sent, B', 'received, B', 'rss, MiB', 'status'))
+    for r in results:
+        print(row.format(
+            r['scenario'], r['wall_time'], r['api_calls'], r['http_requests'], r['connections'],
+            r['bytes_received'], r['bytes_sent'], round(r['peak_rss'] / 1048576.0, 1),
+            'FAILED' if r['failed'] else 'ok'))
+        if verbose:
+            for method in sorted(r['methods']):
+                print('    {0:<30} {1:>9}'.format(method, r['methods'][method]))
+    for r in results:
+        if r['failed']:
+            print('\n{0} failed:\n{1}'.format(r['scenario'], r['output']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of the Zabbix collection')
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help='scenarios for running: {0} (default: all)'.format(', '.join(SCENARIOS)))
+    parser.add_argument('--hosts', type=int, default=10000, help='number of generated hosts')
+    parser.add_argument('--groups', type=int, default=100, help='number of generated host groups')
+    parser.add_argument('--templates', type=int, default=50, help='number of generated templates')
+    parser.add_argument('--proxies', type=int, default=10, help='number of generated proxies')
+    parser.add_argument('--zabbix-version', default='7.0.0', help='version of the fake Zabbix API')
+    parser.add_argument('--latency', type=float, default=0.0, help='delay of each HTTP response in seconds')
+    parser.add_argument('--operations', type=int, default=10,
+                        help='number of objects created by the module scenarios')
+    parser.add_argument('--inventory-option', action='append', metavar='KEY=VALUE',
+                        help='option of the inventory plugin, the value is parsed as JSON if possible')
+    parser.add_argument('--collections-path', default=default_collections_path(),
+                        help='value of ANSIBLE_COLLECTIONS_PATH')
+    parser.add_argument('--json', metavar='FILE', help='save results to the file')
+    parser.add_argument('--baseline', metavar='FILE', help='fail if API calls or HTTP requests exceed the saved results')
+    parser.add_argument('--tolerance', type=float, default=0.0, help='allowed increase over the baseline in percent')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print the number of calls of each method')
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error('unknown scenario: {0}'.format(name))
+
+    server = FakeZabbixServer(
+        ('127.0.0.1', 0),
+        ZabbixData(args.hosts, args.groups, args.templates, args.proxies, args.zabbix_version),
+        args.latency)
+    server.start()
+    benchmark = Benchmark(server, args)
+    try:
+        results = [getattr(benchmark, 'run_' + name)() for name in args.scenarios or SCENARIOS]
+    finally:
+        benchmark.cleanup()
+        server.stop()
+
+    print_report(results, args.verbose)
+    if args.json:
+        write_json(args.json, results)
+
+    failed = any(r['failed'] for r in results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('Regression: {0}'.format(regression))
+        failed = failed or len(regressions) > 0
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
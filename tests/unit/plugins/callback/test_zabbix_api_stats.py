@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import json
+import os
+import shutil
+import tempfile
+
+from ansible_collections.zabbix.zabbix.plugins.callback.zabbix_api_stats import CallbackModule
+from ansible_collections.zabbix.zabbix.plugins.module_utils import helper
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch, MagicMock
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch, MagicMock
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+def record(method, server_time, response_bytes=100):
+    """Function for generating a record of a request"""
+    return {
+        'id': None, 'method': method, 'time': 0, 'status': 200, 'request_bytes': 50,
+        'response_bytes': response_bytes, 'server_time': server_time, 'decode_time': 0.001}
+
+
+def task_result(task, host, result):
+    """Function for generating a result of a task"""
+    task_result = MagicMock()
+    task_result._task.get_name.return_value = task
+    task_result._host.get_name.return_value = host
+    task_result._result = result
+    return task_result
+
+
+class TestApiStatsCallback(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.output_path = os.path.join(self.workdir, 'report.json')
+        self.display = MagicMock(verbosity=0)
+        self.callback = CallbackModule(display=self.display)
+        self.callback._plugin_options = {'top': 2, 'output_path': self.output_path}
+
+    def test_report(self):
+        """
+        This test checks the report of requests of tasks, loops and the inventory.
+
+        Expected result: requests are summed by tasks, hosts, methods and methods of tasks,
+        the parts of the report are sorted by the time and limited by 'top',
+        the whole report is written to the file.
+        """
+        self.callback.v2_runner_on_ok(task_result('host : Create host', 'web01', {
+            'zabbix_api_stats': [record('hostgroup.get', 0.5), record('host.create', 0.2)]}))
+        self.callback.v2_runner_on_failed(task_result('host : Create host', 'web02', {
+            'zabbix_api_stats': [record('hostgroup.get', 0.5)]}))
+        self.callback.v2_runner_on_ok(task_result('Update groups', 'web01', {
+            'results': [
+                {'zabbix_api_stats': [record('hostgroup.get', 0.1)]},
+                {'zabbix_api_stats': [record('hostgroup.update', 0.1)]},
+                {'skipped': True}]}))
+        self.callback.v2_runner_on_ok(task_result('Ping', 'web01', {'ping': 'pong'}))
+
+        with patch.dict(helper.inventory_request_stats, {'zabbix.yml': {'host.get': {
+                'requests': 3, 'request_bytes': 300, 'response_bytes': 9000,
+                'server_time': 3.0, 'decode_time': 0.1}}}, clear=True):
+            self.callback.v2_playbook_on_stats(MagicMock())
+
+        with open(self.output_path) as output_file:
+            report = json.load(output_file)
+
+        self.assertEqual(
+            dict((k, (v['requests'], round(v['server_time'], 3))) for k, v in report['tasks'].items()),
+            {'host : Create host': (3, 1.2), 'Update groups': (2, 0.2), 'inventory zabbix.yml': (3, 3.0)})
+        self.assertEqual(
+            dict((k, v['requests']) for k, v in report['hosts'].items()),
+            {'web01': 4, 'web02': 1})
+        self.assertEqual(report['methods']['hostgroup.get']['requests'], 3)
+        self.assertEqual(report['task_methods']['host : Create host: hostgroup.get']['requests'], 2)
+        self.assertEqual(report['task_methods']['inventory zabbix.yml: host.get']['response_bytes'], 9000)
+
+        lines = [c[0][0] for c in self.display.display.call_args_list]
+        self.assertEqual(len(lines), 8)
+        self.assertTrue(lines[0].startswith('inventory zabbix.yml: 3 request(s), waiting 3.000 s'))
+        self.assertTrue(lines[1].startswith('host : Create host: 3 request(s), waiting 1.200 s'))
+
+    def test_no_stats(self):
+        """
+        This test checks the report without statistics.
+
+        Expected result: the note about enabling statistics is displayed, the file is not written.
+        """
+        self.callback.v2_runner_on_ok(task_result('Ping', 'web01', {'ping': 'pong'}))
+        with patch.dict(helper.inventory_request_stats, {}, clear=True):
+            self.callback.v2_playbook_on_stats(MagicMock())
+
+        self.assertEqual(self.display.display.call_count, 1)
+        self.assertIn('Enable the zabbix_api_stats option', self.display.display.call_args[0][0])
+        self.assertFalse(os.path.exists(self.output_path))
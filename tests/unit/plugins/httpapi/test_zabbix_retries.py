@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import json
+from io import BytesIO
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible_collections.zabbix.zabbix.plugins.httpapi.zabbix import HttpApi
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch, MagicMock
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch, MagicMock
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+class TestRetries(unittest.TestCase):
+    """Testing the repeating of failed requests"""
+
+    def setUp(self):
+        self.connection = MagicMock()
+        self.connection._url = 'http://zabbix.local'
+        self.connection._auth = None
+        self.connection.get_option.return_value = 'Admin'
+        self.httpapi = HttpApi(self.connection)
+        self.httpapi._options = {
+            'zabbix_api_token': None, 'http_login': None, 'http_password': None,
+            'zabbix_compression': 'disabled', 'zabbix_api_url': None,
+            'zabbix_cache_ttl': 300, 'zabbix_cache_size': 10000,
+            'zabbix_api_stats': False, 'zabbix_api_stats_path': None,
+            'zabbix_retries': 2, 'zabbix_retry_delay': 1, 'zabbix_rate_limit': 0,
+            'zabbix_session_ttl': 3600, 'zabbix_session_cache_path': None, 'zabbix_session_cache_key': None}
+        self.httpapi.setup_connection()
+        self.httpapi.set_api_version('7.0.0')
+
+        mock_sleep = patch('time.sleep')
+        self.sleep = mock_sleep.start()
+        self.addCleanup(mock_sleep.stop)
+
+    def set_responses(self, responses):
+        """Function for setting the responses of the connection: HTTP codes or exceptions"""
+        def mock_send(path, body, method, headers):
+            each = responses.pop(0)
+            if isinstance(each, Exception):
+                raise each
+            response = MagicMock()
+            response.getcode.return_value = each
+            response.headers = {}
+            return response, BytesIO(json.dumps({'jsonrpc': '2.0', 'result': [], 'id': '1'}).encode('utf-8'))
+
+        self.connection.send.side_effect = mock_send
+
+    def test_read_only_request(self):
+        """
+        Testing the repeating of a read-only request.
+
+        Expected result: the request is repeated after the transient errors.
+        """
+        self.set_responses([AnsibleConnectionFailure('Connection reset by peer'), 502, 200])
+        code, result = self.httpapi.send_request(self.httpapi.build_payload('host.get', output=['hostid']))
+
+        self.assertEqual(code, 200)
+        self.assertEqual(self.connection.send.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_exhausted_retries(self):
+        """
+        Testing the read-only request failed after all attempts.
+
+        Expected result: the last error is raised.
+        """
+        self.set_responses([
+            AnsibleConnectionFailure('Connection refused'), AnsibleConnectionFailure('Connection refused'),
+            AnsibleConnectionFailure('Connection refused')])
+        with self.assertRaises(AnsibleConnectionFailure):
+            self.httpapi.send_request(self.httpapi.build_payload('host.get', output=['hostid']))
+
+        self.assertEqual(self.connection.send.call_count, 3)
+
+    def test_changing_request(self):
+        """
+        Testing the request changing data.
+
+        Expected result: the request is not repeated.
+        """
+        self.set_responses([502, 200])
+        with self.assertRaises(ConnectionError):
+            self.httpapi.send_batch([
+                self.httpapi.build_payload('host.get', output=['hostid']),
+                self.httpapi.build_payload('host.create', host='host')])
+
+        self.assertEqual(self.connection.send.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_http_error(self):
+        """
+        Testing the repeating of a read-only request failed with a transient HTTP error.
+
+        Expected result: the request is repeated.
+        """
+        self.set_responses([HTTPError('http://zabbix.local', 503, 'Service Unavailable', {}, None), 200])
+        code, result = self.httpapi.send_request(self.httpapi.build_payload('host.get', output=['hostid']))
+
+        self.assertEqual(code, 200)
+        self.assertEqual(self.connection.send.call_count, 2)
+        self.assertEqual(self.sleep.call_count, 1)
+
+    def test_not_transient_http_error(self):
+        """
+        Testing the read-only request failed with an HTTP error which is not transient.
+
+        Expected result: the request is not repeated.
+        """
+        self.set_responses([HTTPError('http://zabbix.local', 400, 'Bad Request', {}, None), 200])
+        with self.assertRaises(HTTPError):
+            self.httpapi.send_request(self.httpapi.build_payload('host.get', output=['hostid']))
+
+        self.assertEqual(self.connection.send.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_retry_after(self):
+        """
+        Testing the read-only request failed with the HTTP error 429 and the Retry-After header.
+
+        Expected result: the request is repeated after the delay requested by the server.
+        """
+        self.set_responses([HTTPError('http://zabbix.local', 429, 'Too Many Requests', {'Retry-After': '7'}, None), 200])
+        code, result = self.httpapi.send_request(self.httpapi.build_payload('host.get', output=['hostid']))
+
+        self.assertEqual(code, 200)
+        self.sleep.assert_called_once_with(7.0)
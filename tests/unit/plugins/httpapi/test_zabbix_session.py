@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from ansible.module_utils.connection import ConnectionError
+from ansible_collections.zabbix.zabbix.plugins.httpapi.zabbix import HttpApi, SessionStore
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch, MagicMock
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch, MagicMock
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+class TestSessionStore(unittest.TestCase):
+    """Testing the storing of sessions on disk"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.path = os.path.join(self.workdir, 'sessions')
+
+    def test_encrypted_sessions(self):
+        """
+        Testing the saving and loading of sessions.
+
+        Expected result: sessions are loaded with the same key only,
+        the session token is not stored as plain text, expired sessions are not returned.
+        """
+        SessionStore(self.path, 'secret').set('key1', {'version': '7.0.0', 'auth': 'token1', 'expires': 2000})
+        with patch('time.time', return_value=1000):
+            SessionStore(self.path, 'secret').set('key2', {'version': '6.0.0', 'auth': 'token2', 'expires': 3000})
+
+        with open(self.path, 'rb') as store_file:
+            self.assertNotIn(b'token1', store_file.read())
+
+        with patch('time.time', return_value=1500):
+            self.assertEqual(SessionStore(self.path, 'secret').get('key1')['auth'], 'token1')
+            self.assertEqual(SessionStore(self.path, 'other secret').get('key1'), {})
+        with patch('time.time', return_value=2500):
+            self.assertEqual(SessionStore(self.path, 'secret').get('key1'), {})
+            self.assertEqual(SessionStore(self.path, 'secret').get('key2')['auth'], 'token2')
+
+    def test_concurrent_sessions(self):
+        """
+        Testing the saving of sessions by several connections at the same time.
+
+        Expected result: all sessions are saved.
+        """
+        def save(key):
+            SessionStore(self.path, 'secret').set(key, {'auth': key, 'expires': time.time() + 60})
+
+        threads = [threading.Thread(target=save, args=('key{0}'.format(i),)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(SessionStore(self.path, 'secret').load()), sorted('key{0}'.format(i) for i in range(10)))
+
+
+class TestSessionReuse(unittest.TestCase):
+    """Testing the reuse of the version of Zabbix API and the session"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.path = os.path.join(self.workdir, 'sessions')
+        self.sent = []
+        self.active_sessions = []
+
+    def get_httpapi(self, options=None):
+        """Function for getting the plugin of a new persistent connection"""
+        connection = MagicMock()
+        connection._url = 'http://zabbix.local'
+        connection._auth = None
+        connection._options = {'remote_user': 'Admin', 'password': 'zabbix'}
+        connection.get_option.side_effect = lambda name: connection._options.get(name)
+        connection.set_option.side_effect = lambda name, value: connection._options.update({name: value})
+
+        httpapi = HttpApi(connection)
+        httpapi._options = dict({
+            'zabbix_api_token': None, 'http_login': None, 'http_password': None,
+            'zabbix_compression': 'disabled', 'zabbix_api_url': None,
+            'zabbix_cache_ttl': 300, 'zabbix_cache_size': 10000,
+            'zabbix_api_stats': False, 'zabbix_api_stats_path': None,
+            'zabbix_retries': 3, 'zabbix_retry_delay': 1, 'zabbix_rate_limit': 0,
+            'zabbix_session_ttl': 3600,
+            'zabbix_session_cache_path': self.path, 'zabbix_session_cache_key': 'secret'}, **(options or {}))
+
+        def mock_send_request(data):
+            self.sent.append(data['method'])
+            if data['method'] == 'user.login':
+                self.active_sessions.append('session{0}'.format(len(self.active_sessions)))
+                return 200, self.active_sessions[-1]
+            if data['method'] == 'user.checkAuthentication':
+                if data['params']['sessionid'] not in self.active_sessions:
+                    raise ConnectionError('Session terminated, re-login, please.')
+                return 200, {'userid': '1', 'sessionid': data['params']['sessionid']}
+            return 200, '7.0.0'
+
+        httpapi.send_request = mock_send_request
+        return httpapi
+
+    def test_reuse_version_and_session(self):
+        """
+        Testing the connections of the following runs.
+
+        Expected result: the version and the session are reused by the following connections,
+        the session is checked instead of logging in again.
+        """
+        httpapi = self.get_httpapi()
+        self.assertEqual(httpapi.setup_connection(), {'zabbix_api_version': None, 'zabbix_api_stats': False})
+        httpapi.login('Admin', 'zabbix')
+        httpapi.set_api_version('7.0.0')
+        self.assertEqual(httpapi.setup_connection(), {'zabbix_api_version': '7.0.0', 'zabbix_api_stats': False})
+        httpapi.logout()
+        self.assertEqual(self.sent, ['user.login'])
+
+        httpapi = self.get_httpapi()
+        self.assertEqual(httpapi.setup_connection()['zabbix_api_version'], '7.0.0')
+        httpapi.login('Admin', 'zabbix')
+
+        self.assertEqual(httpapi.connection._auth, {'auth': 'session0'})
+        self.assertEqual(self.sent, ['user.login', 'user.checkAuthentication'])
+
+    def test_expired_session(self):
+        """
+        Testing the connection with a stored session terminated by Zabbix.
+
+        Expected result: a new session is started and stored.
+        """
+        httpapi = self.get_httpapi()
+        httpapi.setup_connection()
+        httpapi.login('Admin', 'zabbix')
+        self.active_sessions[0] = 'terminated'
+
+        httpapi = self.get_httpapi()
+        httpapi.setup_connection()
+        httpapi.login('Admin', 'zabbix')
+
+        self.assertEqual(httpapi.connection._auth, {'auth': 'session1'})
+        self.assertEqual(self.sent, ['user.login', 'user.checkAuthentication', 'user.login'])
+        self.assertEqual(SessionStore(self.path, 'secret').get(httpapi.session_key())['auth'], 'session1')
+
+    def test_without_store(self):
+        """
+        Testing the connection without the stored sessions.
+
+        Expected result: the version is kept in the connection only, the session is closed by logout.
+        """
+        httpapi = self.get_httpapi({'zabbix_session_cache_path': None})
+        httpapi.setup_connection()
+        httpapi.login('Admin', 'zabbix')
+        httpapi.set_api_version('7.0.0')
+        self.assertEqual(httpapi.setup_connection()['zabbix_api_version'], '7.0.0')
+        httpapi.logout()
+
+        self.assertEqual(self.sent, ['user.login', 'user.logout'])
+        self.assertFalse(os.path.exists(self.path))
+
+        httpapi = self.get_httpapi({'zabbix_session_cache_path': None})
+        self.assertEqual(httpapi.setup_connection()['zabbix_api_version'], None)
+
+    def test_basic_auth(self):
+        """
+        Testing the reuse of the session with basic HTTP authentication.
+
+        Expected result: the session is saved and found with the key of the Zabbix user,
+        although the user of the connection is replaced with the user of basic HTTP authentication.
+        """
+        options = {'http_login': 'http_user', 'http_password': 'http_password'}
+        httpapi = self.get_httpapi(options)
+        httpapi.setup_connection()
+        key = httpapi.session_key()
+        httpapi.login('Admin', 'zabbix')
+        httpapi.set_api_version('7.0.0')
+
+        self.assertEqual(httpapi.connection._options['remote_user'], 'http_user')
+        self.assertEqual(httpapi.session_key(), key)
+        self.assertEqual(httpapi.setup_connection()['zabbix_api_version'], '7.0.0')
+
+        httpapi = self.get_httpapi(options)
+        self.assertEqual(httpapi.setup_connection()['zabbix_api_version'], '7.0.0')
+        httpapi.login('Admin', 'zabbix')
+
+        self.assertEqual(httpapi.connection._auth, {'auth': 'session0'})
+        self.assertEqual(self.sent, ['user.login', 'user.checkAuthentication'])
+        self.assertEqual(SessionStore(self.path, 'secret').get(key)['auth'], 'session0')
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible.errors import AnsibleParserError
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+class TestBatchRequests(unittest.TestCase):
+
+    def test_batch_request(self):
+        """
+        This test checks sending of several requests with one HTTP request.
+
+        Expected result: results are returned in the order of requests,
+        auth is added only to the requests that require it.
+        """
+        sent = []
+
+        # mock for send_request
+        def mock_send_request(self, headers, data):
+            sent.append(data)
+            return [
+                {'jsonrpc': '2.0', 'id': data[1]['id'], 'result': [{'templateid': '3'}]},
+                {'jsonrpc': '2.0', 'id': data[0]['id'], 'result': [{'groupid': '2'}]}]
+
+        with patch.multiple(
+                InventoryModule,
+                send_request=mock_send_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'http_login': None, 'http_password': None}
+            inventory.zabbix_version = '7.0.0'
+            inventory.auth = 'token'
+
+            result = inventory.api_batch_request([
+                ('hostgroup.get', {'output': ['groupid']}),
+                ('template.get', {'output': ['templateid']})])
+
+            self.assertEqual(result, [[{'groupid': '2'}], [{'templateid': '3'}]])
+            self.assertEqual(len(sent), 1)
+            self.assertEqual([r['auth'] for r in sent[0]], ['token', 'token'])
+
+    def test_batch_request_error(self):
+        """
+        This test checks errors in a batch request.
+
+        Test cases:
+            1. One of requests returned an error.
+            2. The response for one of requests is missing.
+            3. The whole batch was rejected.
+
+        Expected result: AnsibleParserError is raised in all cases.
+        """
+        test_cases = [
+            lambda data: [
+                {'id': data[0]['id'], 'result': []},
+                {'id': data[1]['id'], 'error': {'data': 'No permissions'}}],
+            lambda data: [{'id': data[0]['id'], 'result': []}],
+            lambda data: {'error': {'data': 'Invalid request'}}]
+
+        for each in test_cases:
+            with patch.multiple(
+                    InventoryModule,
+                    send_request=lambda self, headers, data: each(data)):
+
+                inventory = InventoryModule()
+                inventory.args = {'http_login': None, 'http_password': None}
+                inventory.zabbix_version = '7.0.0'
+
+                with self.assertRaises(AnsibleParserError):
+                    inventory.api_batch_request([
+                        ('hostgroup.get', {}),
+                        ('template.get', {})])
+
+    def test_requests_by_batches(self):
+        """
+        This test checks splitting of requests into batches.
+
+        Test cases:
+            1. Batch size is 2, there are 3 requests.
+            2. Batches are disabled.
+
+        Expected result: all cases run successfully.
+        """
+        batches = []
+
+        # mock for api_batch_request
+        def mock_api_batch_request(self, requests):
+            batches.append([m for m, p in requests])
+            return [m for m, p in requests]
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            batches.append(method)
+            return method
+
+        requests = [('hostgroup.get', {}), ('template.get', {}), ('proxy.get', {})]
+        with patch.multiple(
+                InventoryModule,
+                api_batch_request=mock_api_batch_request,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'batch_size': 2}
+            self.assertEqual(
+                inventory.api_requests(requests),
+                ['hostgroup.get', 'template.get', 'proxy.get'])
+            self.assertEqual(batches, [['hostgroup.get', 'template.get'], ['proxy.get']])
+
+            batches[:] = []
+            inventory.args = {'batch_size': 1}
+            inventory.api_requests(requests)
+            self.assertEqual(batches, ['hostgroup.get', 'template.get', 'proxy.get'])
+
+    def test_login_with_version(self):
+        """
+        This test checks that the API version is requested together with logging in.
+
+        Expected result: the version and the auth token are received with one batch.
+        """
+        batches = []
+
+        # mock for api_batch_request
+        def mock_api_batch_request(self, requests):
+            batches.append([m for m, p in requests])
+            return ['7.0.0', 'auth_token']
+
+        with patch.multiple(
+                InventoryModule,
+                api_batch_request=mock_api_batch_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'zabbix_user': 'Admin', 'zabbix_password': 'zabbix', 'batch_size': 10}
+            self.assertEqual(inventory.login(), 'auth_token')
+            self.assertEqual(inventory.zabbix_version, '7.0.0')
+            self.assertEqual(batches, [['apiinfo.version', 'user.login']])
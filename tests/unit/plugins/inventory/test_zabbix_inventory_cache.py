@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+zabbix_hosts = [
+    {'hostid': '1', 'host': 'host_1', 'status': '0', 'tags': [{'tag': 'scope', 'value': 'web'}]},
+    {'hostid': '2', 'host': 'host_2', 'status': '1', 'tags': []},
+    {'hostid': '3', 'host': 'host_3', 'proxy': 'Proxy 1'}]
+
+
+class TestCacheFormat(unittest.TestCase):
+
+    def test_pack_hosts(self):
+        """
+        This test checks the conversion of hosts to the compact layout and back.
+
+        Expected result: the hosts are the same, including hosts with other fields.
+        """
+        inventory = InventoryModule()
+        packed = inventory.pack_hosts(zabbix_hosts)
+
+        self.assertIsInstance(packed, str)
+        self.assertEqual(inventory.unpack_hosts(packed), zabbix_hosts)
+        self.assertEqual(inventory.unpack_hosts(inventory.pack_hosts([])), [])
+        with self.assertRaises(ValueError):
+            inventory.unpack_hosts('corrupted')
+
+    def test_read_cached_hosts(self):
+        """
+        This test checks reading of hosts saved in the cache.
+
+        Test cases:
+            1. The hosts are saved.
+            2. The hosts are missing in the cache.
+            3. The format of the cache is unknown.
+            4. The number of hosts does not match the header.
+
+        Expected result: the hosts are returned only in the first case.
+        """
+        inventory = InventoryModule()
+        inventory._cache = {'key_hosts': inventory.pack_hosts(zabbix_hosts)}
+        header = {'format': InventoryModule.CACHE_FORMAT, 'hosts_key': 'key_hosts', 'hosts_count': 3}
+
+        self.assertEqual(inventory.read_cached_hosts(header), zabbix_hosts)
+        self.assertIsNone(inventory.read_cached_hosts(dict(header, hosts_key='other_key')))
+        self.assertIsNone(inventory.read_cached_hosts(dict(header, format=1)))
+        self.assertIsNone(inventory.read_cached_hosts(dict(header, hosts_count=2)))
@@ -36,7 +36,7 @@ class TestCompareCachedInputArgs(unittest.TestCase):
             6. Old value is None.
             7. New value is None.
 
-        Expected result: all cases run successfully.
+        Expected result: all cases run successfully, the password is not compared.
         """
 
         test_cases = [
@@ -48,7 +48,7 @@ class TestCompareCachedInputArgs(unittest.TestCase):
             {'input': 'test', 'old': None, 'expected': False},
             {'input': None, 'old': 'test', 'expected': False}]
 
-        params = ['zabbix_user', 'zabbix_password', 'zabbix_api_token', 'zabbix_api_url']
+        params = ['zabbix_user', 'zabbix_api_token', 'zabbix_api_url']
         for param in params:
             for each in test_cases:
                 inventory = InventoryModule()
@@ -57,6 +57,11 @@ class TestCompareCachedInputArgs(unittest.TestCase):
                 self.assertEqual(result, each['expected'],
                                  'error with input data: {0}'.format(each))
 
+        for each in test_cases:
+            inventory = InventoryModule()
+            inventory.args = {'zabbix_password': each['input']}
+            self.assertTrue(inventory.compare_cached_input_args({'zabbix_password': each['old']}))
+
     def test_compare_input_args_output(self):
         """
         This test checks function of comparing output arguments in input parameters.
@@ -282,3 +287,40 @@ class TestCompareCachedInputArgs(unittest.TestCase):
             result = inventory.compare_cached_input_args({'filter': each['old']})
             self.assertEqual(result, each['expected'],
                              'error with input data: {0}'.format(each))
+
+    def test_input_args_fingerprint(self):
+        """
+        This test checks the hash of input arguments used as the cache key.
+
+        Expected result: the hash does not depend on the order of list elements,
+        the case of query names, the parameters not affecting the data and the password.
+        """
+        input_args = {
+            'zabbix_api_url': 'http://zabbix/api_jsonrpc.php', 'zabbix_user': 'Admin', 'zabbix_password': 'secret',
+            'output': ['name', 'status'],
+            'query': {'selectTags': ['tag', 'value']},
+            'filter': {'hostgroups': ['Linux*', 'Windows*'], 'tags': [{'tag': 'a'}, {'tag': 'b', 'value': 'c'}]}}
+        same_args = {
+            'zabbix_api_url': 'http://zabbix/api_jsonrpc.php', 'zabbix_user': 'Admin', 'zabbix_password': 'secret',
+            'output': ['status', 'name'],
+            'query': {'selecttags': ['value', 'tag']},
+            'filter': {'hostgroups': ['Windows*', 'Linux*'], 'tags': [{'value': 'c', 'tag': 'b'}, {'tag': 'a'}]},
+            'compose': {'zabbix_verbose_status': 'zabbix_status'}}
+
+        inventory = InventoryModule()
+        fingerprint = inventory.get_input_args_fingerprint(input_args)
+
+        self.assertEqual(len(fingerprint), 64)
+        self.assertNotIn('secret', fingerprint)
+        self.assertEqual(inventory.get_input_args_fingerprint(same_args), fingerprint)
+        self.assertEqual(
+            inventory.get_input_args_fingerprint(dict(input_args, zabbix_password='other')), fingerprint)
+        self.assertNotEqual(
+            inventory.get_input_args_fingerprint(dict(input_args, zabbix_user='other')), fingerprint)
+        self.assertNotEqual(
+            inventory.get_input_args_fingerprint(dict(input_args, zabbix_api_token='token')), fingerprint)
+        self.assertNotEqual(
+            inventory.get_input_args_fingerprint(dict(input_args, zabbix_api_token='token')),
+            inventory.get_input_args_fingerprint(dict(input_args, zabbix_api_token='other token')))
+        self.assertNotEqual(
+            inventory.get_input_args_fingerprint(dict(input_args, output=['name'])), fingerprint)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible.errors import AnsibleError
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.template import Templar
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+zabbix_hosts = [
+    {'hostid': '1', 'host': 'host_1', 'status': '0', 'description': '',
+     'groups': [{'name': 'Linux'}], 'tags': [{'tag': 'scope', 'value': 'web'}]},
+    {'hostid': '2', 'host': 'host_2', 'status': '1', 'description': '',
+     'groups': [{'name': 'Windows'}], 'tags': []}]
+
+
+class TestHostVars(unittest.TestCase):
+
+    def add_hosts(self, args):
+        """Function for adding the test hosts to a new inventory"""
+        inventory = InventoryModule()
+        inventory.inventory = InventoryData()
+        inventory.templar = Templar(loader=DataLoader())
+        inventory._options = {'leading_separator': True}
+        inventory.args = dict({'prefix': 'zabbix_', 'strict': True}, **args)
+        inventory.add_zabbix_hosts(zabbix_hosts)
+        return inventory.inventory
+
+    def test_separate_vars(self):
+        """
+        This test checks the storing of each field as a separate variable.
+
+        Expected result: all fields are stored with the prefix.
+        """
+        inventory = self.add_hosts({'host_vars_format': 'separate'})
+
+        self.assertEqual(
+            sorted(v for v in inventory.get_host('host_1').vars if v.startswith('zabbix_')),
+            ['zabbix_description', 'zabbix_groups', 'zabbix_host', 'zabbix_hostid', 'zabbix_status', 'zabbix_tags'])
+
+    def test_compact_vars(self):
+        """
+        This test checks the storing of fields as one variable.
+
+        Expected result: all fields are stored in one variable, only the fields
+        referenced by compose, groups and keyed_groups are stored separately,
+        and compose, groups and keyed_groups are applied.
+        """
+        inventory = self.add_hosts({
+            'host_vars_format': 'compact',
+            'compose': {'zabbix_verbose_status': 'zabbix_status.replace("1", "Disabled").replace("0", "Enabled")'},
+            'groups': {'web': "zabbix_data.tags | selectattr('value', 'equalto', 'web') | list"},
+            'keyed_groups': [{'key': "zabbix_groups | map(attribute='name')", 'separator': ''}]})
+
+        host_vars = inventory.get_host('host_1').vars
+        self.assertEqual(
+            sorted(v for v in host_vars if v.startswith('zabbix_')),
+            ['zabbix_data', 'zabbix_groups', 'zabbix_status', 'zabbix_verbose_status'])
+        self.assertEqual(host_vars['zabbix_data'], zabbix_hosts[0])
+        self.assertEqual(host_vars['zabbix_verbose_status'], 'Enabled')
+        self.assertEqual(inventory.get_host('host_2').vars['zabbix_verbose_status'], 'Disabled')
+        self.assertEqual(sorted(h.name for h in inventory.groups['web'].get_hosts()), ['host_1'])
+        self.assertEqual(sorted(h.name for h in inventory.groups['Windows'].get_hosts()), ['host_2'])
+
+    def test_compiled_templates(self):
+        """
+        This test checks that the expressions are compiled once for all hosts.
+
+        Expected result: each expression is compiled once, the results are the same
+        as without the cache, and the environment is not changed.
+        """
+        inventory = InventoryModule()
+        inventory.templar = Templar(loader=DataLoader())
+        compile_template = inventory.templar.environment.compile
+        sources = []
+
+        def mock_compile(source, *args):
+            sources.append(source)
+            return compile_template(source, *args)
+
+        inventory.templar.environment.compile = mock_compile
+        inventory.inventory = InventoryData()
+        inventory._options = {'leading_separator': True}
+        inventory.args = {
+            'prefix': 'zabbix_', 'strict': True,
+            'compose': {'zabbix_verbose_status': 'zabbix_status.replace("1", "Disabled").replace("0", "Enabled")'},
+            'groups': {'enabled': 'zabbix_status == "0"'}}
+        inventory.add_zabbix_hosts(zabbix_hosts)
+
+        self.assertEqual(len(sources), 2)
+        self.assertEqual(inventory.inventory.get_host('host_2').vars['zabbix_verbose_status'], 'Disabled')
+        self.assertEqual([h.name for h in inventory.inventory.groups['enabled'].get_hosts()], ['host_1'])
+        self.assertIs(inventory.templar.environment.compile, mock_compile)
+
+    def test_compiled_templates_lookups(self):
+        """
+        This test checks lookups in the compiled expressions of compose.
+
+        Expected result: lookups are disabled in the compiled expression only,
+        templates of the templar can still use them.
+        """
+        inventory = InventoryModule()
+        inventory.templar = Templar(loader=DataLoader())
+        inventory.inventory = InventoryData()
+        inventory._options = {'leading_separator': True}
+        inventory.args = {
+            'prefix': 'zabbix_', 'strict': True,
+            'compose': {'home': 'lookup("env", "HOME")'}}
+
+        with self.assertRaisesRegex(AnsibleError, 'lookups were disabled'):
+            inventory.add_zabbix_hosts(zabbix_hosts)
+
+        self.assertTrue(inventory.templar.template('{{ lookup("env", "HOME") }}'))
+
+    def test_compiled_templates_as_ansible(self):
+        """
+        This test compares the compiled expressions with the templating by Ansible.
+
+        Expected result: the results and errors are the same, including the types of results,
+        undefined variables and the errors of types.
+        """
+        expressions = [
+            'zabbix_hostid', 'zabbix_hostid | int', 'zabbix_none', 'zabbix_tags',
+            'zabbix_tags | map(attribute="tag") | list', 'zabbix_status == "0"', '{"id": zabbix_hostid}',
+            'zabbix_host | regex_replace("\\d", "N")', 'range(2) | list', 'zabbix_missing',
+            'zabbix_tags.missing', 'zabbix_hostid + 1', 'lookup("env", "HOME")', '"a" ~ zabbix_missing']
+        variables = {
+            'zabbix_hostid': '1', 'zabbix_host': 'host_1', 'zabbix_status': '0', 'zabbix_none': None,
+            'zabbix_tags': [{'tag': 'scope', 'value': 'web'}]}
+
+        def run(template, expression):
+            try:
+                result = template(expression)
+                return result, type(result)
+            except Exception as e:
+                return type(e), str(e)
+
+        for fail_on_undefined in [True, False]:
+            inventory = InventoryModule()
+            inventory.templar = Templar(loader=DataLoader())
+            if not inventory.can_compile_templates():
+                self.skipTest('Expressions are templated by Ansible')
+            templar = Templar(loader=DataLoader())
+            inventory.templar._fail_on_undefined_errors = templar._fail_on_undefined_errors = fail_on_undefined
+
+            def compose(expression):
+                return inventory._compose(expression, variables)
+
+            def template(expression):
+                templar.available_variables = variables
+                return templar.template('{{%s}}' % expression, disable_lookups=True)
+
+            for expression in expressions:
+                with self.subTest(expression=expression, fail_on_undefined=fail_on_undefined):
+                    self.assertEqual(run(compose, expression), run(template, expression))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+
+import sys
+import threading
+import time
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+class TestPaging(unittest.TestCase):
+
+    def test_get_hosts_by_pages(self):
+        """
+        This test checks the requesting of hosts by pages.
+
+        Expected result: IDs of hosts are requested without linked objects,
+        then hosts are requested by chunks of IDs with the full query.
+        """
+        requests = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            requests.append(params)
+            if params['output'] == ['hostid']:
+                return [{'hostid': str(i)} for i in range(1, 6)]
+            return [{'hostid': h, 'host': 'host_{0}'.format(h)} for h in params['hostids']]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'page_size': 2}
+            inventory.query = {
+                'output': 'extend',
+                'selectTags': 'extend',
+                'groupids': ['2'],
+                'searchWildcardsEnabled': True}
+
+            pages = list(inventory.get_zabbix_hosts_by_pages())
+
+            self.assertEqual(
+                [[h['hostid'] for h in page] for page in pages],
+                [['1', '2'], ['3', '4'], ['5']])
+            self.assertEqual(requests[0], {
+                'output': ['hostid'],
+                'sortfield': 'hostid',
+                'groupids': ['2'],
+                'searchWildcardsEnabled': True})
+            for each in requests[1:]:
+                self.assertEqual(each['selectTags'], 'extend')
+                self.assertEqual(each['groupids'], ['2'])
+
+    def test_get_hosts_by_pages_empty(self):
+        """
+        This test checks the requesting of hosts by pages if no hosts were found.
+
+        Expected result: only IDs of hosts are requested.
+        """
+        requests = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            requests.append(params)
+            return []
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'page_size': 100}
+            inventory.query = {'output': 'extend'}
+
+            self.assertEqual(list(inventory.get_zabbix_hosts_by_pages()), [])
+            self.assertEqual(len(requests), 1)
+
+    def test_get_hosts_by_pages_concurrently(self):
+        """
+        This test checks the requesting of pages with several threads.
+
+        Expected result: pages are returned in their order, the number of
+        concurrent requests is limited by page_workers.
+        """
+        lock = threading.Lock()
+        active = []
+        max_active = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            if params['output'] == ['hostid']:
+                return [{'hostid': str(i)} for i in range(1, 12)]
+            with lock:
+                active.append(params['hostids'])
+                max_active.append(len(active))
+            # the first pages are received later than the next ones
+            time.sleep(0.05 if params['hostids'][0] == '1' else 0.01)
+            with lock:
+                active.remove(params['hostids'])
+            return [{'hostid': h, 'host': 'host_{0}'.format(h)} for h in params['hostids']]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'page_size': 2, 'page_workers': 3}
+            inventory.query = {'output': 'extend'}
+
+            pages = list(inventory.get_zabbix_hosts_by_pages())
+
+            self.assertEqual(
+                [[h['hostid'] for h in page] for page in pages],
+                [['1', '2'], ['3', '4'], ['5', '6'], ['7', '8'], ['9', '10'], ['11']])
+            self.assertEqual(max(max_active), 3)
+
+    def test_get_hosts_by_pages_concurrently_slow_consumer(self):
+        """
+        This test checks the requesting of pages with several threads if pages are taken slowly.
+
+        Expected result: the pages which are requested or received but not taken yet
+        are limited by page_workers.
+        """
+        lock = threading.Lock()
+        pending = []
+        max_pending = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            with lock:
+                pending.append(params['hostids'])
+                max_pending.append(len(pending))
+            return [{'hostid': h, 'host': 'host_{0}'.format(h)} for h in params['hostids']]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'page_size': 2, 'page_workers': 3}
+            inventory.query = {'output': 'extend'}
+
+            pages = []
+            for page in inventory.get_zabbix_hosts_by_pages([str(i) for i in range(1, 21)]):
+                # give the threads time to request more pages
+                time.sleep(0.02)
+                with lock:
+                    pending.remove([h['hostid'] for h in page])
+                pages.append(page)
+
+            self.assertEqual(len(pages), 10)
+            self.assertEqual(max(max_pending), 3)
+
+    def test_get_hosts_by_pages_concurrently_error(self):
+        """
+        This test checks the error of one of the pages requested with several threads.
+
+        Expected result: the previous pages are returned, then the error is raised.
+        """
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            if params['hostids'] == ['3', '4']:
+                raise AnsibleConnectionFailure('Connection refused')
+            return [{'hostid': h, 'host': 'host_{0}'.format(h)} for h in params['hostids']]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'page_size': 2, 'page_workers': 2}
+            inventory.query = {'output': 'extend'}
+
+            pages = inventory.get_zabbix_hosts_by_pages([str(i) for i in range(1, 8)])
+
+            self.assertEqual([h['hostid'] for h in next(pages)], ['1', '2'])
+            with self.assertRaises(AnsibleConnectionFailure):
+                next(pages)
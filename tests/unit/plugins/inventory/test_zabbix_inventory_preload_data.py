@@ -678,3 +678,77 @@ class TestPreloadData(unittest.TestCase):
                 inventory.preload_data()
 
                 self.assertEqual(inventory.query.get('hostids'), None)
+
+    def test_strict_and_preloaded_hosts(self):
+        """
+        This test checks that hosts are requested only once in case of strict AND logic.
+
+        Test cases:
+            1. Hosts are requested with one request. Tags are removed, because they were not requested.
+            2. Hosts are requested by pages. Only IDs and tags are preloaded.
+            3. Only names of tags were requested. Values of tags are requested for filtering
+               and removed from the hosts.
+
+        Expected result: all cases run successfully.
+        """
+        requests = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            requests.append(params)
+            return [dict(h) for h in preloaded_data]
+
+        args = {
+            'filter': {
+                'tags': [
+                    {'tag': 'port', 'value': 22, 'operator': 'equals'},
+                    {'tag': 'search', 'value': 'additional', 'operator': 'contains'}],
+                'tags_behavior': 'and'}}
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            # case #1
+            inventory = InventoryModule()
+            inventory.args = args
+            inventory.zabbix_version = '7.0.0'
+            inventory.query = {'output': 'extend', 'selectInterfaces': ['ip'], 'evaltype': '0'}
+
+            inventory.preload_data()
+
+            self.assertEqual(len(requests), 1)
+            self.assertEqual(requests[0]['selectTags'], ['tag', 'value'])
+            self.assertEqual(requests[0]['selectInterfaces'], ['ip'])
+            self.assertEqual(
+                [h['hostid'] for h in inventory.preloaded_hosts], ['10674', '10679'])
+            self.assertNotIn('tags', inventory.preloaded_hosts[0])
+
+            # case #2
+            requests[:] = []
+            inventory = InventoryModule()
+            inventory.args = dict(args, page_size=100)
+            inventory.zabbix_version = '7.0.0'
+            inventory.query = {'output': 'extend', 'selectInterfaces': ['ip'], 'evaltype': '0'}
+
+            inventory.preload_data()
+
+            self.assertEqual(requests[0], {'output': ['hostid'], 'selectTags': ['tag', 'value'], 'evaltype': '0'})
+            self.assertIsNone(inventory.preloaded_hosts)
+            self.assertEqual(sorted(inventory.query['hostids']), ['10674', '10679'])
+
+            # case #3
+            requests[:] = []
+            inventory = InventoryModule()
+            inventory.args = args
+            inventory.zabbix_version = '7.0.0'
+            inventory.query = {'output': 'extend', 'selectTags': ['tag'], 'evaltype': '0'}
+
+            inventory.preload_data()
+
+            self.assertEqual(requests[0]['selectTags'], ['tag', 'value'])
+            self.assertEqual(
+                [h['hostid'] for h in inventory.preloaded_hosts], ['10674', '10679'])
+            for host in inventory.preloaded_hosts:
+                self.assertTrue(host['tags'])
+                self.assertEqual([sorted(t) for t in host['tags']], [['tag']] * len(host['tags']))
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible.errors import AnsibleParserError
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+class TestIncrementalRefresh(unittest.TestCase):
+
+    def test_refresh_hosts(self):
+        """
+        This test checks the incremental refresh of cached hosts.
+
+        Cached hosts: 1, 2, 3. Hosts in Zabbix: 1, 3 (changed), 4 (new).
+
+        Expected result: only hosts 3 and 4 are requested in full,
+        host 2 is removed, host 1 is taken from cache.
+        """
+        requests = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            requests.append((method, params))
+            if method == 'auditlog.get':
+                return [{'resourceid': '3'}, {'resourceid': '5'}]
+            if params['output'] == ['hostid']:
+                return [{'hostid': '1'}, {'hostid': '3'}, {'hostid': '4'}]
+            return [{'hostid': h, 'host': 'new_{0}'.format(h)} for h in params['hostids']]
+
+        cached_hosts = [
+            {'hostid': '1', 'host': 'cached_1'},
+            {'hostid': '2', 'host': 'cached_2'},
+            {'hostid': '3', 'host': 'cached_3'}]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'output': ['hostid', 'host']}
+            inventory.zabbix_version = '7.0.0'
+            inventory.query = {'output': ['hostid', 'host'], 'selectTags': 'extend'}
+
+            result = inventory.refresh_zabbix_hosts(cached_hosts, '1700000000')
+
+            self.assertEqual(
+                [h['host'] for h in result],
+                ['cached_1', 'new_3', 'new_4'])
+            self.assertEqual(requests[1][1]['time_from'], '1700000000')
+            self.assertEqual(requests[2][1]['hostids'], ['3', '4'])
+            self.assertEqual(len(requests), 3)
+
+    def test_refresh_wo_changes(self):
+        """
+        This test checks the incremental refresh without new or changed hosts
+        and without paging.
+
+        Expected result: hosts are taken from cache, no hosts are requested in full.
+        """
+        requests = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            requests.append((method, params))
+            if method == 'auditlog.get':
+                return []
+            return [{'hostid': '1'}, {'hostid': '2'}]
+
+        cached_hosts = [
+            {'hostid': '1', 'host': 'cached_1'},
+            {'hostid': '2', 'host': 'cached_2'}]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'output': ['hostid', 'host'], 'page_size': None}
+            inventory.zabbix_version = '7.0.0'
+            inventory.query = {'output': ['hostid', 'host']}
+
+            result = inventory.refresh_zabbix_hosts(cached_hosts, '1700000000')
+
+            self.assertEqual(
+                [h['host'] for h in result],
+                ['cached_1', 'cached_2'])
+            self.assertEqual(len(requests), 2)
+
+    def test_refresh_w_changed_related_objects(self):
+        """
+        This test checks the incremental refresh after a host group was changed.
+
+        Expected result: all matching hosts are requested in full.
+        """
+        requests = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            requests.append((method, params))
+            if method == 'auditlog.get':
+                return [{'resourceid': '3', 'resourcetype': '4'}, {'resourceid': '20', 'resourcetype': '14'}]
+            if params['output'] == ['hostid']:
+                return [{'hostid': '1'}, {'hostid': '3'}]
+            return [{'hostid': h, 'host': 'new_{0}'.format(h)} for h in params['hostids']]
+
+        cached_hosts = [
+            {'hostid': '1', 'host': 'cached_1'},
+            {'hostid': '3', 'host': 'cached_3'}]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'output': ['hostid', 'host']}
+            inventory.zabbix_version = '7.0.0'
+            inventory.query = {'output': ['hostid', 'host'], 'selectHostGroups': 'extend'}
+
+            result = inventory.refresh_zabbix_hosts(cached_hosts, '1700000000')
+
+            self.assertEqual(
+                [h['host'] for h in result],
+                ['new_1', 'new_3'])
+            self.assertEqual(requests[1][1]['filter'], {'resourcetype': ['4', '14', '26', '30']})
+
+    def test_refresh_runtime_fields(self):
+        """
+        This test checks the refresh of fields changed without audit log records
+        (maintenance status of hosts, availability of interfaces).
+
+        Cached hosts: 1, 2. Hosts in Zabbix: 1, 2 (changed).
+
+        Expected result: runtime fields of host 1 are requested separately
+        and updated in the cached host, host 2 is requested in full.
+        """
+        requests = []
+
+        # mock for api_request
+        def mock_api_request(self, method, params):
+            requests.append((method, params))
+            if method == 'auditlog.get':
+                return [{'resourceid': '2', 'resourcetype': '4'}]
+            if params['output'] == ['hostid']:
+                return [{'hostid': '1'}, {'hostid': '2'}]
+            if 'maintenance_status' in params['output'] and 'host' not in params['output']:
+                return [{
+                    'hostid': '1', 'maintenance_status': '1', 'active_available': '1', 'assigned_proxyid': '0',
+                    'interfaces': [{'interfaceid': '11', 'available': '2', 'error': 'timeout'}]}]
+            return [{'hostid': h, 'host': 'new_{0}'.format(h)} for h in params['hostids']]
+
+        cached_hosts = [
+            {'hostid': '1', 'host': 'cached_1', 'maintenance_status': '0', 'active_available': '0',
+             'interfaces': [{'interfaceid': '11', 'ip': '127.0.0.1', 'available': '1', 'error': ''}]},
+            {'hostid': '2', 'host': 'cached_2', 'maintenance_status': '0'}]
+
+        with patch.multiple(
+                InventoryModule,
+                api_request=mock_api_request):
+
+            inventory = InventoryModule()
+            inventory.args = {'output': ['extend']}
+            inventory.zabbix_version = '7.0.0'
+            inventory.query = {'output': 'extend', 'selectInterfaces': ['interfaceid', 'ip', 'available', 'error']}
+
+            result = inventory.refresh_zabbix_hosts(cached_hosts, '1700000000')
+
+            self.assertEqual(
+                [h['host'] for h in result],
+                ['cached_1', 'new_2'])
+            self.assertEqual(requests[2][1], {
+                'output': ['hostid', 'maintenanceid', 'maintenance_status', 'maintenance_type', 'maintenance_from',
+                           'active_available', 'assigned_proxyid'],
+                'selectInterfaces': ['interfaceid', 'available', 'error'],
+                'hostids': ['1']})
+            self.assertEqual(result[0]['maintenance_status'], '1')
+            self.assertEqual(result[0]['active_available'], '1')
+            self.assertEqual(
+                result[0]['interfaces'],
+                [{'interfaceid': '11', 'ip': '127.0.0.1', 'available': '2', 'error': 'timeout'}])
+            self.assertEqual(requests[3][1]['hostids'], ['2'])
+
+    def test_runtime_fields(self):
+        """
+        This test checks the list of requested fields changed without audit log records.
+
+        Expected result: only the fields included in the query are requested,
+        fields of newer versions are not requested from older versions of Zabbix.
+        """
+        test_cases = [
+            {'version': '7.0.0', 'query': {'output': ['hostid', 'host']}, 'expected': ([], [])},
+            {'version': '6.0.0', 'query': {'output': 'extend', 'selectInterfaces': 'extend'},
+             'expected': (['maintenanceid', 'maintenance_status', 'maintenance_type', 'maintenance_from'],
+                          ['available', 'error', 'errors_from', 'disable_until'])},
+            {'version': '7.0.0', 'query': {'output': ['host', 'maintenance_status'], 'selectInterfaces': ['ip']},
+             'expected': (['maintenance_status'], [])}]
+
+        for each in test_cases:
+            inventory = InventoryModule()
+            inventory.zabbix_version = each['version']
+            inventory.query = each['query']
+            self.assertEqual(inventory.get_runtime_fields(), each['expected'])
+
+    def test_can_refresh_incrementally(self):
+        """
+        This test checks whether the incremental refresh is used for the query.
+
+        Expected result: the refresh is not used if the query selects objects
+        whose changes are not recorded in the audit log as changes of hosts.
+        """
+        test_cases = [
+            {'query': None, 'expected': True},
+            {'query': {'selectTags': 'extend', 'selectHostGroups': ['name'], 'limit': 10}, 'expected': True},
+            {'query': {'selectTags': 'extend', 'selectInventory': ['os']}, 'expected': False},
+            {'query': {'selectItems': ['key_']}, 'expected': False}]
+
+        for each in test_cases:
+            inventory = InventoryModule()
+            inventory.args = {'query': each['query']}
+            self.assertEqual(inventory.can_refresh_incrementally(), each['expected'])
+
+    def test_audit_clock(self):
+        """
+        This test checks getting of the marker for the incremental refresh.
+
+        Test cases:
+            1. The audit log contains records.
+            2. The audit log is empty.
+            3. The audit log is not available.
+
+        Expected result: all cases run successfully.
+        """
+        test_cases = [
+            {'response': [{'clock': '1700000000'}], 'expected': '1700000000'},
+            {'response': [], 'expected': '0'},
+            {'response': AnsibleParserError('No permissions'), 'expected': None}]
+
+        for each in test_cases:
+
+            # mock for api_request
+            def mock_api_request(self, method, params):
+                if isinstance(each['response'], Exception):
+                    raise each['response']
+                return each['response']
+
+            with patch.multiple(
+                    InventoryModule,
+                    api_request=mock_api_request):
+
+                inventory = InventoryModule()
+                self.assertEqual(inventory.get_audit_clock(), each['expected'])
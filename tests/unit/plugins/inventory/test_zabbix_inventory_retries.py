@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import json
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+class TestRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.inventory = InventoryModule()
+        self.inventory.args = {'http_login': None, 'http_password': None, 'retries': 2, 'retry_delay': 1}
+        self.inventory.zabbix_version = '7.0.0'
+        self.sent = []
+
+        mock_sleep = patch('time.sleep')
+        self.sleep = mock_sleep.start()
+        self.addCleanup(mock_sleep.stop)
+
+    def set_responses(self, responses):
+        """Function for setting the responses: HTTP codes or exceptions"""
+        def mock_post_request(headers, body):
+            self.sent.append(json.loads(body)['method'])
+            each = responses.pop(0)
+            if isinstance(each, Exception):
+                raise each
+            response = {'jsonrpc': '2.0', 'id': '1', 'result': [{'hostid': '1'}]}
+            return each, 'Service Unavailable', json.dumps(response).encode('utf-8'), ''
+
+        self.inventory.post_request = mock_post_request
+
+    def test_read_only_request(self):
+        """
+        This test checks the repeating of a read-only request.
+
+        Expected result: the request is repeated after the transient errors.
+        """
+        self.set_responses([503, AnsibleConnectionFailure('Connection reset by peer'), 200])
+        result = self.inventory.api_request('host.get', {'output': ['hostid']})
+
+        self.assertEqual(result, [{'hostid': '1'}])
+        self.assertEqual(self.sent, ['host.get', 'host.get', 'host.get'])
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_exhausted_retries(self):
+        """
+        This test checks the read-only request failed after all attempts.
+
+        Expected result: the HTTP error is raised.
+        """
+        self.set_responses([503, 503, 503])
+        with self.assertRaisesRegex(AnsibleConnectionFailure, 'HTTP Error 503'):
+            self.inventory.api_request('host.get', {'output': ['hostid']})
+
+        self.assertEqual(len(self.sent), 3)
+
+    def test_login(self):
+        """
+        This test checks the request which is not read-only.
+
+        Expected result: the request is not repeated.
+        """
+        self.set_responses([503, 200])
+        with self.assertRaisesRegex(AnsibleConnectionFailure, 'HTTP Error 503'):
+            self.inventory.api_request('user.login', {'username': 'Admin', 'password': 'zabbix'})
+
+        self.assertEqual(self.sent, ['user.login'])
+        self.sleep.assert_not_called()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible.errors import AnsibleAuthenticationFailure
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+servers_hosts = {
+    'http://eu.zabbix': ['web01', 'db01'],
+    'http://us.zabbix': ['web01', 'web02']}
+
+
+class TestMultipleServers(unittest.TestCase):
+
+    def get_hosts(self, args):
+        """Function for getting hosts from the mocked servers. Returns hosts and used arguments."""
+        used_args = []
+
+        def mock_load_zabbix_hosts(self, cache=True, add_hosts=True):
+            used_args.append(dict(self.args, zabbix_api_url=self.zabbix_api_url))
+            if self.args.get('zabbix_password') == 'wrong':
+                raise AnsibleAuthenticationFailure('Login name or password is incorrect.')
+            return [{'hostid': str(i), 'host': h} for i, h in enumerate(servers_hosts[self.args['zabbix_api_url']])]
+
+        def mock_validate_params(self):
+            pass
+
+        with patch.multiple(
+                InventoryModule,
+                load_zabbix_hosts=mock_load_zabbix_hosts,
+                validate_params=mock_validate_params):
+
+            inventory = InventoryModule()
+            inventory.args = dict({
+                'zabbix_user': 'Admin', 'zabbix_password': 'zabbix',
+                'zabbix_servers': [
+                    {'name': 'eu', 'zabbix_api_url': 'http://eu.zabbix'},
+                    {'zabbix_api_url': 'http://us.zabbix', 'zabbix_password': 'us_password'}]}, **args)
+            return inventory.get_zabbix_hosts_from_servers(), used_args
+
+    def test_hosts_from_servers(self):
+        """
+        This test checks getting of hosts from several servers.
+
+        Expected result: each server is requested with its own URL and credentials,
+        hosts are combined in the order of servers with the name of the server,
+        the duplicate host from the second server is skipped.
+        """
+        hosts, used_args = self.get_hosts({'duplicate_hosts': 'first'})
+
+        self.assertEqual(
+            [(h['host'], h['server']) for h in hosts],
+            [('web01', 'eu'), ('db01', 'eu'), ('web02', 'http://us.zabbix')])
+        self.assertEqual(
+            sorted((a['zabbix_api_url'], a['zabbix_password'], a['zabbix_servers']) for a in used_args),
+            [('http://eu.zabbix/api_jsonrpc.php', 'zabbix', None),
+             ('http://us.zabbix/api_jsonrpc.php', 'us_password', None)])
+
+    def test_rename_duplicate_hosts(self):
+        """
+        This test checks renaming of hosts with the same names.
+
+        Expected result: the duplicate host from the second server is renamed.
+        """
+        hosts, used_args = self.get_hosts({'duplicate_hosts': 'rename'})
+
+        self.assertEqual(
+            [h['host'] for h in hosts],
+            ['web01', 'db01', 'web01_http://us.zabbix', 'web02'])
+
+    def test_failed_server(self):
+        """
+        This test checks the error of one of the servers.
+
+        Expected result: the error contains the name of the failed server.
+        """
+        with self.assertRaises(AnsibleAuthenticationFailure) as error:
+            self.get_hosts({'zabbix_servers': [
+                {'name': 'eu', 'zabbix_api_url': 'http://eu.zabbix', 'zabbix_password': 'wrong'},
+                {'zabbix_api_url': 'http://us.zabbix'}]})
+
+        self.assertIn(
+            'Failed to get hosts from Zabbix server eu: Login name or password is incorrect.',
+            str(error.exception))
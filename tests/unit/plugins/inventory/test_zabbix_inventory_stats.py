@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import json
+
+from ansible_collections.zabbix.zabbix.plugins.inventory import zabbix_inventory
+from ansible_collections.zabbix.zabbix.plugins.inventory.zabbix_inventory import InventoryModule
+from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import RequestStats
+
+import sys
+
+if sys.version_info[0] > 2:
+    import unittest
+    from unittest.mock import patch
+else:
+    try:
+        import unittest2 as unittest
+        from mock import patch
+    except ImportError:
+        print("Error import unittest library for Python 2")
+
+
+class MockHttpSession(object):
+    """Mock of the persistent connection returning results for the sent requests"""
+
+    def post(self, data, headers):
+        requests = json.loads(data)
+        if isinstance(requests, list):
+            response = [{'jsonrpc': '2.0', 'id': r['id'], 'result': []} for r in requests]
+        else:
+            response = {'jsonrpc': '2.0', 'id': requests['id'], 'result': [{'hostid': '1'}]}
+        return 200, 'OK', json.dumps(response).encode('utf-8'), ''
+
+
+class TestRequestStats(unittest.TestCase):
+
+    def test_stats_of_requests(self):
+        """
+        This test checks the statistics of sent requests.
+
+        Expected result: each HTTP request is recorded with its methods and sizes,
+        the totals are displayed for each method.
+        """
+        inventory = InventoryModule()
+        inventory.args = {'http_login': None, 'http_password': None, 'batch_size': 10}
+        inventory.zabbix_version = '7.0.0'
+        inventory.http_session = MockHttpSession()
+        inventory.api_stats = RequestStats()
+
+        inventory.api_request('host.get', {'output': ['hostid']})
+        inventory.api_request('host.get', {'output': ['hostid']})
+        inventory.api_requests([('hostgroup.get', {}), ('template.get', {})])
+
+        records = inventory.api_stats.get()
+        self.assertEqual(
+            [r['method'] for r in records],
+            ['host.get', 'host.get', 'hostgroup.get,template.get'])
+        self.assertEqual([r['status'] for r in records], [200, 200, 200])
+        self.assertTrue(all(r['request_bytes'] > 0 and r['response_bytes'] > 0 for r in records))
+
+        with patch.object(zabbix_inventory.display, 'vvv') as mock_vvv:
+            inventory.display_api_stats()
+
+        messages = sorted(c[0][0] for c in mock_vvv.call_args_list)
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith('Zabbix API host.get: 2 request(s), sent '))
+        self.assertTrue(messages[1].startswith('Zabbix API hostgroup.get,template.get: 1 request(s), sent '))
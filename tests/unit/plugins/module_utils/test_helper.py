@@ -7,10 +7,17 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import json
+import os
+import shutil
+import stat
+import tempfile
 import unittest
 
 from ansible_collections.zabbix.zabbix.plugins.module_utils.helper import (
-    tag_to_dict_transform, Zabbix_version)
+    tag_to_dict_transform, Zabbix_version, ObjectCache, RequestStats, RateLimiter,
+    is_read_only, rate_limit_path, retry_after, retry_delay)
+from ansible_collections.zabbix.zabbix.tests.unit.plugins.modules.common import patch
 
 
 class TestParsing(unittest.TestCase):
@@ -171,3 +178,181 @@ class TestDictTransform(unittest.TestCase):
             'component': [''],
             'scope': ['performance']}
         self.assertEqual(tag_to_dict_transform(input), expected)
+
+
+class TestObjectCache(unittest.TestCase):
+    """Testing the cache of Zabbix objects"""
+
+    def test_get_and_set(self):
+        """Testing the caching of objects for different keys"""
+        cache = ObjectCache()
+        cache.set(('url', 'Admin', 'hostgroup'), 'name', [
+            {'name': 'Linux servers', 'groupid': '2'},
+            {'name': 'Databases', 'groupid': '3'}])
+
+        self.assertEqual(
+            cache.get(('url', 'Admin', 'hostgroup'), ['Linux servers', 'Unknown']),
+            {'Linux servers': {'name': 'Linux servers', 'groupid': '2'}})
+        self.assertEqual(cache.get(('url', 'User', 'hostgroup'), ['Linux servers']), {})
+        self.assertEqual(cache.get(('url', 'Admin', 'template'), ['Linux servers']), {})
+
+        cache.invalidate(('url', 'Admin', 'hostgroup'))
+        self.assertEqual(cache.get(('url', 'Admin', 'hostgroup'), ['Linux servers', 'Databases']), {})
+
+    def test_ttl(self):
+        """Testing the expiration of cached objects"""
+        cache = ObjectCache(ttl=60)
+        with patch('time.time', return_value=1000):
+            cache.set('key', 'name', [{'name': 'Linux servers', 'groupid': '2'}])
+        with patch('time.time', return_value=1060):
+            self.assertEqual(len(cache.get('key', ['Linux servers'])), 1)
+        with patch('time.time', return_value=1061):
+            self.assertEqual(cache.get('key', ['Linux servers']), {})
+
+        cache = ObjectCache(ttl=0)
+        cache.set('key', 'name', [{'name': 'Linux servers', 'groupid': '2'}])
+        self.assertEqual(cache.get('key', ['Linux servers']), {})
+
+    def test_max_size(self):
+        """Testing the eviction of the least recently used objects"""
+        cache = ObjectCache(max_size=2)
+        cache.set('key', 'name', [{'name': 'G1'}, {'name': 'G2'}])
+        cache.get('key', ['G1'])
+        cache.set('key', 'name', [{'name': 'G3'}])
+
+        self.assertEqual(sorted(cache.get('key', ['G1', 'G2', 'G3'])), ['G1', 'G3'])
+
+
+class TestRequestStats(unittest.TestCase):
+    """Testing the statistics of Zabbix API requests"""
+
+    def test_records(self):
+        """Testing the getting and summarizing of records"""
+        stats = RequestStats(max_size=3)
+        for i in range(4):
+            stats.add('host.get', 100, 1000, 200, 0.5, 0.25, reqid=str(i))
+        stats.add('hostgroup.get,template.get', 200, 300, 200, 0.1, 0.05, reqid='4')
+
+        self.assertEqual([r['id'] for r in stats.get()], ['2', '3', '4'])
+        self.assertEqual([r['method'] for r in stats.get(['1', '2', '4'])], ['host.get', 'hostgroup.get,template.get'])
+        self.assertEqual(RequestStats.summary(stats.get()), {
+            'host.get': {'requests': 2, 'request_bytes': 200, 'response_bytes': 2000,
+                         'server_time': 1.0, 'decode_time': 0.5},
+            'hostgroup.get,template.get': {'requests': 1, 'request_bytes': 200, 'response_bytes': 300,
+                                           'server_time': 0.1, 'decode_time': 0.05}})
+
+    def test_path(self):
+        """Testing the appending of records to the file"""
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        path = os.path.join(workdir, 'stats.jsonl')
+
+        RequestStats(path=path).add('apiinfo.version', 60, 50, 200, 0.01, 0.001)
+        RequestStats(path=path).add('host.get', 100, 1000, 200, 0.5, 0.25)
+
+        with open(path) as stats_file:
+            records = [json.loads(line) for line in stats_file]
+        self.assertEqual([(r['method'], r['response_bytes'], r['status']) for r in records], [
+            ('apiinfo.version', 50, 200), ('host.get', 1000, 200)])
+
+
+class TestRetries(unittest.TestCase):
+    """Testing the repeating of failed requests"""
+
+    def test_read_only(self):
+        """Testing the detection of requests that can be repeated"""
+        self.assertTrue(is_read_only(['host.get', 'hostgroup.get', 'apiinfo.version']))
+        self.assertFalse(is_read_only(['host.get', 'host.create']))
+        self.assertFalse(is_read_only(['user.login']))
+
+    def test_delay(self):
+        """Testing the growing and limited delay"""
+        with patch('random.uniform', side_effect=lambda a, b: b):
+            self.assertEqual([retry_delay(attempt, 1) for attempt in range(6)], [2, 4, 8, 16, 30, 30])
+
+    def test_retry_after(self):
+        """Testing the delay requested by the server"""
+        self.assertEqual(retry_after({'Retry-After': '5'}), 5)
+        self.assertEqual(retry_after({'Retry-After': '3600'}), 30)
+        with patch('time.time', return_value=1700000000):
+            self.assertEqual(retry_after({'Retry-After': 'Tue, 14 Nov 2023 22:13:30 GMT'}), 10)
+        self.assertIsNone(retry_after({'Retry-After': 'soon'}))
+        self.assertIsNone(retry_after({'Retry-After': 'nan'}))
+        self.assertIsNone(retry_after({}))
+        self.assertIsNone(retry_after(None))
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Testing the rate limiter shared by processes"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.path = os.path.join(self.workdir, 'limits', 'bucket')
+
+    def test_take(self):
+        """Testing the taking of tokens by several limiters with the same file"""
+        with patch('time.time', return_value=1000):
+            self.assertEqual(RateLimiter(self.path, 2).take(), 0)
+            self.assertEqual(RateLimiter(self.path, 2).take(), 0)
+            self.assertEqual(RateLimiter(self.path, 2).take(), 0.5)
+        with patch('time.time', return_value=1000.5):
+            self.assertEqual(RateLimiter(self.path, 2).take(), 0)
+            self.assertEqual(RateLimiter(self.path, 2).take(), 0.5)
+
+    def test_acquire(self):
+        """Testing the waiting for a token"""
+        limiter = RateLimiter(self.path, 1)
+        with patch.object(limiter, 'take', side_effect=[0.5, 0.25, 0]):
+            with patch('time.sleep') as mock_sleep:
+                limiter.acquire()
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list], [0.5, 0.25])
+
+    def test_path(self):
+        """Testing the path of the file in the directory of the current user"""
+        path = rate_limit_path('http://zabbix.local/api_jsonrpc.php')
+        self.assertEqual(os.path.dirname(path), os.path.join(
+            tempfile.gettempdir(), 'ansible-zabbix-{0}'.format(os.getuid())))
+        self.assertEqual(path, rate_limit_path('http://zabbix.local/api_jsonrpc.php'))
+        self.assertNotEqual(path, rate_limit_path('http://zabbix2.local/api_jsonrpc.php'))
+
+    def test_private_file(self):
+        """
+        Testing the file and the directory created by the limiter.
+
+        Expected result: the directory and the file are accessible by the current user only.
+        """
+        RateLimiter(self.path, 1).take()
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(self.path)).st_mode), 0o700)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_unsafe_files(self):
+        """
+        Testing the directory accessible by other users and the file replaced with a symbolic link.
+
+        Expected result: the files are not used.
+        """
+        os.mkdir(os.path.dirname(self.path), 0o777)
+        os.chmod(os.path.dirname(self.path), 0o777)
+        with self.assertRaises(OSError):
+            RateLimiter(self.path, 1).take()
+
+        os.chmod(os.path.dirname(self.path), 0o700)
+        target = os.path.join(self.workdir, 'target')
+        os.symlink(target, self.path)
+        with self.assertRaises(OSError):
+            RateLimiter(self.path, 1).take()
+        self.assertFalse(os.path.exists(target))
+
+    def test_invalid_state(self):
+        """
+        Testing the state of the bucket changed to impossible values.
+
+        Expected result: the values are limited, the waiting time is not longer than one token.
+        """
+        RateLimiter(self.path, 2).take()
+        for state in ['-1e300 1000', '0 1e300', 'nan 1000', '1 inf', 'invalid']:
+            with open(self.path, 'w') as bucket_file:
+                bucket_file.write(state)
+            with patch('time.time', return_value=1000):
+                self.assertLessEqual(RateLimiter(self.path, 2).take(), 0.5)
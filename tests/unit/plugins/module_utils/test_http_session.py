@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import gzip
+import socket
+import threading
+import time
+import unittest
+import zlib
+from io import BytesIO
+
+from ansible.module_utils.six.moves import BaseHTTPServer, socketserver
+from ansible_collections.zabbix.zabbix.plugins.module_utils.http_session import (
+    HttpSession, compress_request, decompress_response)
+from ansible_collections.zabbix.zabbix.tests.unit.plugins.modules.common import patch
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Handler returning the request body and closing the connection on demand"""
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests += 1
+        if body == b'slow':
+            time.sleep(0.5)
+        if body == b'redirect':
+            self.send_response(307)
+            self.send_header('Location', '/zabbix/api_jsonrpc.php')
+            body = b''
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        if body == b'close':
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+        # The idle connection is closed without notifying the client
+        if body == b'drop':
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    connections = 0
+    requests = 0
+
+    def handle_error(self, request, client_address):
+        # The client does not wait for slow responses
+        pass
+
+
+class TestHttpSession(unittest.TestCase):
+    """Testing of the persistent HTTP connection"""
+
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = 'http://127.0.0.1:{0}/api_jsonrpc.php'.format(self.server.server_address[1])
+
+    def test_keep_alive(self):
+        """
+        Testing of sending several requests.
+
+        Expected result: all requests are sent over one connection,
+        a new connection is opened after the server has closed the previous one.
+        """
+        session = HttpSession(self.url)
+        for i in range(3):
+            self.assertEqual(session.post(b'data', {})[2], b'data')
+        self.assertEqual(self.server.connections, 1)
+
+        self.assertEqual(session.post(b'close', {})[0], 200)
+        self.assertIsNone(session.connection)
+        session.post(b'data', {})
+        self.assertEqual(self.server.connections, 2)
+
+        # The idle connection was closed by the server, the request is sent again
+        session.post(b'drop', {})
+        self.assertEqual(session.post(b'data', {})[2], b'data')
+        self.assertEqual(self.server.connections, 3)
+        session.close()
+
+    def test_timeout(self):
+        """
+        Testing of a request timed out over a reused connection.
+
+        Expected result: the request is not sent again, the timeout is raised.
+        """
+        session = HttpSession(self.url, timeout=0.2)
+        session.post(b'data', {})
+        with self.assertRaises(socket.timeout):
+            session.post(b'slow', {})
+        self.assertEqual(self.server.requests, 2)
+        self.assertIsNone(session.connection)
+
+    def test_redirect(self):
+        """
+        Testing of a redirected request.
+
+        Expected result: the redirect is not followed, the error is raised.
+        """
+        session = HttpSession(self.url)
+        with self.assertRaisesRegex(Exception, 'redirect to /zabbix/api_jsonrpc.php is not followed'):
+            session.post(b'redirect', {})
+        self.assertEqual(self.server.requests, 1)
+        session.close()
+
+    def test_is_supported(self):
+        """
+        Testing of checking URLs for persistent connections.
+
+        Expected result: URLs used through an HTTP proxy are not supported.
+        """
+        with patch.dict('os.environ', {'http_proxy': '', 'https_proxy': ''}, clear=True):
+            self.assertTrue(HttpSession.is_supported('http://zabbix.local/api_jsonrpc.php'))
+            self.assertTrue(HttpSession.is_supported('https://zabbix.local/api_jsonrpc.php'))
+            self.assertFalse(HttpSession.is_supported('ftp://zabbix.local/api_jsonrpc.php'))
+
+        with patch.dict('os.environ', {'https_proxy': 'http://proxy:3128'}, clear=True):
+            self.assertTrue(HttpSession.is_supported('http://zabbix.local/api_jsonrpc.php'))
+            self.assertFalse(HttpSession.is_supported('https://zabbix.local/api_jsonrpc.php'))
+
+
+class TestCompression(unittest.TestCase):
+    """Testing of compression of requests and responses"""
+
+    def test_compress_request(self):
+        """
+        Testing of compressing request bodies.
+
+        Expected result: compressed responses are accepted if compression is enabled,
+        only big request bodies are compressed and only in the 'all' mode.
+        """
+        small = '{"method": "host.get"}'
+        big = '{{"params": "{0}"}}'.format('x' * 2048)
+
+        headers = {}
+        self.assertEqual(compress_request(big, headers, 'disabled'), big)
+        self.assertEqual(headers, {})
+
+        self.assertEqual(compress_request(big, headers, 'responses'), big)
+        self.assertEqual(headers, {'Accept-Encoding': 'gzip, deflate'})
+
+        headers = {}
+        self.assertEqual(compress_request(small, headers, 'all'), small)
+        self.assertNotIn('Content-Encoding', headers)
+
+        body = compress_request(big, headers, 'all')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertLess(len(body), len(big))
+        self.assertEqual(gzip.GzipFile(fileobj=BytesIO(body)).read(), big.encode('utf-8'))
+
+    def test_decompress_response(self):
+        """
+        Testing of decompressing response bodies.
+
+        Expected result: gzip, zlib and raw deflate bodies are decompressed,
+        bodies already decompressed by the transport are returned as is.
+        """
+        data = b'{"jsonrpc": "2.0", "result": []}'
+        raw_deflate = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+        buffer = BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as gzip_file:
+            gzip_file.write(data)
+
+        self.assertEqual(decompress_response(buffer.getvalue(), 'gzip'), data)
+        self.assertEqual(decompress_response(data, 'gzip'), data)
+        self.assertEqual(decompress_response(zlib.compress(data), 'Deflate'), data)
+        self.assertEqual(
+            decompress_response(raw_deflate.compress(data) + raw_deflate.flush(), 'deflate'), data)
+        self.assertEqual(decompress_response(data, ''), data)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api import ZabbixApi
+from ansible_collections.zabbix.zabbix.tests.unit.plugins.modules.common import (
+    MagicMock, patch, unittest)
+
+
+class TestBatchRequests(unittest.TestCase):
+    """Testing of JSON-RPC batch requests"""
+
+    def setUp(self):
+        mock_connection = patch(
+            "ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api.Connection")
+        self.connection = mock_connection.start().return_value
+        self.addCleanup(mock_connection.stop)
+        self.connection.send_request.return_value = (200, '7.0.0')
+        self.connection.get_cached_objects.return_value = {}
+        self.connection.setup_connection.return_value = {}
+        self.zapi = ZabbixApi(MagicMock())
+
+    def test_send_batch(self):
+        """
+        Testing the matching of responses with requests.
+
+        Expected result: responses are returned in the order of requests,
+        the missing response is reported as an error.
+        """
+        def mock_send_batch(data):
+            return 200, [
+                {'jsonrpc': '2.0', 'id': data[1]['id'], 'error': {'data': 'No permissions'}},
+                {'jsonrpc': '2.0', 'id': data[0]['id'], 'result': [{'hostid': '1'}]}]
+
+        self.connection.send_batch.side_effect = mock_send_batch
+        result = self.zapi.send_batch([
+            ('host.get', {'filter': {'host': ['host']}}),
+            ('template.get', {'filter': {'name': ['template']}}),
+            ('proxy.get', {'filter': {'name': ['proxy']}})])
+
+        self.assertEqual(result, [
+            {'result': [{'hostid': '1'}]},
+            {'error': {'data': 'No permissions'}},
+            {'error': 'No response for method proxy.get'}])
+
+    def test_prefetch(self):
+        """
+        Testing the usage of prefetched results.
+
+        Expected result: successful results are returned without a new request,
+        failed requests are sent again.
+        """
+        def mock_send_batch(data):
+            return 200, [
+                {'jsonrpc': '2.0', 'id': data[0]['id'], 'result': [{'hostid': '1'}]},
+                {'jsonrpc': '2.0', 'id': data[1]['id'], 'error': {'data': 'No permissions'}}]
+
+        self.connection.send_batch.side_effect = mock_send_batch
+        self.zapi.prefetch([
+            self.zapi.search_request('host', {'host': 'host'}),
+            self.zapi.search_request('template', {'name': ['template']})])
+
+        self.assertEqual(self.zapi.find_zabbix_host({'host': 'host'}), [{'hostid': '1'}])
+        self.connection.send_request.reset_mock()
+        self.connection.send_request.return_value = (200, [{'templateid': '2'}])
+        self.assertEqual(
+            self.zapi.find_zabbix_templates({'name': ['template']}),
+            [{'templateid': '2'}])
+        self.assertEqual(
+            self.connection.send_request.call_args[1]['data']['method'],
+            'template.get')
+        self.assertEqual(self.zapi.prefetched, {})
+
+
+class TestCachedObjects(unittest.TestCase):
+    """Testing of searching for objects by names using the cache of the connection"""
+
+    def setUp(self):
+        mock_connection = patch(
+            "ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api.Connection")
+        self.connection = mock_connection.start().return_value
+        self.addCleanup(mock_connection.stop)
+        self.connection.send_request.return_value = (200, '7.0.0')
+        self.connection.setup_connection.return_value = {}
+        self.zapi = ZabbixApi(MagicMock())
+        self.zapi.use_cache = True
+
+    def test_find_by_names(self):
+        """
+        Testing the search for host groups partially found in the cache.
+
+        Expected result: only missing host groups are requested
+        and then saved in the cache.
+        """
+        self.connection.get_cached_objects.return_value = {
+            'Linux servers': {'name': 'Linux servers', 'groupid': '2'}}
+        self.connection.send_request.return_value = (200, [{'name': 'Databases', 'groupid': '3'}])
+
+        result = self.zapi.find_zabbix_hostgroups_by_names(['Linux servers', 'Databases'])
+
+        self.assertEqual(
+            sorted([g['groupid'] for g in result]), ['2', '3'])
+        self.assertEqual(
+            self.connection.send_request.call_args[1]['data']['params']['filter'],
+            {'name': ['Databases']})
+        self.connection.cache_objects.assert_called_once_with(
+            'hostgroup', 'name', [{'name': 'Databases', 'groupid': '3'}])
+
+        # Both groups are found in the cache of the module
+        self.connection.send_request.reset_mock()
+        self.connection.get_cached_objects.reset_mock()
+        self.zapi.find_zabbix_hostgroups_by_names(['Linux servers', 'Databases'])
+        self.connection.send_request.assert_not_called()
+        self.connection.get_cached_objects.assert_not_called()
+
+    def test_invalidation(self):
+        """
+        Testing the invalidation of the cache.
+
+        Expected result: cached host groups are removed
+        after creating of a host group.
+        """
+        self.connection.get_cached_objects.return_value = {
+            'Linux servers': {'name': 'Linux servers', 'groupid': '2'}}
+        self.zapi.find_zabbix_hostgroups_by_names(['Linux servers'])
+
+        self.connection.send_request.return_value = (200, {'groupids': ['3']})
+        self.zapi.send_api_request('hostgroup.create', {'name': 'Databases'})
+        self.connection.invalidate_cached_objects.assert_called_once_with('hostgroup')
+        self.assertNotIn('hostgroup', self.zapi.cached_objects)
+
+        self.zapi.send_api_request('host.update', {'hostid': '1'})
+        self.connection.invalidate_cached_objects.assert_called_with('host')
+
+
+class TestRequestStats(unittest.TestCase):
+    """Testing of adding statistics of requests to the results of modules"""
+
+    def setUp(self):
+        mock_connection = patch(
+            "ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api.Connection")
+        self.connection = mock_connection.start().return_value
+        self.addCleanup(mock_connection.stop)
+        self.connection.send_request.return_value = (200, '7.0.0')
+        self.connection.get_request_stats.return_value = [{'method': 'host.get'}]
+        self.module = MagicMock()
+        self.exit_json = self.module.exit_json
+
+    def test_stats_in_results(self):
+        """
+        Testing the statistics of the sent requests.
+
+        Expected result: the statistics of the requests sent by the module
+        are added to its results.
+        """
+        self.connection.setup_connection.return_value = {'zabbix_api_stats': True}
+        zapi = ZabbixApi(self.module)
+        zapi.send_api_request('host.get', {'output': ['hostid']})
+        self.module.exit_json(changed=False)
+
+        sent_ids = [c[1]['data']['id'] for c in self.connection.send_request.call_args_list]
+        self.assertEqual(len(sent_ids), 2)
+        self.connection.get_request_stats.assert_called_once_with(sent_ids)
+        self.exit_json.assert_called_once_with(changed=False, zabbix_api_stats=[{'method': 'host.get'}])
+
+    def test_stats_disabled(self):
+        """
+        Testing the results without statistics.
+
+        Expected result: the results of the module are not changed.
+        """
+        self.connection.setup_connection.return_value = {}
+        ZabbixApi(self.module).send_api_request('host.get', {'output': ['hostid']})
+        self.module.exit_json(changed=False)
+
+        self.connection.get_request_stats.assert_not_called()
+        self.exit_json.assert_called_once_with(changed=False)
+
+
+class TestApiVersion(unittest.TestCase):
+    """Testing of getting the version of Zabbix API"""
+
+    def setUp(self):
+        mock_connection = patch(
+            "ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api.Connection")
+        self.connection = mock_connection.start().return_value
+        self.addCleanup(mock_connection.stop)
+        self.connection.send_request.return_value = (200, '7.0.0')
+
+    def test_unknown_version(self):
+        """
+        Testing the version unknown to the connection.
+
+        Expected result: the version is requested and passed to the connection.
+        """
+        self.connection.setup_connection.return_value = {'zabbix_api_version': None}
+        zapi = ZabbixApi(MagicMock())
+
+        self.assertEqual(zapi.zbx_api_version, '7.0.0')
+        self.assertEqual(self.connection.send_request.call_args[1]['data']['method'], 'apiinfo.version')
+        self.connection.set_api_version.assert_called_once_with('7.0.0')
+
+    def test_known_version(self):
+        """
+        Testing the version detected by one of the previous tasks.
+
+        Expected result: the version is not requested again.
+        """
+        self.connection.setup_connection.return_value = {'zabbix_api_version': '6.0.0'}
+        zapi = ZabbixApi(MagicMock())
+
+        self.assertEqual(zapi.api_version(), '6.0.0')
+        self.connection.send_request.assert_not_called()
+        self.connection.set_api_version.assert_not_called()
@@ -23,6 +23,7 @@ else:
 import json
 from ansible.module_utils import basic
 from ansible.module_utils.common.text.converters import to_bytes
+from ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api import ZabbixApiRequestError
 
 
 def set_module_args(args):
@@ -54,6 +55,31 @@ def fail_json(*args, **kwargs):
     raise AnsibleFailJson(kwargs)
 
 
+def send_batch(self, requests):
+    """
+    Function to patch over send_batch.
+    Requests of the batch are sent one by one via send_api_request.
+    """
+    responses = []
+    for method, params in requests:
+        try:
+            responses.append({'result': self.send_api_request(method=method, params=params)})
+        except Exception as e:
+            responses.append({'error': str(e)})
+    return responses
+
+
+def try_api_request(self, method, params):
+    """
+    Function to patch over try_api_request.
+    The request is sent via send_api_request, its errors are raised as ZabbixApiRequestError.
+    """
+    try:
+        return self.send_api_request(method=method, params=params)
+    except Exception as e:
+        raise ZabbixApiRequestError(str(e))
+
+
 class TestModules(unittest.TestCase):
     """General setup function for tests"""
     def setUp(self):
@@ -62,6 +88,10 @@ class TestModules(unittest.TestCase):
             "ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api.Connection")
         self.connection = self.mock_connection.start()
         self.addCleanup(self.mock_connection.stop)
+        # The cache of the connection is empty
+        self.connection.return_value.get_cached_objects.return_value = {}
+        # The version of Zabbix API is unknown, statistics of requests are not collected
+        self.connection.return_value.setup_connection.return_value = {}
 
         # Mock module for testing module
         self.mock_module = patch.multiple(
@@ -73,6 +103,16 @@ class TestModules(unittest.TestCase):
 
         self.zabbix_api_module_path = "ansible_collections.zabbix.zabbix.plugins.module_utils.zabbix_api.ZabbixApi"
 
+        # Mock batch requests
+        self.mock_send_batch = patch(
+            "{0}.send_batch".format(self.zabbix_api_module_path), send_batch)
+        self.mock_send_batch.start()
+        self.addCleanup(self.mock_send_batch.stop)
+        self.mock_try_api_request = patch(
+            "{0}.try_api_request".format(self.zabbix_api_module_path), try_api_request)
+        self.mock_try_api_request.start()
+        self.addCleanup(self.mock_try_api_request.stop)
+
         # Mock module for testing functions
         self.mock_module_functions = MagicMock()
         self.mock_module_functions._socket_path = '/dev/null'
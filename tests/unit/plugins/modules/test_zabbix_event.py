@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from ansible_collections.zabbix.zabbix.plugins.modules import zabbix_event
+from ansible_collections.zabbix.zabbix.tests.unit.plugins.modules.common import (
+    AnsibleExitJson, AnsibleFailJson, TestModules, set_module_args, patch)
+
+
+def mock_api_version(self):
+    """
+    Mock function to get Zabbix API version.
+    """
+    return '7.0.0'
+
+
+class TestEventQueue(TestModules):
+    """Class for testing the queue of event messages"""
+    module = zabbix_event
+
+    def setUp(self):
+        super(TestEventQueue, self).setUp()
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.queue_path = os.path.join(self.workdir, 'queue')
+
+    def run_module(self, args, error_message=None):
+        """Function for running the module. Returns the result and the sent requests."""
+        requests = []
+
+        def mock_send_request(self, method, params):
+            requests.append((method, params))
+            if error_message and params['message'] == error_message:
+                raise Exception('No permissions to referred object or it does not exist!')
+            return {'eventids': params['eventids']}
+
+        set_module_args(dict(args, queue_path=self.queue_path))
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_api_request=mock_send_request):
+
+            with self.assertRaises((AnsibleExitJson, AnsibleFailJson)) as ansible_result:
+                self.module.main()
+
+        return ansible_result.exception.args[0], requests
+
+    def test_queue_and_flush_by_size(self):
+        """
+        Testing the flushing of the queue when it contains enough events.
+
+        Expected result: messages are queued without API requests, then the events
+        with the same message are updated with one request.
+        """
+        for eventid in ['1', '2']:
+            result, requests = self.run_module({'ids': [eventid], 'msg': 'Starting', 'flush_size': 4})
+            self.assertFalse(result['changed'])
+            self.assertEqual(requests, [])
+        self.assertEqual(result['queued'], 2)
+
+        self.run_module({'ids': ['1'], 'msg': 'Done', 'flush_size': 4})
+        result, requests = self.run_module({'ids': ['2', '2'], 'msg': 'Starting', 'flush_size': 4})
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(result['queued'], 0)
+        self.assertEqual(requests, [
+            ('event.acknowledge', {'action': 4, 'eventids': ['1', '2'], 'message': 'Starting'}),
+            ('event.acknowledge', {'action': 4, 'eventids': ['1'], 'message': 'Done'})])
+        self.assertEqual(os.path.getsize(self.queue_path), 0)
+
+    def test_flush_by_interval(self):
+        """
+        Testing the flushing of the queue with an old message.
+
+        Expected result: the queue is flushed by the next message.
+        """
+        with open(self.queue_path, 'w') as queue_file:
+            queue_file.write(json.dumps({'ids': ['1'], 'msg': 'Starting', 'time': 0}) + '\n')
+
+        result, requests = self.run_module({'ids': ['2'], 'msg': 'Starting'})
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(requests, [
+            ('event.acknowledge', {'action': 4, 'eventids': ['1', '2'], 'message': 'Starting'})])
+
+    def test_flush_action(self):
+        """
+        Testing the flushing of the queue on demand.
+
+        Expected result: all queued messages are sent, an empty queue is not changed.
+        """
+        self.run_module({'ids': ['1'], 'msg': 'Starting'})
+        result, requests = self.run_module({'action': 'flush'})
+        self.assertTrue(result['changed'])
+        self.assertEqual(len(requests), 1)
+
+        result, requests = self.run_module({'action': 'flush'})
+        self.assertFalse(result['changed'])
+        self.assertEqual(requests, [])
+
+    def test_failed_messages_are_queued_again(self):
+        """
+        Testing the flushing of the queue with a failed request.
+
+        Expected result: the task has failed, the failed message is queued again.
+        """
+        self.run_module({'ids': ['1'], 'msg': 'Starting'})
+        self.run_module({'ids': ['2'], 'msg': 'Done'})
+        result, requests = self.run_module({'action': 'flush'}, error_message='Done')
+
+        self.assertTrue(result['failed'])
+        self.assertTrue(result['changed'])
+        self.assertEqual(
+            result['msg'],
+            'Failed to update event(s): 2: No permissions to referred object or it does not exist!')
+        with open(self.queue_path) as queue_file:
+            self.assertEqual([json.loads(line)['msg'] for line in queue_file], ['Done'])
+
+    def test_connection_error(self):
+        """
+        Testing the flushing of the queue with a connection error in the second batch.
+
+        Expected result: the task has failed, the messages which were not sent are queued again.
+        """
+        def mock_send_batch(self, requests):
+            if requests[0][1]['message'] == 'Done':
+                self.module.fail_json(msg='Connection error: Connection refused')
+            return [{'result': {'eventids': params['eventids']}} for method, params in requests]
+
+        self.run_module({'ids': ['1'], 'msg': 'Starting'})
+        self.run_module({'ids': ['2'], 'msg': 'Done'})
+        with patch('{0}.send_batch'.format(self.zabbix_api_module_path), mock_send_batch):
+            result, requests = self.run_module({'action': 'flush', 'batch_size': 1})
+
+        self.assertTrue(result['failed'])
+        with open(self.queue_path) as queue_file:
+            self.assertEqual([json.loads(line)['msg'] for line in queue_file], ['Done'])
+
+    def test_pending_messages(self):
+        """
+        Testing the pending messages of a killed module.
+
+        Expected result: while the messages are sent, they are kept in the pending file,
+        which is removed after they are sent. Pending messages of a running module
+        are left, messages of a killed module are queued again and sent with the next flush.
+        """
+        def mock_send_batch(self, requests):
+            with open(queue_path + '.pending') as pending_file:
+                pending.extend(json.loads(line)['msg'] for line in pending_file)
+            return [{'result': {'eventids': params['eventids']}} for method, params in requests]
+
+        queue_path = self.queue_path
+        pending = []
+        self.run_module({'ids': ['1'], 'msg': 'Starting'})
+        with patch('{0}.send_batch'.format(self.zabbix_api_module_path), mock_send_batch):
+            result, requests = self.run_module({'action': 'flush'})
+        self.assertTrue(result['changed'])
+        self.assertEqual(pending, ['Starting'])
+        self.assertFalse(os.path.exists(self.queue_path + '.pending'))
+
+        with open(self.queue_path + '.pending', 'w') as pending_file:
+            pending_file.write(json.dumps({'ids': ['2'], 'msg': 'Running', 'time': time.time(), 'pid': os.getpid()}) + '\n')
+            pending_file.write(json.dumps({'ids': ['3'], 'msg': 'Killed', 'time': time.time(), 'pid': 0}) + '\n')
+
+        result, requests = self.run_module({'ids': ['4'], 'msg': 'Done', 'flush_interval': 3600})
+        self.assertFalse(result['changed'])
+        self.assertEqual(result['queued'], 2)
+
+        result, requests = self.run_module({'action': 'flush'})
+        self.assertEqual(requests, [
+            ('event.acknowledge', {'action': 4, 'eventids': ['3'], 'message': 'Killed'}),
+            ('event.acknowledge', {'action': 4, 'eventids': ['4'], 'message': 'Done'})])
+        with open(self.queue_path + '.pending') as pending_file:
+            self.assertEqual([json.loads(line)['msg'] for line in pending_file], ['Running'])
+
+    def test_check_mode(self):
+        """
+        Testing the queue in check mode.
+
+        Expected result: the queue file is not changed and no requests are sent,
+        the task is reported as changed if the queue would be flushed.
+        """
+        self.run_module({'ids': ['1'], 'msg': 'Starting'})
+        with open(self.queue_path) as queue_file:
+            content = queue_file.read()
+
+        result, requests = self.run_module({'ids': ['2'], 'msg': 'Starting', '_ansible_check_mode': True})
+        self.assertFalse(result['changed'])
+        self.assertEqual(result['queued'], 2)
+
+        result, requests = self.run_module({'action': 'flush', '_ansible_check_mode': True})
+        self.assertTrue(result['changed'])
+        self.assertEqual(requests, [])
+
+        with open(self.queue_path) as queue_file:
+            self.assertEqual(queue_file.read(), content)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible_collections.zabbix.zabbix.plugins.modules import zabbix_host
+from ansible_collections.zabbix.zabbix.tests.unit.plugins.modules.common import (
+    AnsibleExitJson, AnsibleFailJson, TestModules, set_module_args, patch)
+
+
+def mock_api_version(self):
+    """
+    Mock function to get Zabbix API version. In this case,
+    it doesn't matter which version of API is returned.
+    """
+    return '7.0.0'
+
+
+def mock_find_zabbix_hostgroups_by_names(self, hostgroup_names):
+    return [{'groupid': '20', 'name': name} for name in hostgroup_names]
+
+
+def zabbix_host_params(hostgroup):
+    """Function for generating parameters of an existing host"""
+    return {
+        'hostid': '2', 'host': 'test_host', 'name': 'test_host', 'status': '0',
+        'description': '', 'proxyid': '0', 'proxy_groupid': '0', 'monitored_by': '0',
+        'inventory_mode': '-1', 'ipmi_authtype': '-1', 'ipmi_privilege': '2',
+        'ipmi_username': '', 'ipmi_password': '', 'tls_connect': '1', 'tls_accept': '1',
+        'tls_issuer': '', 'tls_subject': '', 'macros': [], 'tags': [], 'inventory': [],
+        'interfaces': [], 'parentTemplates': [], 'items': [],
+        'hostgroups': [{'groupid': hostgroup, 'name': 'Group {0}'.format(hostgroup)}]}
+
+
+class TestConcurrency(TestModules):
+    """Class for testing the host changed by other tasks at the same time"""
+    module = zabbix_host
+
+    def setUp(self):
+        super(TestConcurrency, self).setUp()
+        # State of the host in Zabbix
+        self.zabbix_host = None
+        # Errors returned for the requests changing the host
+        self.errors = []
+        self.sent = []
+
+        mock_sleep = patch('time.sleep')
+        self.sleep = mock_sleep.start()
+        self.addCleanup(mock_sleep.stop)
+
+    def run_module(self, expected_exception):
+        """Function for running the module with the mocked Zabbix API"""
+        def mock_send_request(zapi, method, params):
+            if method == 'host.get':
+                return [dict(self.zabbix_host)] if self.zabbix_host else []
+            if method not in ['host.create', 'host.update']:
+                return True
+            self.sent.append(method)
+            if self.errors:
+                error = self.errors.pop(0)
+                if callable(error):
+                    error = error()
+                raise Exception(error)
+            return True
+
+        def mock_find_zabbix_host_by_host(zapi, host_name):
+            return [{'hostid': '2', 'host': host_name}] if self.zabbix_host else []
+
+        set_module_args({
+            'state': 'present',
+            'host': 'test_host',
+            'hostgroups': ['Group 20']})
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_api_request=mock_send_request,
+                find_zabbix_host_by_host=mock_find_zabbix_host_by_host,
+                find_zabbix_hostgroups_by_names=mock_find_zabbix_hostgroups_by_names):
+
+            with self.assertRaises(expected_exception) as ansible_result:
+                self.module.main()
+        return ansible_result.exception.args[0]
+
+    def create_by_other_task(self, hostgroup):
+        """Function for generating the error of a request after the host was created by another task"""
+        def create():
+            self.zabbix_host = zabbix_host_params(hostgroup)
+            return 'Host with the same name "test_host" already exists.'
+        return create
+
+    def test_created_by_other_task(self):
+        """
+        Testing the creation of the host created by another task at the same time.
+
+        Expected result: the created host is requested again and updated.
+        """
+        self.errors = [self.create_by_other_task('10')]
+        result = self.run_module(AnsibleExitJson)
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(result['result'], 'Successfully updated host: test_host')
+        self.assertEqual(self.sent, ['host.create', 'host.update'])
+        self.sleep.assert_not_called()
+
+    def test_created_by_other_task_wo_changes(self):
+        """
+        Testing the creation of the host created by another task with the same parameters.
+
+        Expected result: the task has not been changed.
+        """
+        self.errors = [self.create_by_other_task('20')]
+        result = self.run_module(AnsibleExitJson)
+
+        self.assertFalse(result['changed'])
+        self.assertEqual(self.sent, ['host.create'])
+
+    def test_lock_conflict(self):
+        """
+        Testing the update of the host failed because of a deadlock in the database.
+
+        Expected result: the update is repeated after a delay.
+        """
+        self.zabbix_host = zabbix_host_params('10')
+        self.errors = ['SQL statement execution has failed: Deadlock found when trying to get lock']
+        result = self.run_module(AnsibleExitJson)
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(self.sent, ['host.update', 'host.update'])
+        self.assertEqual(self.sleep.call_count, 1)
+
+    def test_error_wo_conflict(self):
+        """
+        Testing the creation of the host failed while the host was not changed by other tasks.
+
+        Expected result: the request is not repeated, the task has been failed with the error.
+        """
+        self.errors = ['Incorrect value for field "host"']
+        result = self.run_module(AnsibleFailJson)
+
+        self.assertEqual(result['msg'], 'Failed to create host: test_host')
+        self.assertEqual(result['error'], 'Incorrect value for field "host"')
+        self.assertEqual(self.sent, ['host.create'])
+
+    def test_exhausted_retries(self):
+        """
+        Testing the update of the host changed by other tasks after each attempt.
+
+        Expected result: the update is repeated a limited number of times, then the task has been failed.
+        """
+        def update_by_other_task(hostgroup):
+            def update():
+                self.zabbix_host = zabbix_host_params(hostgroup)
+                return 'Conflict'
+            return update
+
+        self.zabbix_host = zabbix_host_params('10')
+        self.errors = [update_by_other_task(str(i)) for i in range(11, 20)]
+        result = self.run_module(AnsibleFailJson)
+
+        self.assertEqual(result['msg'], 'Failed to update host: test_host')
+        self.assertEqual(self.sent, ['host.update'] * (zabbix_host.HOST_CONFLICT_RETRIES + 1))
@@ -32,15 +32,14 @@ class TestGetZabbixHost(TestModules):
         empty inventory data.
         """
         def mock_send_request(self, method, params):
+            if method == 'item.get':
+                return []
             host_data = {
                 'hostid': '10582',
                 'proxy_hostid': '0',
                 'host': 'test',
                 'status': '0'}
-            if 'selectItems' in params:
-                host_data['items'] = [{
-                    'name': 'test',
-                    'inventory_link': '0'}]
+            if 'selectInventory' in params:
                 host_data['inventory'] = {
                     'type': '',
                     'type_full': ''}
@@ -76,16 +75,18 @@ class TestGetZabbixHost(TestModules):
         Expected result: the execution of the function returns
         inventory data.
         """
+        requests = []
+
         def mock_send_request(self, method, params):
+            requests.append((method, params))
+            if method == 'item.get':
+                return [{'hostid': '10582', 'name': 'test', 'inventory_link': '1'}]
             host_data = {
                 'hostid': '10582',
                 'proxy_hostid': '0',
                 'host': 'test',
                 'status': '0'}
-            if 'selectItems' in params:
-                host_data['items'] = [{
-                    'name': 'test',
-                    'inventory_link': '1'}]
+            if 'selectInventory' in params:
                 host_data['inventory'] = {
                     'type': '',
                     'type_full': ''}
@@ -102,11 +103,41 @@ class TestGetZabbixHost(TestModules):
             result = host.get_zabbix_host('10582')
             self.assertEqual(
                 result.get('items'),
-                [{'name': 'test', 'inventory_link': '1'}])
+                [{'hostid': '10582', 'name': 'test', 'inventory_link': '1'}])
             self.assertEqual(
                 result.get('inventory'),
                 {'type': '', 'type_full': ''})
             self.assertEqual(host.inventory_links['type'], 'test')
+            self.assertNotIn('selectItems', requests[0][1])
+            self.assertEqual(requests[1][0], 'item.get')
+            self.assertEqual(requests[1][1]['hostids'], ['10582'])
+            self.assertNotIn('0', requests[1][1]['filter']['inventory_link'])
+
+    def test_get_zabbix_host_params(self):
+        """
+        Testing the parameters of the request to get an existing host.
+
+        Expected result: only the fields and objects required
+        by the specified parameters are requested.
+        """
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version):
+
+            self.mock_module_functions.params = {
+                'host': 'test', 'status': 'enabled', 'tags': [], 'tls_connect': 'cert',
+                'description': None, 'macros': None}
+            host = self.module.Host(self.mock_module_functions)
+            self.assertEqual(host.get_zabbix_host_params(), {
+                'output': ['host', 'hostid', 'name', 'status', 'tls_accept', 'tls_connect'],
+                'selectTags': ['tag', 'value']})
+
+            # All fields are requested to compare PSK settings
+            self.mock_module_functions.params = {'host': 'test', 'tls_psk': 'secret', 'hostgroups': ['Linux']}
+            host = self.module.Host(self.mock_module_functions)
+            self.assertEqual(host.get_zabbix_host_params(), {
+                'output': 'extend',
+                'selectGroups': ['groupid', 'name']})
 
     def test_get_zabbix_host_error(self):
         """
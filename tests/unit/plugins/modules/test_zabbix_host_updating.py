@@ -80,6 +80,8 @@ class TestUpdating(TestModules):
                     "tags": [],
                     "inventory": [],
                     "interfaces": []}]
+            if method == 'item.get':
+                return []
             return True
 
         def mock_find_zabbix_host_by_host(self, host_name):
@@ -156,6 +158,8 @@ class TestUpdating(TestModules):
                     "tags": [],
                     "inventory": [],
                     "interfaces": []}]
+            if method == 'item.get':
+                return []
             return True
 
         def mock_find_zabbix_host_by_host(self, host_name):
@@ -232,6 +236,8 @@ class TestUpdating(TestModules):
                     "tags": [],
                     "inventory": [],
                     "interfaces": []}]
+            if method == 'item.get':
+                return []
             return True
 
         def mock_find_zabbix_host_by_host(self, host_name):
@@ -348,6 +354,8 @@ class TestUpdating(TestModules):
                     "tags": [],
                     "inventory": [],
                     "interfaces": []}]
+            if method == 'item.get':
+                return []
             return True
 
         def mock_find_zabbix_host_by_host(self, host_name):
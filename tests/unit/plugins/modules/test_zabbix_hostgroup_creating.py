@@ -44,7 +44,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -73,7 +74,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -102,7 +104,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -134,7 +137,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -164,7 +168,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -180,7 +185,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -196,7 +202,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -212,7 +219,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleExitJson) as ansible_result:
                 self.module.main()
@@ -241,7 +249,8 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleFailJson) as ansible_result:
                 self.module.main()
@@ -262,7 +271,7 @@ class TestCreating(TestModules):
             if method == 'hostgroup.get':
                 return []
             if method == 'hostgroup.create':
-                raise Exception
+                raise zabbix_hostgroup.ZabbixApiRequestError('Access denied')
 
         zabbix_hostgroup_name = ['Test group']
         set_module_args({'state': 'present', 'name': zabbix_hostgroup_name})
@@ -270,11 +279,77 @@ class TestCreating(TestModules):
         with patch.multiple(
                 self.zabbix_api_module_path,
                 api_version=mock_api_version,
-                send_api_request=mock_send_request):
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
 
             with self.assertRaises(AnsibleFailJson) as ansible_result:
                 self.module.main()
             self.assertTrue(ansible_result.exception.args[0]['failed'])
-            self.assertIn(
-                'Failed to create host group(s):',
+            self.assertEqual(
+                'Failed to create host group(s): Test group: Access denied',
                 ansible_result.exception.args[0]['msg'])
+
+    def test_create_hostgroups_in_batches(self):
+        """
+        Testing the creation of host groups in batches in case one of the batches fails.
+
+        Expected result: each batch is created with one request, host groups
+        of the failed batch are created one by one and the failed host group is reported.
+        """
+        requests = []
+
+        def mock_send_request(self, method, params):
+            if method == 'hostgroup.get':
+                return [{'groupid': '1000', 'name': 'G2'}]
+
+        def mock_try_request(self, method, params):
+            requests.append([p['name'] for p in params])
+            if 'G4' in requests[-1]:
+                raise zabbix_hostgroup.ZabbixApiRequestError('Host group "G4" already exists.')
+            return {'groupids': [str(i) for i in range(len(params))]}
+
+        set_module_args({
+            'state': 'present',
+            'batch_size': 2,
+            'name': ['G1', 'G2', 'G3', 'G4', 'G5', 'G1']})
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_api_request=mock_send_request,
+                try_api_request=mock_try_request):
+
+            with self.assertRaises(AnsibleFailJson) as ansible_result:
+                self.module.main()
+            self.assertTrue(ansible_result.exception.args[0]['changed'])
+            self.assertEqual(
+                ansible_result.exception.args[0]['msg'],
+                'Failed to create host group(s): G4: Host group "G4" already exists.')
+            self.assertEqual(
+                requests,
+                [['G1', 'G3'], ['G4', 'G5'], ['G4'], ['G5']])
+
+    def test_invalid_batch_size(self):
+        """
+        Testing the creation of host groups with an invalid batch size.
+
+        Expected result: the task has failed without requests to Zabbix.
+        """
+        requests = []
+
+        def mock_send_request(self, method, params):
+            requests.append(method)
+            return []
+
+        set_module_args({'state': 'present', 'batch_size': 0, 'name': ['G1']})
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_api_request=mock_send_request,
+                try_api_request=mock_send_request):
+
+            with self.assertRaises(AnsibleFailJson) as ansible_result:
+                self.module.main()
+            self.assertEqual(ansible_result.exception.args[0]['msg'], 'batch_size must be greater than 0')
+            self.assertEqual(requests, [])
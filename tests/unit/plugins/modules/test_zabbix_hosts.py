@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible_collections.zabbix.zabbix.plugins.modules import zabbix_hosts
+from ansible_collections.zabbix.zabbix.tests.unit.plugins.modules.common import (
+    AnsibleExitJson, AnsibleFailJson, TestModules, set_module_args, patch)
+
+
+def mock_api_version(self):
+    """
+    Mock function to get Zabbix API version. In this case,
+    it doesn't matter which version of API is returned.
+    """
+    return '6.0.18'
+
+
+def exist_host(host, hostid, groupid='2'):
+    """Function for generating an existing host from Zabbix API"""
+    return {
+        'hostid': hostid,
+        'proxy_hostid': '0',
+        'host': host,
+        'name': host,
+        'status': '0',
+        'description': '',
+        'ipmi_authtype': '-1',
+        'ipmi_privilege': '2',
+        'ipmi_username': '',
+        'ipmi_password': '',
+        'tls_connect': '1',
+        'tls_accept': '1',
+        'tls_issuer': '',
+        'tls_subject': '',
+        'inventory_mode': '-1',
+        'macros': [],
+        'groups': [{'groupid': groupid, 'name': 'Linux servers'}],
+        'parentTemplates': [],
+        'tags': [],
+        'interfaces': []}
+
+
+class TestBulkProcessing(TestModules):
+    """Class for testing the bulk processing of hosts"""
+    module = zabbix_hosts
+
+    def test_create_hosts_in_one_request(self):
+        """
+        Testing the creation of several hosts.
+
+        Expected result: existing hosts and host groups are requested
+        with one batch request, all hosts are created with one request.
+        """
+        requests = []
+
+        def mock_send_batch(self, batch):
+            requests.append(('batch', [m for m, p in batch]))
+            responses = {
+                'hostgroup.get': [{'groupid': '2', 'name': 'Linux servers'}],
+                'host.get': []}
+            return [{'result': responses[m]} for m, p in batch]
+
+        def mock_try_request(self, method, params):
+            requests.append((method, params))
+            return {'hostids': [str(i) for i in range(len(params))]}
+
+        set_module_args({'hosts': [
+            {'host': 'host_{0}'.format(i), 'hostgroups': ['Linux servers']} for i in range(3)]})
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_batch=mock_send_batch,
+                try_api_request=mock_try_request):
+
+            with self.assertRaises(AnsibleExitJson) as ansible_result:
+                self.module.main()
+            self.assertTrue(ansible_result.exception.args[0]['changed'])
+            self.assertEqual(
+                ansible_result.exception.args[0]['result'],
+                'Successfully processed hosts. Created: 3, updated: 0, deleted: 0, not changed: 0')
+            self.assertEqual(
+                requests[0], ('batch', ['host.get', 'hostgroup.get']))
+            self.assertEqual(requests[1][0], 'host.create')
+            self.assertEqual(len(requests[1][1]), 3)
+            self.assertEqual(len(requests), 2)
+            self.assertEqual(
+                [h['action'] for h in ansible_result.exception.args[0]['hosts']],
+                ['created', 'created', 'created'])
+
+    def test_create_update_delete_hosts(self):
+        """
+        Testing the processing of a list with new, changed, unchanged
+        and deleted hosts.
+
+        Expected result: the summary contains an action for each host
+        and each action is performed with one request.
+        """
+        requests = []
+
+        def mock_send_batch(self, batch):
+            requests.append(('batch', [m for m, p in batch]))
+            responses = {
+                'hostgroup.get': [{'groupid': '2', 'name': 'Linux servers'}, {'groupid': '3', 'name': 'Databases'}],
+                'host.get': [
+                    exist_host('updated_host', '10'),
+                    exist_host('unchanged_host', '11'),
+                    exist_host('deleted_host', '12')]}
+            return [{'result': responses[m]} for m, p in batch]
+
+        def mock_try_request(self, method, params):
+            requests.append((method, params))
+            return {'hostids': []}
+
+        set_module_args({'hosts': [
+            {'host': 'new_host', 'hostgroups': ['Linux servers']},
+            {'host': 'updated_host', 'hostgroups': ['Databases'], 'status': 'disabled'},
+            {'host': 'unchanged_host', 'hostgroups': ['Linux servers']},
+            {'host': 'deleted_host', 'state': 'absent'},
+            {'host': 'missing_host', 'state': 'absent'}]})
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_batch=mock_send_batch,
+                try_api_request=mock_try_request):
+
+            with self.assertRaises(AnsibleExitJson) as ansible_result:
+                self.module.main()
+            result = ansible_result.exception.args[0]
+            self.assertTrue(result['changed'])
+            self.assertEqual(
+                [h['action'] for h in result['hosts']],
+                ['created', 'updated', 'not changed', 'deleted', 'not changed'])
+            self.assertEqual(result['hosts'][1]['changes'], ['groups', 'status'])
+            self.assertEqual(
+                [m for m, p in requests],
+                ['batch', 'host.create', 'host.update', 'host.delete'])
+            self.assertEqual(requests[2][1], [{'hostid': '10', 'status': '1', 'groups': [{'groupid': '3'}]}])
+            self.assertEqual(requests[3][1], ['12'])
+
+    def test_batch_failure_fallback(self):
+        """
+        Testing the processing of hosts in case one of the batches fails.
+
+        Expected result: the hosts of the failed batch are created one by one,
+        the task fails and only the failed host is reported as failed.
+        """
+        requests = []
+
+        def mock_send_request(self, method, params):
+            if method == 'hostgroup.get':
+                return [{'groupid': '2', 'name': 'Linux servers'}]
+            if method == 'host.get':
+                return []
+
+        def mock_try_request(self, method, params):
+            requests.append([p['host'] for p in params])
+            if 'bad_host' in [p['host'] for p in params]:
+                raise zabbix_hosts.ZabbixApiRequestError('Host already exists')
+            return {'hostids': []}
+
+        set_module_args({
+            'batch_size': 2,
+            'hosts': [
+                {'host': 'host_1', 'hostgroups': ['Linux servers']},
+                {'host': 'bad_host', 'hostgroups': ['Linux servers']},
+                {'host': 'host_3', 'hostgroups': ['Linux servers']}]})
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_api_request=mock_send_request,
+                try_api_request=mock_try_request):
+
+            with self.assertRaises(AnsibleFailJson) as ansible_result:
+                self.module.main()
+            result = ansible_result.exception.args[0]
+            self.assertEqual(result['msg'], 'Failed to process host(s): bad_host')
+            self.assertTrue(result['changed'])
+            self.assertEqual(
+                requests,
+                [['host_1', 'bad_host'], ['host_1'], ['bad_host'], ['host_3']])
+            self.assertEqual(result['hosts'][1]['msg'], 'Host already exists')
+            self.assertFalse(result['hosts'][0]['failed'])
+
+    def test_host_validation_errors(self):
+        """
+        Testing the validation of hosts: duplicates and missing host groups.
+
+        Expected result: the task has failed with the duplicate hosts,
+        the host with invalid parameters is reported as failed, the other hosts are created.
+        """
+        requests = []
+
+        def mock_send_request(self, method, params):
+            if method == 'hostgroup.get':
+                return [{'groupid': '2', 'name': 'Linux servers'}]
+            if method == 'host.get':
+                return []
+
+        def mock_try_request(self, method, params):
+            requests.append((method, [p['host'] for p in params]))
+            return {'hostids': []}
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_api_request=mock_send_request,
+                try_api_request=mock_try_request):
+
+            set_module_args({'hosts': [
+                {'host': 'host_1', 'hostgroups': ['Linux servers']},
+                {'host': 'host_1', 'hostgroups': ['Linux servers']}]})
+            with self.assertRaises(AnsibleFailJson) as ansible_result:
+                self.module.main()
+            self.assertEqual(
+                ansible_result.exception.args[0]['msg'],
+                'Duplicate hosts in the list: host_1')
+
+            set_module_args({'hosts': [
+                {'host': 'host_1', 'hostgroups': ['Linux servers']},
+                {'host': 'host_2', 'hostgroups': ['Unknown group']}]})
+            with self.assertRaises(AnsibleFailJson) as ansible_result:
+                self.module.main()
+            result = ansible_result.exception.args[0]
+            self.assertEqual(result['msg'], 'Failed to process host(s): host_2')
+            self.assertTrue(result['changed'])
+            self.assertEqual(result['hosts'][0], {'host': 'host_1', 'action': 'created', 'failed': False})
+            self.assertEqual(result['hosts'][1], {
+                'host': 'host_2', 'action': 'not changed', 'failed': True,
+                'msg': 'Not found in Zabbix: Unknown group'})
+            self.assertEqual(requests, [('host.create', ['host_1'])])
+
+    def test_inventory_links_of_existing_hosts(self):
+        """
+        Testing the request of items linked to inventory fields.
+
+        Expected result: items are requested with one filtered request
+        only for existing hosts with inventory, the host with the linked field
+        is reported as failed, the other hosts are processed.
+        """
+        requests = []
+
+        def mock_send_request(self, method, params):
+            requests.append((method, params))
+            if method == 'hostgroup.get':
+                return [{'groupid': '2', 'name': 'Linux servers'}]
+            if method == 'host.get':
+                hosts = [exist_host('host_1', '10'), exist_host('host_2', '11')]
+                for host in hosts:
+                    host.update({'inventory_mode': '1', 'inventory': {'os': ''}})
+                return hosts
+            if method == 'item.get':
+                return [{'hostid': '10', 'name': 'OS', 'inventory_link': '5'}]
+
+        set_module_args({'hosts': [
+            {'host': 'host_1', 'inventory': {'os': 'Linux'}},
+            {'host': 'host_2'},
+            {'host': 'host_3', 'hostgroups': ['Linux servers'], 'inventory': {'os': 'Linux'}}]})
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                send_api_request=mock_send_request):
+
+            with self.assertRaises(AnsibleFailJson) as ansible_result:
+                self.module.main()
+            result = ansible_result.exception.args[0]
+            self.assertEqual(result['msg'], 'Failed to process host(s): host_1')
+            self.assertEqual(
+                result['hosts'][0]['msg'],
+                "Inventory field 'os' is already linked to the item 'OS' and cannot be updated")
+            self.assertEqual([h['action'] for h in result['hosts']], ['not changed', 'not changed', 'created'])
+            host_get = [p for m, p in requests if m == 'host.get'][0]
+            self.assertNotIn('selectItems', host_get)
+            self.assertIn('selectInventory', host_get)
+            self.assertEqual(
+                [p['hostids'] for m, p in requests if m == 'item.get'], [['10']])
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: Zabbix Ltd
+# GNU Affero General Public License v3.0 (see https://www.gnu.org/licenses/agpl-3.0.html#license-text)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+from ansible_collections.zabbix.zabbix.plugins.modules import zabbix_proxy_balance
+from ansible_collections.zabbix.zabbix.tests.unit.plugins.modules.common import (
+    AnsibleExitJson, AnsibleFailJson, TestModules, set_module_args, patch)
+
+
+def mock_api_version(self):
+    """
+    Mock function to get Zabbix API version.
+    """
+    return '7.0.0'
+
+
+def mock_find_zabbix_proxy_by_names(self, proxy_names):
+    proxies = {'Proxy 1': '1', 'Proxy 2': '2', 'Proxy 3': '3'}
+    return [{'proxyid': proxies[n], 'name': n} for n in proxy_names if n in proxies]
+
+
+def generate_hosts(distribution):
+    """Function for generating hosts monitored by proxies: list of pairs (proxyid, number of hosts)"""
+    hosts = []
+    for proxyid, count in distribution:
+        for i in range(count):
+            hostid = str(100 + len(hosts))
+            hosts.append({
+                'hostid': hostid, 'host': 'host_{0}'.format(hostid),
+                'proxyid': proxyid, 'monitored_by': '1' if proxyid != '0' else '0'})
+    return hosts
+
+
+class TestProxyBalance(TestModules):
+    """Class for testing the balancing of hosts across proxies"""
+    module = zabbix_proxy_balance
+
+    def run_module(self, hosts, items=None):
+        """Function for running the module. Returns the result and the sent requests."""
+        requests = []
+
+        def mock_send_request(self, method, params):
+            requests.append((method, params))
+            if method == 'host.get':
+                return hosts
+            if method == 'item.get':
+                return items or []
+
+        def mock_try_request(self, method, params):
+            requests.append((method, params))
+            return {'hostids': [h['hostid'] for h in params['hosts']]}
+
+        with patch.multiple(
+                self.zabbix_api_module_path,
+                api_version=mock_api_version,
+                find_zabbix_proxy_by_names=mock_find_zabbix_proxy_by_names,
+                send_api_request=mock_send_request,
+                try_api_request=mock_try_request):
+
+            with self.assertRaises((AnsibleExitJson, AnsibleFailJson)) as ansible_result:
+                self.module.main()
+
+        return ansible_result.exception.args[0], requests
+
+    def test_balance_number_of_hosts(self):
+        """
+        Testing the balancing of the number of hosts.
+
+        Expected result: the minimal number of hosts is moved from the most loaded proxies,
+        hosts are moved with one request for each target proxy.
+        """
+        set_module_args({'proxies': ['Proxy 1', 'Proxy 2', 'Proxy 3']})
+        result, requests = self.run_module(generate_hosts([('1', 6), ('2', 4)]))
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(
+            [(p['proxy'], p['hosts_before'], p['hosts_after']) for p in result['proxies']],
+            [('Proxy 1', 6, 4), ('Proxy 2', 4, 3), ('Proxy 3', 0, 3)])
+        self.assertEqual(len(result['moves']), 3)
+        self.assertEqual(set(m['to'] for m in result['moves']), set(['Proxy 3']))
+        self.assertEqual(requests[0][1]['filter'], {'status': '0', 'proxyid': ['1', '2', '3'], 'monitored_by': ['1']})
+        massupdate = [p for m, p in requests if m == 'host.massupdate']
+        self.assertEqual(len(massupdate), 1)
+        self.assertEqual(massupdate[0]['proxyid'], '3')
+        self.assertEqual(massupdate[0]['monitored_by'], '1')
+        self.assertEqual(len(massupdate[0]['hosts']), 3)
+
+    def test_balance_by_load_item(self):
+        """
+        Testing the balancing of the load of unassigned hosts by the values of an item.
+
+        Expected result: the heaviest hosts are assigned to different proxies,
+        the host without the item gets the average load, the loads are equal.
+        """
+        hosts = generate_hosts([('0', 4)])
+        items = [
+            {'hostid': '100', 'lastvalue': '100'},
+            {'hostid': '101', 'lastvalue': '60'},
+            {'hostid': '102', 'lastvalue': '20'}]
+        set_module_args({
+            'proxies': ['Proxy 1', 'Proxy 2'],
+            'include_unassigned': True,
+            'load_item_key': 'nvps',
+            'batch_size': 1})
+        result, requests = self.run_module(hosts, items)
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(requests[1][1]['filter'], {'key_': 'nvps'})
+        self.assertEqual(
+            dict((m['host'], m['to']) for m in result['moves']),
+            {'host_100': 'Proxy 1', 'host_101': 'Proxy 2', 'host_102': 'Proxy 1', 'host_103': 'Proxy 2'})
+        self.assertEqual([p['load_after'] for p in result['proxies']], [120.0, 120.0])
+        self.assertEqual(len([m for m, p in requests if m == 'host.massupdate']), 4)
+
+    def test_already_balanced(self):
+        """
+        Testing the balancing of proxies within the tolerance.
+
+        Expected result: hosts are not moved.
+        """
+        set_module_args({'proxies': ['Proxy 1', 'Proxy 2'], 'tolerance': 25})
+        result, requests = self.run_module(generate_hosts([('1', 5), ('2', 3)]))
+
+        self.assertFalse(result['changed'])
+        self.assertEqual(result['moves'], [])
+        self.assertNotIn('host.massupdate', [m for m, p in requests])
+
+    def test_check_mode(self):
+        """
+        Testing the balancing in check mode.
+
+        Expected result: moves are reported, but hosts are not updated.
+        """
+        set_module_args({'proxies': ['Proxy 1', 'Proxy 2'], '_ansible_check_mode': True})
+        result, requests = self.run_module(generate_hosts([('1', 4)]))
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(len(result['moves']), 2)
+        self.assertNotIn('host.massupdate', [m for m, p in requests])
+
+    def test_unknown_proxy(self):
+        """
+        Testing the balancing with an unknown proxy.
+
+        Expected result: the task has failed.
+        """
+        set_module_args({'proxies': ['Proxy 1', 'Unknown proxy']})
+        result, requests = self.run_module([])
+
+        self.assertTrue(result['failed'])
+        self.assertEqual(result['msg'], 'Proxy not found in Zabbix: Unknown proxy')